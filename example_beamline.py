@@ -31,6 +31,7 @@ def create_beamline():
     detector = Component("detector", movement_strategy=LinearMovement(0, 10, perp_to_floor))
 
     theta = Theta("theta", ideal_sample_point)
+    nr_mode = BeamlineMode("NR", ["theta"])
     beamline = Beamline(
         [
             s0,
@@ -46,9 +47,10 @@ def create_beamline():
         ],
         [theta],
         [],
+        [nr_mode],
     )
     beamline.set_incoming_beam(beam_start)
-    beamline.active_mode = BeamlineMode("NR", ["theta"])
+    beamline.active_mode = nr_mode
 
     return beamline
 
@@ -60,20 +62,17 @@ def generate_theta_movement():
     positions = [
         positions_z,
     ]
-    for theta in range(0, 20, 1):
-        beamline.parameter("theta").sp_move = theta * 1.0
-        positions_y = [component.calculate_beam_interception().y for component in beamline]
-        positions_y.insert(0, "theta {}".format(theta))
-        positions.append(positions_y)
+    thetas = range(0, 20, 1)
+    beam_paths = beamline.evaluate_batch("theta", [theta * 1.0 for theta in thetas])
+    for theta, positions_y in zip(thetas, beam_paths.y):
+        positions.append(["theta {}".format(theta)] + list(positions_y))
 
     beamline[3].enabled = True
     sm_angle = 5
     beamline[3].angle = sm_angle
-    for theta in range(0, 20, 1):
-        beamline.parameter("theta").sp_move = theta * 1.0
-        positions_y = [component.calculate_beam_interception().y for component in beamline]
-        positions_y.insert(0, "theta {} sman{}".format(theta, sm_angle))
-        positions.append(positions_y)
+    beam_paths = beamline.evaluate_batch("theta", [theta * 1.0 for theta in thetas])
+    for theta, positions_y in zip(thetas, beam_paths.y):
+        positions.append(["theta {} sman{}".format(theta, sm_angle)] + list(positions_y))
 
     return positions
 
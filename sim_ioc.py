@@ -5,6 +5,9 @@ from src.ChannelAccess.macros import *
 from src.ChannelAccess.pv_manager import PVManager
 from src.ChannelAccess.pv_server import ReflectometryDriver
 from src.components import *
+from src.ioc_driver import HeightAndAngleDriver, HeightAndTiltDriver, HeightDriver
+from src.motor_backend import SimulatedMotorBackend
+from src.motor_pv_wrapper import MotorPVWrapper
 from src.movement_strategy import LinearMovement
 from src.parameters import *
 
@@ -22,7 +25,38 @@ PARAMS_FIELDS = {
 }
 
 
-def create_beamline():
+def create_drivers(comps, backend):
+    """
+    Create drivers for the components which move simulated motors.
+    Args:
+        comps: the components, in beamline order
+        backend (src.motor_backend.SimulatedMotorBackend): the backend to add the motors to
+
+    Returns: the drivers
+    """
+
+    def axis(name):
+        backend.add_motor(name, max_velocity=1.0, acceleration_time=0.5)
+        return MotorPVWrapper(name, backend)
+
+    s1, super_mirror, s2, sample, s3, s4, point_det = comps
+    drivers = [
+        HeightDriver(slit, axis("MOT:{}:HEIGHT".format(slit.name.upper())))
+        for slit in [s1, s2, s3, s4]
+    ]
+    drivers.extend(
+        HeightAndAngleDriver(
+            reflector,
+            axis("MOT:{}:HEIGHT".format(reflector.name.upper())),
+            axis("MOT:{}:ANGLE".format(reflector.name.upper())),
+        )
+        for reflector in [super_mirror, sample]
+    )
+    drivers.append(HeightAndTiltDriver(point_det, axis("MOT:DET:HEIGHT"), axis("MOT:DET:TILT")))
+    return drivers
+
+
+def create_beamline(backend):
     beam_angle_natural = -45
     beam_start = PositionAndAngle(0.0, 0.0, beam_angle_natural)
     perp_to_floor = 90.0
@@ -67,13 +101,14 @@ def create_beamline():
     modes = [nr_mode, pnr_mode, disabled_mode]
 
     # init beamline
-    bl = Beamline(comps, params, [], modes)
+    bl = Beamline(comps, params, create_drivers(comps, backend), modes)
     bl.set_incoming_beam(beam_start)
     bl.active_mode = nr_mode
     return bl, modes
 
 
-beamline, modes = create_beamline()
+motor_backend = SimulatedMotorBackend()
+beamline, modes = create_beamline(motor_backend)
 
 pv_db = PVManager(PARAMS_FIELDS, [mode.name for mode in modes])
 SERVER = SimpleServer()
@@ -87,6 +122,8 @@ DRIVER = ReflectometryDriver(SERVER, beamline, pv_db)
 while True:
     try:
         SERVER.process(0.1)
+        motor_backend.update()
     except Exception as err:
         print(err)
         break
+beamline.close()
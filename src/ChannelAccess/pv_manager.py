@@ -3,6 +3,7 @@ import re
 PARAM_PREFIX = "PARAM:"
 BEAMLINE_MODE = "BL:MODE"
 BEAMLINE_MOVE = "BL:MOVE"
+BEAMLINE_BATCH = "BL:BATCH"
 SP_SUFFIX = ":SP"
 SP_RBV_SUFFIX = ":SP:RBV"
 MOVE_SUFFIX = ":MOVE"
@@ -27,6 +28,7 @@ class PVManager:
                 "value": 0,
             },
             BEAMLINE_MODE: {"type": "enum", "enums": modes},
+            BEAMLINE_BATCH: {"type": "enum", "enums": ["COMMIT", "BEGIN"]},
         }
 
         self._pv_lookup = {}
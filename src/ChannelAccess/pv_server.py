@@ -20,6 +20,7 @@ class ReflectometryDriver(Driver):
         self._beamline = beamline
         self._ca_server = server
         self._pv_manager = pv_manager
+        self._client_batch_open = False
 
     def read(self, reason):
         """
@@ -27,9 +28,11 @@ class ReflectometryDriver(Driver):
         :param reason: The PV that is being read.
         :return: The value associated to this PV
         """
+        # reads are served from the published state so they never see a move part way through
+        state = self._beamline.state
         if reason.startswith(PARAM_PREFIX):
             param_name = self._pv_manager.get_param_name_from_pv(reason)
-            param = self._beamline.parameter(param_name)
+            param = state.parameter(param_name)
             if reason.endswith(SP_SUFFIX):
                 return param.sp
             elif reason.endswith(SP_RBV_SUFFIX):
@@ -39,7 +42,7 @@ class ReflectometryDriver(Driver):
             else:
                 return self.getParam(reason)  # TODO return actual RBV
         elif reason.endswith("BL:MODE"):
-            return self._beamline.active_mode.name
+            return state.active_mode_name
         else:
             return self.getParam(reason)
 
@@ -49,6 +52,21 @@ class ReflectometryDriver(Driver):
         :param reason: The PV that is being written to.
         :param value: The value being written to the PV
         """
+        with self._beamline.batch():
+            status = self._write(reason, value)
+
+        if status:
+            self.setParam(reason, value)
+            self.update_monitors()
+        return status
+
+    def _write(self, reason, value):
+        """
+        Apply an incoming caput request to the beamline.
+        :param reason: The PV that is being written to.
+        :param value: The value being written to the PV
+        :return: True if the value was applied; False otherwise
+        """
         status = True
         if reason.startswith(PARAM_PREFIX):
             param_name = self._pv_manager.get_param_name_from_pv(reason)
@@ -69,19 +87,24 @@ class ReflectometryDriver(Driver):
             except KeyError:
                 print("Invalid value entered for mode.")  # TODO print list of options
                 status = False
-
-        if status:
-            self.setParam(reason, value)
-            self.update_monitors()
+        elif reason == BEAMLINE_BATCH:
+            # a batch begun by a client spans its later writes until it is committed by writing COMMIT
+            if value and not self._client_batch_open:
+                self._beamline.begin_batch()
+                self._client_batch_open = True
+            elif not value and self._client_batch_open:
+                self._beamline.commit_batch()
+                self._client_batch_open = False
         return status
 
     def update_monitors(self):
         """
         Updates the PV values for each parameter so that changes are visible to monitors.
         """
-        # with self.monitor_lock:
+        # all the monitors are updated from the same published state so they are consistent with each other
+        state = self._beamline.state
         for param_pv in self._pv_manager.parameter_pvs():
-            parameter = self._beamline.parameter(self._pv_manager.get_param_name_from_pv(param_pv))
+            parameter = state.parameter(self._pv_manager.get_param_name_from_pv(param_pv))
             self._set_parameter_pvs(param_pv, parameter)
         self.updatePVs()
 
@@ -89,7 +112,7 @@ class ReflectometryDriver(Driver):
         """
         Update the parameter PVs with the current values from the beamline model.
         :param pv_alias: The PV alias for this parameter
-        :param parameter: The parameter object
+        :param parameter: The published state of the parameter (src.beamline_state.ParameterState)
         """
         self.setParam(pv_alias + SP_SUFFIX, parameter.sp)
         self.setParam(pv_alias + SP_RBV_SUFFIX, parameter.sp_rbv)
@@ -0,0 +1,430 @@
+"""
+Array backed calculation of the beam path through the components of a beamline
+"""
+
+import numpy as np
+
+from src.components import ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.movement_strategy import ANGULAR_TOLERANCE, PARALLEL_TOLERANCE
+
+
+def unit_directions(angles):
+    """
+    The array form of src.gemoetry.unit_direction.
+    Args:
+        angles: clockwise angles measured from the horizon in degrees
+
+    Returns: z and y arrays of the components of the unit vectors
+    """
+    angles = np.asarray(angles, dtype=float)
+    angles_mod = np.mod(angles, 180.0)
+    direction_z = np.cos(np.radians(angles))
+    direction_y = np.sin(np.radians(angles))
+    at_zero = np.fabs(angles_mod) <= ANGULAR_TOLERANCE
+    at_right_angle = np.fabs(angles_mod - 90.0) <= ANGULAR_TOLERANCE
+    direction_z = np.where(at_zero, np.copysign(1.0, direction_z), direction_z)
+    direction_z = np.where(at_right_angle, 0.0, direction_z)
+    direction_y = np.where(at_zero, 0.0, direction_y)
+    direction_y = np.where(at_right_angle, np.copysign(1.0, direction_y), direction_y)
+    return direction_z, direction_y
+
+
+def calculate_interceptions(y_m, z_m, angle_m, y_b, z_b, angle_b):
+    """
+    Calculate the interception points of beams and lines of movement. This is the array form of
+    LinearMovement.calculate_interception and, like it, solves for the interception with the unit directions of the
+    lines so needs no special cases. All arguments are broadcast against each other.
+    Args:
+        y_m: y of a point on the line of movement
+        z_m: z of a point on the line of movement
+        angle_m: angle of the line of movement
+        y_b: y of a point on the beam
+        z_b: z of a point on the beam
+        angle_b: angle of the beam
+
+    Returns: y and z arrays of the interceptions; these are nan where the beam and movement are parallel
+
+    """
+    y_m, z_m, angle_m, y_b, z_b, angle_b = np.broadcast_arrays(
+        *[np.asarray(value, dtype=float) for value in (y_m, z_m, angle_m, y_b, z_b, angle_b)]
+    )
+    movement_z, movement_y = unit_directions(angle_m)
+    beam_z, beam_y = unit_directions(angle_b)
+
+    determinant = movement_z * beam_y - movement_y * beam_z
+    parallel = np.fabs(determinant) <= PARALLEL_TOLERANCE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance_along_line = np.where(
+            parallel, np.nan, ((z_b - z_m) * beam_y - (y_b - y_m) * beam_z) / determinant
+        )
+    return y_m + distance_along_line * movement_y, z_m + distance_along_line * movement_z
+
+
+class BeamPathArrays(object):
+    """
+    The beam path through a beamline for one or more beamline states. Each array has a row per state and a column
+    per component.
+    """
+
+    def __init__(
+        self,
+        incoming_y,
+        incoming_z,
+        incoming_angle,
+        y,
+        z,
+        angle,
+        position_y=None,
+        position_z=None,
+    ):
+        """
+        Initializer.
+        Args:
+            incoming_y: y of the incoming beam at each component
+            incoming_z: z of the incoming beam at each component
+            incoming_angle: angle of the incoming beam at each component
+            y: y of the interception between the beam and each component
+            z: z of the interception between the beam and each component
+            angle: angle of the outgoing beam at each component
+            position_y: y of the set point position of each component; None if not known
+            position_z: z of the set point position of each component; None if not known
+        """
+        self.incoming_y = incoming_y
+        self.incoming_z = incoming_z
+        self.incoming_angle = incoming_angle
+        self.y = y
+        self.z = z
+        self.angle = angle
+        self.position_y = position_y
+        self.position_z = position_z
+
+
+class BeamPathBatch(object):
+    """
+    A batch of beamline states, held as arrays with a row per state, to which parameter set points can be applied
+    without changing the components.
+    """
+
+    def __init__(self, array_beam_path, incoming_beam, rows, state=None):
+        """
+        Initializer.
+        Args:
+            array_beam_path (ArrayBeamPath): the beam path the states are based on
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam entering the first component
+            rows: number of states in the batch
+            state (ComponentArrays): the state of the components in every state of the batch; None for their state in
+                the beam path
+        """
+        self._array_beam_path = array_beam_path
+        self._incoming_beam = incoming_beam
+        if state is None:
+            state = array_beam_path.component_arrays()
+        self.angles = np.tile(state.angle, (rows, 1))
+        self.enabled = np.tile(state.enabled, (rows, 1))
+        self.position_y = np.tile(state.position_y, (rows, 1))
+        self.position_z = np.tile(state.position_z, (rows, 1))
+
+    def set_angle_relative_to_beam(self, component, angles):
+        """
+        Set the angle of a component relative to its incoming beam in each state.
+        Args:
+            component (src.components.ReflectingComponent): the component
+            angles: the angle for each state
+        """
+        index = self._array_beam_path.index(component)
+        _, _, incoming_angle = self._array_beam_path.propagate(
+            self._incoming_beam, self.angles, self.enabled, stop=index + 1
+        )
+        self.angles[:, index] = angles + incoming_angle[:, index]
+
+    def set_position_relative_to_beam(self, component, values):
+        """
+        Set the position of a component relative to the beam along its movement in each state.
+        Args:
+            component (src.components.Component): the component
+            values: the distance from the beam for each state
+        """
+        array_beam_path = self._array_beam_path
+        index = array_beam_path.index(component)
+        incoming_y, incoming_z, incoming_angle = array_beam_path.propagate(
+            self._incoming_beam, self.angles, self.enabled, stop=index + 1
+        )
+        y, z = calculate_interceptions(
+            array_beam_path.movement_y[index],
+            array_beam_path.movement_z[index],
+            array_beam_path.movement_angle[index],
+            incoming_y[:, index],
+            incoming_z[:, index],
+            incoming_angle[:, index],
+        )
+        direction_z, direction_y = unit_directions(array_beam_path.movement_angle[index])
+        self.position_y[:, index] = y + values * direction_y
+        self.position_z[:, index] = z + values * direction_z
+
+    def set_enabled(self, component, enabled):
+        """
+        Set the enabled status of a component in each state.
+        Args:
+            component (src.components.Component): the component
+            enabled: the enabled status for each state
+        """
+        self.enabled[:, self._array_beam_path.index(component)] = enabled
+
+    def calculate_beam_path(self):
+        """
+        Returns (BeamPathArrays): the beam path through the components for each state
+        """
+        beam_path = self._array_beam_path.calculate_beam_path(
+            self._incoming_beam, self.angles, self.enabled
+        )
+        beam_path.position_y = self.position_y
+        beam_path.position_z = self.position_z
+        return beam_path
+
+    def state(self, row):
+        """
+        Args:
+            row: the row of the state
+
+        Returns (ComponentArrays): the state of the components in the row
+        """
+        return ComponentArrays(
+            self.angles[row].copy(),
+            self.enabled[row].copy(),
+            self.position_y[row].copy(),
+            self.position_z[row].copy(),
+        )
+
+
+class ComponentArrays(object):
+    """
+    The state of the components which set points change, with an element per component. These are not changed once
+    created so can be shared.
+    """
+
+    def __init__(self, angle, enabled, position_y, position_z):
+        """
+        Initializer.
+        Args:
+            angle: angle of each component
+            enabled: enabled status of each component
+            position_y: y of the set point position of each component
+            position_z: z of the set point position of each component
+        """
+        self.angle = angle
+        self.enabled = enabled
+        self.position_y = position_y
+        self.position_z = position_z
+
+
+class ArrayBeamPath(object):
+    """
+    Holds the state of the components of a beamline which determines the beam path (their lines of movement,
+    enabled status and reflection angles) in contiguous arrays and propagates beams through them with array
+    operations.
+    """
+
+    def __init__(self, components):
+        """
+        Initializer.
+        Args:
+            components (list[src.components.Component]): the components, in beam order
+        """
+        self._components = components
+        self._indices = {component: index for index, component in enumerate(components)}
+        count = len(components)
+        self.movement_y = np.zeros(count)
+        self.movement_z = np.zeros(count)
+        self.movement_angle = np.zeros(count)
+        self.reflecting = np.array(
+            [isinstance(component, ReflectingComponent) for component in components], dtype=bool
+        )
+        self.enabled = np.ones(count, dtype=bool)
+        self.angle = np.zeros(count)
+        for index in range(count):
+            self.update_component(index)
+
+    @property
+    def components(self):
+        """
+        Returns: the components, in beam order
+        """
+        return self._components
+
+    def index(self, component):
+        """
+        Args:
+            component (src.components.Component): the component
+
+        Returns: the index of the component in the beam path
+        """
+        return self._indices[component]
+
+    def update_component(self, index):
+        """
+        Copy the current state of a component into the arrays.
+        Args:
+            index: index of the component
+        """
+        component = self._components[index]
+        movement = component.movement_strategy
+        movement_position = movement.sp_position()
+        self.movement_y[index] = movement_position.y
+        self.movement_z[index] = movement_position.z
+        self.movement_angle[index] = movement.angle
+        self.enabled[index] = component.enabled
+        if self.reflecting[index]:
+            self.angle[index] = component.angle
+
+    def propagate(self, incoming_beam, angles=None, enabled=None, start=0, stop=None):
+        """
+        Propagate beams through the components.
+        Args:
+            incoming_beam: the beam entering the start component; either a PositionAndAngle or a tuple of y, z and
+                angle arrays with one element per row
+            angles: the reflection angles of the components with a row per beamline state; None for the current angles
+            enabled: the enabled status of the components with a row per beamline state; None for the current status
+            start: index of the component to start at
+            stop: index of the component to stop before; None for all components
+
+        Returns: y, z and angle arrays of the incoming beam at each component from start up to stop
+        """
+        angles = self.angle[np.newaxis, :] if angles is None else angles
+        enabled = self.enabled[np.newaxis, :] if enabled is None else enabled
+        beam_y, beam_z, beam_angle = self._beam_as_arrays(incoming_beam)
+        rows = max(beam_y.shape[0], angles.shape[0], enabled.shape[0])
+        beam_y, beam_z, beam_angle = [
+            np.broadcast_to(value, (rows,)) for value in (beam_y, beam_z, beam_angle)
+        ]
+        stop = len(self._components) if stop is None else stop
+
+        incoming_y = np.empty((rows, stop - start))
+        incoming_z = np.empty((rows, stop - start))
+        incoming_angle = np.empty((rows, stop - start))
+        segment_start = 0
+        for index in np.flatnonzero(self.reflecting[start:stop]):
+            incoming_y[:, segment_start : index + 1] = beam_y[:, np.newaxis]
+            incoming_z[:, segment_start : index + 1] = beam_z[:, np.newaxis]
+            incoming_angle[:, segment_start : index + 1] = beam_angle[:, np.newaxis]
+            segment_start = index + 1
+            index += start
+
+            is_enabled = np.broadcast_to(enabled[:, index], (rows,))
+            if not is_enabled.any():
+                continue
+            y, z = calculate_interceptions(
+                self.movement_y[index],
+                self.movement_z[index],
+                self.movement_angle[index],
+                beam_y,
+                beam_z,
+                beam_angle,
+            )
+            if np.isnan(y[is_enabled]).any():
+                raise ValueError("No interception between beam and movement")
+            reflection_angle = np.broadcast_to(angles[:, index], (rows,))
+            beam_y = np.where(is_enabled, y, beam_y)
+            beam_z = np.where(is_enabled, z, beam_z)
+            beam_angle = np.where(
+                is_enabled, (reflection_angle - beam_angle) * 2 + beam_angle, beam_angle
+            )
+
+        incoming_y[:, segment_start:] = beam_y[:, np.newaxis]
+        incoming_z[:, segment_start:] = beam_z[:, np.newaxis]
+        incoming_angle[:, segment_start:] = beam_angle[:, np.newaxis]
+        return incoming_y, incoming_z, incoming_angle
+
+    def calculate_beam_path(self, incoming_beam, angles=None, enabled=None):
+        """
+        Calculate the beam path through all the components, see propagate for the arguments.
+
+        Returns (BeamPathArrays): the incoming beams, interceptions and outgoing beam angles at each component
+        """
+        angles = self.angle[np.newaxis, :] if angles is None else angles
+        enabled = self.enabled[np.newaxis, :] if enabled is None else enabled
+        incoming_y, incoming_z, incoming_angle = self.propagate(incoming_beam, angles, enabled)
+        y, z = calculate_interceptions(
+            self.movement_y,
+            self.movement_z,
+            self.movement_angle,
+            incoming_y,
+            incoming_z,
+            incoming_angle,
+        )
+        angle = np.where(
+            self.reflecting & enabled,
+            (angles - incoming_angle) * 2 + incoming_angle,
+            incoming_angle,
+        )
+        return BeamPathArrays(incoming_y, incoming_z, incoming_angle, y, z, angle)
+
+    def component_arrays(self):
+        """
+        Returns (ComponentArrays): a copy of the current state of the components
+        """
+        # components move along their lines without changing the beam path, so their positions are read when needed
+        for index, component in enumerate(self._components):
+            movement_position = component.movement_strategy.sp_position()
+            self.movement_y[index] = movement_position.y
+            self.movement_z[index] = movement_position.z
+        return ComponentArrays(
+            self.angle.copy(), self.enabled.copy(), self.movement_y.copy(), self.movement_z.copy()
+        )
+
+    def create_batch(self, incoming_beam, rows, state=None):
+        """
+        Args:
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam entering the first component
+            rows: number of states in the batch
+            state (ComponentArrays): the state the batch starts from; None for the current state of the components
+
+        Returns (BeamPathBatch): a batch of states which all start as the same state of the components
+        """
+        return BeamPathBatch(self, incoming_beam, rows, state)
+
+    def update_beam_path(self, incoming_beam, start=0, stop=None):
+        """
+        Update the incoming beam on each component from the start component onwards from the arrays.
+        Args:
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam entering the start component
+            start: index of the component to start at
+            stop: index of the component to stop before; None for all components
+
+        Returns: the incoming beams set on the components from the start component up to the stop component
+        """
+        components = self._components[start:stop]
+        if incoming_beam is None:
+            for component in components:
+                component.set_incoming_beam(None)
+            return [None] * len(components)
+
+        incoming_y, incoming_z, incoming_angle = self.propagate(
+            incoming_beam, start=start, stop=stop
+        )
+        beam = incoming_beam
+        beams = []
+        for index, component in enumerate(components):
+            if (
+                beam.y != incoming_y[0, index]
+                or beam.z != incoming_z[0, index]
+                or beam.angle != incoming_angle[0, index]
+            ):
+                beam = PositionAndAngle(
+                    incoming_y[0, index], incoming_z[0, index], incoming_angle[0, index]
+                )
+            component.set_incoming_beam(beam)
+            beams.append(beam)
+        return beams
+
+    @staticmethod
+    def _beam_as_arrays(beam):
+        """
+        Args:
+            beam: a PositionAndAngle or a tuple of y, z and angle
+
+        Returns: y, z and angle of the beam as one dimensional arrays
+        """
+        if isinstance(beam, PositionAndAngle):
+            beam = (beam.y, beam.z, beam.angle)
+        return tuple(np.atleast_1d(np.asarray(value, dtype=float)) for value in beam)
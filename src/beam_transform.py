@@ -0,0 +1,82 @@
+"""
+Transforms describing the effect of components on the beam
+"""
+
+from src.gemoetry import PositionAndAngle
+
+
+class BeamTransform(object):
+    """
+    The effect of one or more components on beams which all enter in the same direction. A point on the incoming beam
+    is mapped to a point on the outgoing beam by an affine transform and the outgoing beam leaves at a fixed angle.
+    Because only the position of such a beam varies the transforms of successive components compose exactly.
+    """
+
+    def __init__(self, matrix, offset, angle):
+        """
+        Initializer.
+        Args:
+            matrix: the linear part of the transform of the point as ((yy, yz), (zy, zz))
+            offset: the constant part of the transform of the point as (y, z)
+            angle: the angle of the outgoing beam
+        """
+        self.matrix = matrix
+        self.offset = offset
+        self.angle = angle
+
+    @staticmethod
+    def identity(angle):
+        """
+        Args:
+            angle: angle of the beam
+
+        Returns (BeamTransform): a transform which leaves beams at the angle unchanged
+        """
+        return BeamTransform(((1.0, 0.0), (0.0, 1.0)), (0.0, 0.0), angle)
+
+    def with_angle(self, angle):
+        """
+        Args:
+            angle: angle of the outgoing beam
+
+        Returns (BeamTransform): the same transform of the point but with a different outgoing angle
+        """
+        return BeamTransform(self.matrix, self.offset, angle)
+
+    def then(self, other):
+        """
+        Args:
+            other (BeamTransform): the transform applied after this one
+
+        Returns (BeamTransform): the transform of applying this transform and then the other
+        """
+        (a_yy, a_yz), (a_zy, a_zz) = self.matrix
+        (b_yy, b_yz), (b_zy, b_zz) = other.matrix
+        offset_y, offset_z = self.offset
+        other_offset_y, other_offset_z = other.offset
+        return BeamTransform(
+            (
+                (b_yy * a_yy + b_yz * a_zy, b_yy * a_yz + b_yz * a_zz),
+                (b_zy * a_yy + b_zz * a_zy, b_zy * a_yz + b_zz * a_zz),
+            ),
+            (
+                b_yy * offset_y + b_yz * offset_z + other_offset_y,
+                b_zy * offset_y + b_zz * offset_z + other_offset_z,
+            ),
+            other.angle,
+        )
+
+    def apply(self, position):
+        """
+        Args:
+            position (src.gemoetry.Position): a point on the incoming beam
+
+        Returns (PositionAndAngle): the outgoing beam
+        """
+        (m_yy, m_yz), (m_zy, m_zz) = self.matrix
+        offset_y, offset_z = self.offset
+        return PositionAndAngle(
+            m_yy * position.y + m_yz * position.z + offset_y,
+            m_zy * position.y + m_zz * position.z + offset_z,
+            self.angle,
+        )
@@ -2,7 +2,25 @@
 Resources at a beamline level
 """
 
+from bisect import bisect_left, bisect_right
 from collections import OrderedDict
+from contextlib import contextmanager
+from math import fabs
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from src.array_beam_path import ArrayBeamPath
+from src.beam_transform import BeamTransform
+from src.beamline_snapshot import BeamlineSnapshot
+from src.beamline_state import BeamlineState
+from src.gemoetry import ANGULAR_TOLERANCE
+from src.lookup_table import LookupTable
+from src.move_plan_cache import MovePlanCache
+from src.sensitivity import Sensitivity
+
+# Default maximum number of threads which call the drivers concurrently
+DEFAULT_MAX_DRIVER_THREADS = 32
 
 
 class BeamlineMode(object):
@@ -10,7 +28,7 @@ class BeamlineMode(object):
     Beamline mode definition; which components and parameters are calculated on move.
     """
 
-    def __init__(self, name, beamline_parameters_to_calculate, sp_inits=None):
+    def __init__(self, name, beamline_parameters_to_calculate, sp_inits=None, lookup_grid=None):
         """
         Initialize.
         Args:
@@ -18,13 +36,17 @@ class BeamlineMode(object):
             beamline_parameters_to_calculate (list[str]): Beamline parameters in this mode
                 which should be automatically moved to whenever a preceding parameter is changed
             sp_inits: The initial beamline parameter values that should be set when switching to this mode
+            lookup_grid (list[tuple]): the name and grid values of each parameter over which to precompute the beam path
+                in this mode for fast approximate evaluation, see src.lookup_table.LookupTable; None for no grid
         """
         self.name = name.upper()
         self._beamline_parameters_to_calculate = beamline_parameters_to_calculate
+        self._beamline_parameter_names = set(beamline_parameters_to_calculate)
         if sp_inits is None:
             self._sp_inits = {}
         else:
             self._sp_inits = sp_inits
+        self.lookup_grid = lookup_grid
 
     def has_beamline_parameter(self, beamline_parameter):
         """
@@ -33,7 +55,7 @@ class BeamlineMode(object):
 
         Returns: True if beamline_parameter is in this mode.
         """
-        return beamline_parameter.name in self._beamline_parameters_to_calculate
+        return beamline_parameter.name in self._beamline_parameter_names
 
     def get_parameters_in_mode(self, beamline_parameters, first_parameter=None):
         """
@@ -52,10 +74,23 @@ class BeamlineMode(object):
         for beamline_parameter in beamline_parameters:
             if beamline_parameter == first_parameter:
                 after_first = True
-            elif after_first and beamline_parameter.name in self._beamline_parameters_to_calculate:
+            elif after_first and beamline_parameter.name in self._beamline_parameter_names:
                 parameters_in_mode.append(beamline_parameter)
         return parameters_in_mode
 
+    def compile(self, beamline_parameters):
+        """
+        Args:
+            beamline_parameters(list[src.parameters.BeamlineParameter]): the beamline parameters which maybe in the mode
+
+        Returns: the indices, in order, of the parameters which are in this mode
+        """
+        return [
+            index
+            for index, beamline_parameter in enumerate(beamline_parameters)
+            if beamline_parameter.name in self._beamline_parameter_names
+        ]
+
     @property
     def initial_setpoints(self):
         """
@@ -71,7 +106,17 @@ class Beamline(object):
     The collection of all beamline components.
     """
 
-    def __init__(self, components, beamline_parameters, drivers, modes):
+    def __init__(
+        self,
+        components,
+        beamline_parameters,
+        drivers,
+        modes,
+        use_array_engine=False,
+        move_plan_cache_size=0,
+        channel_pool=None,
+        max_driver_threads=DEFAULT_MAX_DRIVER_THREADS,
+    ):
         """
         The initializer.
         Args:
@@ -80,6 +125,15 @@ class Beamline(object):
                 the beamline
             drivers(list[src.ioc_driver.IocDriver]): a list of motor drivers linked to a component in the beamline
             modes(list[BeamlineMode])
+            use_array_engine (bool): True to calculate the beam path with the NumPy array engine
+                (src.array_beam_path.ArrayBeamPath); False to calculate it component by component
+            move_plan_cache_size: the number of configurations for which to cache the result of moving the beamline,
+                see src.move_plan_cache.MovePlanCache; 0 for no cache
+            channel_pool (src.channel_pool.ChannelPool): pool with which to connect the channels of the drivers' axes
+                when the beamline is built, so the first move does not wait for them to connect; None to connect them
+                when first used
+            max_driver_threads: maximum number of threads which call the drivers concurrently; the threads are created
+                when first needed and stopped by close
         """
         self._components = components
         self._beamline_parameters = OrderedDict()
@@ -88,6 +142,11 @@ class Beamline(object):
         for mode in modes:
             self._modes[mode.name] = mode
 
+        self._component_indices = {}
+        for index, component in enumerate(components):
+            component.after_beam_path_update_listener = self.update_beam_path
+            self._component_indices[component] = index
+
         for beamline_parameter in beamline_parameters:
             if beamline_parameter.name in self._beamline_parameters:
                 raise ValueError(
@@ -98,12 +157,91 @@ class Beamline(object):
             self._beamline_parameters[beamline_parameter.name] = beamline_parameter
             beamline_parameter.after_move_listener = self.update_beamline_parameters
 
-        for component in components:
-            component.after_beam_path_update_listener = self.update_beam_path
+        # the parameters in each mode are compiled once to their indices so that updating the parameters only visits
+        # those in the mode and those whose set point has changed
+        self._parameters = list(self._beamline_parameters.values())
+        self._parameter_indices = {}
+        self._changed_parameter_indices = set()
+        for index, beamline_parameter in enumerate(self._parameters):
+            self._parameter_indices[beamline_parameter] = index
+            beamline_parameter.after_sp_changed_listener = self._add_changed_parameter
+            beamline_parameter.defer_move = self._handle_parameter_move
+            beamline_parameter.inputs_changed = self._parameter_inputs_changed
+            if beamline_parameter.sp_changed:
+                self._changed_parameter_indices.add(index)
+        # each parameter depends on the beam entering the component it drives, so this maps the parameters to the
+        # components whose upstream changes they depend on; None for a parameter without a single component
+        self._parameter_component_indices = [
+            self._component_indices.get(beamline_parameter.component)
+            for beamline_parameter in self._parameters
+        ]
+        # the parameters which drive a component, ordered by the component's index, to find those downstream of a change
+        self._parameters_by_component = sorted(
+            (component_index, index)
+            for index, component_index in enumerate(self._parameter_component_indices)
+            if component_index is not None
+        )
+        self._parameter_component_keys = [
+            component_index for component_index, _ in self._parameters_by_component
+        ]
+        self._mode_parameter_indices = {}
+        for mode in modes:
+            self._mode_parameter_indices[mode] = mode.compile(self._parameters)
+
+        self._incoming_beams = [None] * len(components)
+        # composed transforms from the incoming beam to the beam entering, and the interception with, each component;
+        # these are built when queried and only those before the first invalid one are kept
+        self._beam_transforms = []
+        self._interception_transforms = []
 
         self.incoming_beam = None
         self._active_mode = None
 
+        # the beam path is up to date except from this component onwards; None for up to date
+        self._beam_path_start = None
+        # indices of the parameters whose inputs have changed since they were last moved, so which must be moved again
+        # when parameters they depend on are moved; initially all of them
+        self._stale_parameter_indices = set(index for _, index in self._parameters_by_component)
+        # the component being moved by the parameter being moved; None if no parameter is moving
+        self._moving_component = None
+        self._batch_depth = 0
+        self._batch_parameter_moves = set()
+        self._batch_beamline_move = False
+
+        self._move_plan_cache = None
+        self._moving_beamline = False
+        # lookup tables and sensitivities of the modes and the base of snapshots, built when first used and discarded
+        # when the beamline changes
+        self._lookup_tables = {}
+        self._sensitivities = {}
+        self._snapshot_base = None
+        if move_plan_cache_size:
+            self._move_plan_cache = MovePlanCache(move_plan_cache_size)
+
+        # threads which call the drivers concurrently, created when first needed
+        self._driver_pool = None
+        self._max_driver_threads = max_driver_threads
+        # the axes of each driver read at the start of the move being made
+        self._axis_snapshots = {}
+        self._channel_pool = channel_pool
+        if channel_pool is not None:
+            channel_pool.connect(
+                [
+                    channel_name
+                    for driver in drivers
+                    for axis in driver.axes()
+                    for channel_name in axis.channel_names()
+                ]
+            )
+
+        self._array_beam_path = None
+        if use_array_engine:
+            self._array_beam_path = ArrayBeamPath(components)
+
+        # the state published for readers; replaced, never changed, so a reader always sees a consistent state
+        self._state = None
+        self._publish_state()
+
     @property
     def active_mode(self):
         """
@@ -118,8 +256,24 @@ class Beamline(object):
         Args:
             mode (BeamlineMode): mode to set
         """
-        self._active_mode = mode
-        self.init_setpoints()
+        # the state is published once the initial set points of the mode are set, not part way through setting them
+        self._batch_depth += 1
+        try:
+            self._active_mode = mode
+            self.init_setpoints()
+        finally:
+            self._batch_depth -= 1
+        self._publish_state()
+
+    @property
+    def state(self):
+        """
+        The state of the beamline's parameters and mode as of the last completed change. Changes build a new state and
+        publish it by replacing this reference once they complete, so the state can be read, e.g. to serve channel access
+        reads, without locking while a move is being calculated.
+        Returns (src.beamline_state.BeamlineState): the state
+        """
+        return self._state
 
     @property
     def move(self):
@@ -136,8 +290,103 @@ class Beamline(object):
         Args:
             _: dummy can be anything
         """
-        self.update_beamline_parameters()
-        self._move_drivers(self._get_max_move_duration())
+        if self._batch_depth > 0:
+            self._batch_beamline_move = True
+            return
+        self._move_beamline()
+
+    @property
+    def channel_pool(self):
+        """
+        Returns (src.channel_pool.ChannelPool): the pool which connected the channels of the drivers' axes, giving
+            their connection status; None if there is no pool
+        """
+        return self._channel_pool
+
+    @property
+    def move_plan_cache(self):
+        """
+        Returns (src.move_plan_cache.MovePlanCache): the cache of the results of moving the beamline; None if there is
+            no cache
+        """
+        return self._move_plan_cache
+
+    def _move_beamline(self, requested=frozenset()):
+        """
+        Move all the parameters in the mode, or whose set point has changed, and then the drivers. If the beamline has
+        been moved to the same configuration before, and the result is cached, the components are restored to the
+        result instead of moving the parameters.
+        Args:
+            requested: indices of other parameters to move
+        """
+        key = self._move_plan_key(requested)
+        plan = None if key is None else self._move_plan_cache.get(key)
+        if plan is None:
+            self._moving_beamline = True
+            try:
+                self._move_parameters(set(self._parameter_indices_in_mode()) | requested)
+            finally:
+                self._moving_beamline = False
+            if key is not None:
+                self._move_plan_cache.put(
+                    key, [component.capture_state() for component in self._components]
+                )
+        else:
+            self._restore_move_plan(plan)
+
+        # the axes are read once and the move is both planned and performed from the readings
+        self._axis_snapshots = dict(
+            zip(self._drivers, self._map_drivers(lambda driver: driver.read_axes()))
+        )
+        try:
+            self._move_drivers(self._get_max_move_duration())
+        finally:
+            self._axis_snapshots = {}
+
+    def _move_plan_key(self, requested):
+        """
+        The result of moving the beamline depends only on the mode, set points and incoming beam if every parameter is
+        moved and the components have not been changed other than by moving the beamline. The cache is cleared when
+        they are.
+        Args:
+            requested: indices of other parameters to move
+
+        Returns: the key of the configuration for the move plan cache; None if the move can not be cached
+        """
+        if self._move_plan_cache is None:
+            return None
+        moved = set(self._parameter_indices_in_mode()) | requested
+        moved.update(
+            index for index in self._changed_parameter_indices if self._parameters[index].sp_changed
+        )
+        if len(moved) != len(self._parameters):
+            return None
+        incoming_beam = self.incoming_beam
+        if incoming_beam is not None:
+            incoming_beam = (incoming_beam.y, incoming_beam.z, incoming_beam.angle)
+        set_points = tuple(beamline_parameter.sp for beamline_parameter in self._parameters)
+        return self._active_mode, set_points, incoming_beam
+
+    def _restore_move_plan(self, plan):
+        """
+        Restore the components and parameters to the result of a move.
+        Args:
+            plan: the states of the components after the move
+        """
+        for index, (component, state) in enumerate(zip(self._components, plan)):
+            component.restore_state(state)
+            self._incoming_beams[index] = component.incoming_beam
+            if self._array_beam_path is not None:
+                self._array_beam_path.update_component(index)
+        del self._beam_transforms[:]
+        del self._interception_transforms[:]
+        self._discard_derived_state()
+        self._beam_path_start = None
+        self._stale_parameter_indices.clear()
+        for beamline_parameter in self._parameters:
+            beamline_parameter.mark_moved()
+        self._changed_parameter_indices.clear()
+        self._publish_state()
 
     def __getitem__(self, item):
         """
@@ -148,6 +397,15 @@ class Beamline(object):
         """
         return self._components[item]
 
+    def component_index(self, component):
+        """
+        Args:
+            component (src.components.Component): a component on the beamline
+
+        Returns: the index of the component
+        """
+        return self._component_indices[component]
+
     def set_incoming_beam(self, incoming_beam):
         """
         Set the incoming beam for the component
@@ -157,16 +415,255 @@ class Beamline(object):
         self.incoming_beam = incoming_beam
         self.update_beam_path(None)
 
+    @contextmanager
+    def batch(self):
+        """
+        A batch of changes to the beamline. Within the batch, moves of parameters and of the beamline are deferred and
+        the beam path is not recalculated. When the batch is committed, at the end of the outermost batch, all the
+        parameters to move are moved in order with a single pass along the beam path and, if the beamline was moved,
+        the drivers are moved once. If the batch does not finish, e.g. because it raises an error or is interrupted, the
+        deferred moves are discarded. For example
+            with beamline.batch():
+                beamline.parameter("theta").sp = 1.0
+                beamline.parameter("smangle").sp = 0.5
+        """
+        self.begin_batch()
+        finished = False
+        try:
+            yield self
+            finished = True
+        finally:
+            if not finished:
+                self.abort_batch()
+        self.commit_batch()
+
+    def begin_batch(self):
+        """
+        Start a batch of changes to the beamline, see batch. Batches can be nested.
+        """
+        self._batch_depth += 1
+
+    def commit_batch(self):
+        """
+        End a batch of changes to the beamline, see batch. The changes are made when the outermost batch ends.
+        """
+        if self._batch_depth == 0:
+            raise ValueError("No batch to commit")
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+
+        requested = self._batch_parameter_moves
+        beamline_move = self._batch_beamline_move
+        self._batch_parameter_moves = set()
+        self._batch_beamline_move = False
+        self._move_requested(requested, beamline_move)
+
+    def _move_requested(self, requested, beamline_move):
+        """
+        Move the parameters requested to move and those in the mode which depend on them or, if the beamline is to be
+        moved, the beamline.
+        Args:
+            requested: indices of the parameters requested to move
+            beamline_move: True to move the beamline
+        """
+        if beamline_move:
+            self._move_beamline(requested)
+        else:
+            self._clear_move_plan_cache()
+            requested_in_mode = [
+                index
+                for index in sorted(requested)
+                if self._active_mode.has_beamline_parameter(self._parameters[index])
+            ]
+            if requested_in_mode:
+                first_parameter = self._parameters[requested_in_mode[0]]
+                self._move_parameters(
+                    requested, set(self._parameter_indices_in_mode(first_parameter))
+                )
+            else:
+                self._move_parameters(requested, include_changed=False)
+
+    def abort_batch(self):
+        """
+        End a batch of changes to the beamline, see batch, discarding the deferred moves. Set points which were changed
+        stay changed and the beam path is brought up to date with any components which were changed directly.
+        """
+        if self._batch_depth == 0:
+            raise ValueError("No batch to abort")
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._batch_parameter_moves = set()
+            self._batch_beamline_move = False
+            self._update_beam_path_to()
+            self._publish_state()
+
+    def _handle_parameter_move(self, beamline_parameter):
+        """
+        Move a parameter, and the parameters in the mode which depend on it, or within a batch defer this until the
+        batch is committed. The beamline makes the move so that it knows which component the parameter changes.
+        Args:
+            beamline_parameter (src.parameters.BeamlineParameter): parameter which is to move
+
+        Returns: True as the beamline makes the move
+        """
+        index = self._parameter_indices[beamline_parameter]
+        if self._batch_depth > 0:
+            self._batch_parameter_moves.add(index)
+        else:
+            self._move_requested({index}, False)
+        return True
+
+    def _parameter_inputs_changed(self, beamline_parameter):
+        """
+        Args:
+            beamline_parameter (src.parameters.BeamlineParameter): the parameter
+
+        Returns: True if the component the parameter drives, or the beam entering it, has changed since the parameter
+            last moved
+        """
+        return self._parameter_indices[beamline_parameter] in self._stale_parameter_indices
+
     def update_beam_path(self, src):
         """
-        Updates the beam path for all components
+        Updates the beam path for the source component and all components downstream of it. The beams entering the
+        components upstream of the source are unchanged so are reused. Within a batch the update is deferred until the
+        batch is committed.
         Args:
             src: source component of the update or None for not from component change
         """
-        outgoing = self.incoming_beam
-        for component in self._components:
-            component.set_incoming_beam(outgoing)
-            outgoing = component.get_outgoing_beam()
+        start = self._component_indices.get(src, 0)
+        if src is None:
+            del self._beam_transforms[:]
+            del self._interception_transforms[:]
+        else:
+            del self._beam_transforms[start + 1 :]
+            del self._interception_transforms[start + 1 :]
+            if self._array_beam_path is not None:
+                self._array_beam_path.update_component(start)
+
+        if self._beam_path_start is None or start < self._beam_path_start:
+            self._beam_path_start = start
+        self._discard_derived_state()
+        if src is not None:
+            self._clear_move_plan_cache()
+        if src is None:
+            self._mark_parameters_stale(0)
+        elif src is self._moving_component:
+            # the parameter moving the component has set it as it should be, but those downstream see a new beam
+            self._mark_parameters_stale(start + 1)
+        else:
+            self._mark_parameters_stale(start)
+        if self._batch_depth == 0:
+            self._update_beam_path_to()
+
+    def _mark_parameters_stale(self, component_index):
+        """
+        Record that the parameters driving a component and those downstream of it must be moved again, because the
+        component has changed or the beam entering them has.
+        Args:
+            component_index: index of the first component whose parameters are stale
+        """
+        start = bisect_left(self._parameter_component_keys, component_index)
+        self._stale_parameter_indices.update(
+            index for _, index in self._parameters_by_component[start:]
+        )
+
+    def _update_beam_path_to(self, index=None):
+        """
+        Bring the beam path up to date as far as the beam entering a component.
+        Args:
+            index: index of the component; None to bring the whole beam path up to date
+        """
+        start = self._beam_path_start
+        if start is None or (index is not None and index < start):
+            return
+        stop = len(self._components) if index is None else index + 1
+        if start == 0:
+            outgoing = self.incoming_beam
+        else:
+            outgoing = self._incoming_beams[start]
+
+        if self._array_beam_path is not None:
+            self._incoming_beams[start:stop] = self._array_beam_path.update_beam_path(
+                outgoing, start, stop
+            )
+        else:
+            for component_index in range(start, stop):
+                component = self._components[component_index]
+                self._incoming_beams[component_index] = outgoing
+                component.set_incoming_beam(outgoing)
+                outgoing = component.get_outgoing_beam()
+
+        # the beam leaving the indexed component is not yet up to date, it may be about to change
+        self._beam_path_start = index
+
+    def beam_at(self, index, incoming_beam=None):
+        """
+        The beam entering a component. Once the transforms for the beamline have been built this takes constant time,
+        including for an incoming beam which is parallel to, but offset from, the current incoming beam.
+        Args:
+            index: index of the component
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam entering the beamline; None for the current beam
+
+        Returns (src.gemoetry.PositionAndAngle): the beam entering the component
+        """
+        if incoming_beam is None:
+            return self._incoming_beams[index]
+        return self._beam_transform_to(index).apply(self._parallel_incoming_beam(incoming_beam))
+
+    def interception_at(self, index, incoming_beam=None):
+        """
+        The position where a component's possible movement intercepts the beam. Once the transforms for the beamline
+        have been built this takes constant time, including for an incoming beam which is parallel to, but offset from,
+        the current incoming beam.
+        Args:
+            index: index of the component
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam entering the beamline; None for the current beam
+
+        Returns (src.gemoetry.Position): the interception
+        """
+        if incoming_beam is None:
+            incoming_beam = self.incoming_beam
+        else:
+            incoming_beam = self._parallel_incoming_beam(incoming_beam)
+
+        for built_index in range(len(self._interception_transforms), index + 1):
+            self._interception_transforms.append(
+                self._beam_transform_to(built_index).then(
+                    self._components[built_index].interception_transform()
+                )
+            )
+        return self._interception_transforms[index].apply(incoming_beam)
+
+    def _beam_transform_to(self, index):
+        """
+        Args:
+            index: index of the component
+
+        Returns (src.beam_transform.BeamTransform): the transform from the incoming beam to the beam entering the
+            component, building any transforms up to it which are not yet built
+        """
+        if not self._beam_transforms:
+            self._beam_transforms.append(BeamTransform.identity(self.incoming_beam.angle))
+        for built_index in range(len(self._beam_transforms), index + 1):
+            self._beam_transforms.append(
+                self._beam_transforms[built_index - 1].then(
+                    self._components[built_index - 1].beam_transform()
+                )
+            )
+        return self._beam_transforms[index]
+
+    def _parallel_incoming_beam(self, incoming_beam):
+        """
+        Args:
+            incoming_beam (src.gemoetry.PositionAndAngle): an alternative incoming beam
+
+        Returns: the incoming beam, if it is parallel to the current incoming beam so that the transforms apply
+        """
+        if fabs(incoming_beam.angle - self.incoming_beam.angle) > ANGULAR_TOLERANCE:
+            raise ValueError("Incoming beam must be parallel to the current incoming beam")
+        return incoming_beam
 
     def update_beamline_parameters(self, source=None):
         """
@@ -178,13 +675,256 @@ class Beamline(object):
         Returns:
 
         """
-        if source is None or self._active_mode.has_beamline_parameter(source):
-            parameters = self._beamline_parameters.values()
-            parameters_in_mode = self._active_mode.get_parameters_in_mode(parameters, source)
+        self._clear_move_plan_cache()
+        if source is None:
+            self._move_parameters(set(self._parameter_indices_in_mode()))
+        elif self._active_mode.has_beamline_parameter(source):
+            self._move_parameters(set(), set(self._parameter_indices_in_mode(source)))
+        else:
+            self._publish_state()
+
+    def _move_parameters(self, to_move, dependent=None, include_changed=True):
+        """
+        Move parameters in order. The beam path is only brought up to date as far as each parameter's component before
+        it is moved, so the whole beam path is calculated once.
+
+        Parameters which depend on the moves are only moved if their inputs have changed since they were last moved. A
+        parameter which drives a component depends on the component and the beam entering it, so this is when the
+        component was changed other than by moving a parameter or the beam leaving a component upstream of it has
+        changed; this includes changes made by the parameters moved before it. Parameters which do not drive a single
+        component are always moved.
+        Args:
+            to_move (set): indices of the parameters to move
+            dependent (set): indices of the parameters to move if their inputs have changed
+            include_changed: True to also move the parameters whose set point has changed
+        """
+        to_move = set(to_move)
+        self._discard_derived_state()
+        if include_changed:
+            to_move.update(
+                index
+                for index in self._changed_parameter_indices
+                if self._parameters[index].sp_changed
+            )
+            self._changed_parameter_indices.clear()
+
+        self._batch_depth += 1
+        try:
+            for index in sorted(to_move.union(dependent or ())):
+                component_index = self._parameter_component_indices[index]
+                if (
+                    index not in to_move
+                    and component_index is not None
+                    and index not in self._stale_parameter_indices
+                ):
+                    continue
+                self._update_beam_path_to(component_index)
+                self._moving_component = self._parameters[index].component
+                try:
+                    self._parameters[index].move_no_callback()
+                finally:
+                    self._moving_component = None
+                self._stale_parameter_indices.discard(index)
+        finally:
+            self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._update_beam_path_to()
+        self._publish_state()
+
+    def _discard_derived_state(self):
+        """
+        Discard the lookup tables, sensitivities and snapshot base, which depend on the state of the beamline, because
+        it has changed.
+        """
+        self._lookup_tables.clear()
+        self._sensitivities.clear()
+        self._snapshot_base = None
+
+    def _clear_move_plan_cache(self):
+        """
+        Clear the move plan cache if the components are being changed other than by moving the beamline.
+        """
+        if self._move_plan_cache is not None and not self._moving_beamline:
+            self._move_plan_cache.clear()
+
+    def _add_changed_parameter(self, beamline_parameter):
+        """
+        Record that the set point of a parameter has changed, so it is moved on the next update.
+        Args:
+            beamline_parameter (src.parameters.BeamlineParameter): the parameter
+        """
+        self._changed_parameter_indices.add(self._parameter_indices[beamline_parameter])
+        self._discard_derived_state()
+        self._publish_state()
+
+    def _publish_state(self):
+        """
+        Build the state of the beamline and publish it, unless a change is in progress in which case it is published
+        when the change completes. Publishing is a single assignment so readers see either the old or the new state.
+        """
+        if self._batch_depth > 0:
+            return
+        version = 0 if self._state is None else self._state.version + 1
+        self._state = BeamlineState.of(self._parameters, self._active_mode, version)
+
+    def _parameter_indices_in_mode(self, first_parameter=None):
+        """
+        Args:
+            first_parameter(src.parameters.BeamlineParameter): the parameter after which to include parameters; None for
+            include all
+
+        Returns: the indices, in order, of the parameters in the active mode after the first parameter
+        """
+        mode_indices = self._mode_parameter_indices.get(self._active_mode)
+        if mode_indices is None:
+            mode_indices = self._active_mode.compile(self._parameters)
+            self._mode_parameter_indices[self._active_mode] = mode_indices
+        if first_parameter is None:
+            return mode_indices
+        return mode_indices[bisect_right(mode_indices, self._parameter_indices[first_parameter]) :]
+
+    def evaluate_batch(self, parameter_name, values, other_set_points=None):
+        """
+        Calculate the beam path for a batch of set points without moving the beamline. Each row of the result is the
+        beam path after setting and moving to the set points in that row, i.e. the parameters given and, if they are in
+        the current mode, the parameters in the mode which follow them.
+        Args:
+            parameter_name (str): name of the parameter to set
+            values: the set points of the parameter, one per row
+            other_set_points (dict): the names of other parameters to set and their values; each value is either a
+                single set point or one per row
+
+        Returns (src.array_beam_path.BeamPathArrays): arrays with a row per set point and a column per component of
+            the beam interceptions (y and z) and outgoing beam angles (angle)
+        """
+        set_points = {parameter_name: values}
+        if other_set_points is not None:
+            set_points.update(other_set_points)
+        for name in set_points:
+            set_points[name] = np.asarray(set_points[name])
+        rows = np.broadcast(*set_points.values()).size
+
+        batch = self._current_array_beam_path().create_batch(self.incoming_beam, rows)
+        self.apply_set_points_to_batch(
+            batch,
+            set_points,
+            dict(
+                (beamline_parameter.name, beamline_parameter.sp)
+                for beamline_parameter in self._parameters
+            ),
+        )
+        return batch.calculate_beam_path()
+
+    def apply_set_points_to_batch(self, batch, set_points, current_set_points):
+        """
+        Apply set points to a batch of beamline states as moving to them would, i.e. set the parameters given and, if
+        they are in the current mode, the parameters in the mode which follow them.
+        Args:
+            batch (src.array_beam_path.BeamPathBatch): the batch
+            set_points (dict): the names of the parameters to set and their values; each value is either a single set
+                point or one per row
+            current_set_points (dict): the set point of every parameter by name, which the parameters in the mode that
+                follow are set to
+        """
+        for name in set_points:
+            if name not in self._beamline_parameters:
+                raise KeyError(name)
+
+        first_parameter_in_mode = None
+        for beamline_parameter in self._parameters:
+            if beamline_parameter.name in set_points and self._active_mode.has_beamline_parameter(
+                beamline_parameter
+            ):
+                first_parameter_in_mode = beamline_parameter
+                break
+        if first_parameter_in_mode is None:
+            indices_in_mode = set()
+        else:
+            indices_in_mode = set(self._parameter_indices_in_mode(first_parameter_in_mode))
+
+        for index, beamline_parameter in enumerate(self._parameters):
+            if beamline_parameter.name in set_points:
+                beamline_parameter.apply_to_beam_path_batch(
+                    batch, set_points[beamline_parameter.name]
+                )
+            elif index in indices_in_mode:
+                beamline_parameter.apply_to_beam_path_batch(
+                    batch, current_set_points[beamline_parameter.name]
+                )
 
-            for beamline_parameter in parameters:
-                if beamline_parameter in parameters_in_mode or beamline_parameter.sp_changed:
-                    beamline_parameter.move_no_callback()
+    def snapshot(self):
+        """
+        A snapshot of the state of the beamline; set points can be applied to it to preview moves without changing the
+        beamline. Snapshots of an unchanged beamline share its captured state.
+        Returns (src.beamline_snapshot.BeamlineSnapshot): the snapshot
+        """
+        if self._snapshot_base is None:
+            array_beam_path = self._current_array_beam_path()
+            self._snapshot_base = BeamlineSnapshot(
+                self,
+                array_beam_path,
+                self.incoming_beam,
+                array_beam_path.component_arrays(),
+                dict(
+                    (beamline_parameter.name, beamline_parameter.sp)
+                    for beamline_parameter in self._parameters
+                ),
+            )
+        return self._snapshot_base.snapshot()
+
+    def lookup_table(self):
+        """
+        The lookup table of the beam path over the grid of the active mode. The table depends on the current state of
+        the beamline so is built when first needed after each change.
+        Returns (src.lookup_table.LookupTable): the table
+        """
+        if self._active_mode.lookup_grid is None:
+            raise ValueError("Mode '{}' has no lookup grid".format(self._active_mode.name))
+        table = self._lookup_tables.get(self._active_mode)
+        if table is None:
+            table = LookupTable(self, self._active_mode.lookup_grid)
+            self._lookup_tables[self._active_mode] = table
+        return table
+
+    def sensitivity(self):
+        """
+        The partial derivatives of the positions and angles of the components with respect to each parameter, when it
+        is set and moved in the active mode, at the current state of the beamline. These are built when first needed
+        after each change.
+        Returns (src.sensitivity.Sensitivity): the derivatives
+        """
+        sensitivity = self._sensitivities.get(self._active_mode)
+        if sensitivity is None:
+            moved = np.identity(len(self._parameters), dtype=bool)
+            for index, beamline_parameter in enumerate(self._parameters):
+                if self._active_mode is not None and self._active_mode.has_beamline_parameter(
+                    beamline_parameter
+                ):
+                    moved[self._parameter_indices_in_mode(beamline_parameter), index] = True
+            sensitivity = Sensitivity.calculate(
+                self._components, self._parameters, self._parameter_component_indices, moved
+            )
+            self._sensitivities[self._active_mode] = sensitivity
+        return sensitivity
+
+    def axis_target_derivatives(self):
+        """
+        Returns: the partial derivatives of the target of each driver axis with respect to each parameter, see
+            sensitivity; a list of each axis and its derivatives
+        """
+        sensitivity = self.sensitivity()
+        derivatives = []
+        for driver in self._drivers:
+            derivatives.extend(driver.axis_target_derivatives(sensitivity))
+        return derivatives
+
+    def _current_array_beam_path(self):
+        """
+        Returns (src.array_beam_path.ArrayBeamPath): the array form of the components in their current state
+        """
+        if self._array_beam_path is not None:
+            return self._array_beam_path
+        return ArrayBeamPath(self._components)
 
     def parameter(self, key):
         """
@@ -226,13 +966,48 @@ class Beamline(object):
         for key, value in self._active_mode.initial_setpoints.iteritems():
             self._beamline_parameters[key].sp_no_move = value
 
+    def close(self):
+        """
+        Stop the threads which call the drivers. They are created again if the beamline is moved afterwards.
+        """
+        if self._driver_pool is not None:
+            self._driver_pool.terminate()
+            self._driver_pool.join()
+            self._driver_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _move_drivers(self, move_duration):
-        for driver in self._drivers:
-            driver.perform_move(move_duration)
+        self._map_drivers(
+            lambda driver: driver.perform_move(move_duration, self._axis_snapshots.get(driver))
+        )
 
     def _get_max_move_duration(self):
-        max_move_duration = 0.0
-        for driver in self._drivers:
-            max_move_duration = max(max_move_duration, driver.get_max_move_duration())
+        move_durations = self._map_drivers(
+            lambda driver: driver.get_max_move_duration(self._axis_snapshots.get(driver))
+        )
+        return max([0.0] + move_durations)
 
-        return max_move_duration
+    def _map_drivers(self, function):
+        """
+        Call a function on every driver. With more than one driver they are called concurrently from a pool of threads
+        so that the blocking channel access calls each makes overlap, e.g. so that all the axes start moving within a
+        round trip of each other. Every call is made and finished before the first error raised by any of them is
+        raised.
+        Args:
+            function: the function to call with each driver
+
+        Returns: the result of each call, in the order of the drivers
+        """
+        if len(self._drivers) <= 1:
+            return [function(driver) for driver in self._drivers]
+        if self._driver_pool is None:
+            self._driver_pool = ThreadPool(min(len(self._drivers), self._max_driver_threads))
+        results = [self._driver_pool.apply_async(function, (driver,)) for driver in self._drivers]
+        for result in results:
+            result.wait()
+        return [result.get() for result in results]
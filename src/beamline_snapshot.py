@@ -0,0 +1,118 @@
+"""
+Snapshots of the state of a beamline for previewing moves
+"""
+
+import numpy as np
+
+from src.gemoetry import Position
+
+
+class BeamlineSnapshot(object):
+    """
+    The state of a beamline, its parameter set points and the state of its components, which set points can be applied
+    to without changing the beamline. The state is copy on write: it is never changed in place, applying a set point
+    replaces it, so snapshots taken from each other share it until one of them changes.
+    """
+
+    def __init__(self, beamline, array_beam_path, incoming_beam, state, set_points):
+        """
+        Initializer.
+        Args:
+            beamline (src.beamline.Beamline): the beamline the snapshot is of
+            array_beam_path (src.array_beam_path.ArrayBeamPath): the array form of the beamline's components
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam entering the first component
+            state (src.array_beam_path.ComponentArrays): the state of the components
+            set_points (dict): the set point of every parameter by name
+        """
+        self._beamline = beamline
+        self._array_beam_path = array_beam_path
+        self._incoming_beam = incoming_beam
+        self._state = state
+        self._set_points = set_points
+        self._beam_path = None
+
+    def snapshot(self):
+        """
+        Returns (BeamlineSnapshot): a snapshot of this snapshot, sharing its state
+        """
+        snapshot = BeamlineSnapshot(
+            self._beamline,
+            self._array_beam_path,
+            self._incoming_beam,
+            self._state,
+            self._set_points,
+        )
+        snapshot._beam_path = self._beam_path
+        return snapshot
+
+    def sp(self, name):
+        """
+        Args:
+            name: name of the parameter
+
+        Returns: the set point of the parameter in the snapshot
+        """
+        return self._set_points[name]
+
+    def set_sp(self, name, value):
+        """
+        Set the set point of a parameter in the snapshot and move to it, as setting sp on the parameter would, i.e.
+        the parameters in the mode which follow it are moved too.
+        Args:
+            name: name of the parameter
+            value: the set point
+        """
+        self.set_sps({name: value})
+
+    def set_sps(self, set_points):
+        """
+        Set the set points of several parameters in the snapshot and move to them, as Beamline.evaluate_batch does.
+        Args:
+            set_points (dict): the set point of each parameter to set by name
+        """
+        batch = self._array_beam_path.create_batch(self._incoming_beam, 1, self._state)
+        self._beamline.apply_set_points_to_batch(
+            batch,
+            dict((name, np.asarray([value])) for name, value in set_points.items()),
+            self._set_points,
+        )
+        self._state = batch.state(0)
+        self._set_points = dict(self._set_points)
+        self._set_points.update(set_points)
+        self._beam_path = None
+
+    def beam_path(self):
+        """
+        Returns (src.array_beam_path.BeamPathArrays): the beam path in the snapshot, with a single row
+        """
+        if self._beam_path is None:
+            batch = self._array_beam_path.create_batch(self._incoming_beam, 1, self._state)
+            self._beam_path = batch.calculate_beam_path()
+        return self._beam_path
+
+    def sp_position(self, index):
+        """
+        Args:
+            index: index of the component
+
+        Returns (src.gemoetry.Position): the set point position of the component in the snapshot
+        """
+        return Position(self._state.position_y[index], self._state.position_z[index])
+
+    def angle(self, index):
+        """
+        Args:
+            index: index of the component
+
+        Returns: the angle of the component in the snapshot; only meaningful for reflecting components
+        """
+        return self._state.angle[index]
+
+    def enabled(self, index):
+        """
+        Args:
+            index: index of the component
+
+        Returns: True if the component is enabled in the snapshot; False otherwise
+        """
+        return bool(self._state.enabled[index])
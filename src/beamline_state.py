@@ -0,0 +1,132 @@
+"""
+Immutable states of a beamline which are published for readers
+"""
+
+
+class ParameterState(object):
+    """
+    The state of a beamline parameter. States are immutable.
+    """
+
+    __slots__ = ("_name", "_sp", "_sp_rbv", "_sp_changed")
+
+    def __init__(self, name, sp, sp_rbv, sp_changed):
+        """
+        Initializer.
+        Args:
+            name: name of the parameter
+            sp: the set point
+            sp_rbv: the set point read back value
+            sp_changed: True if the set point has changed since the last move
+        """
+        self._name = name
+        self._sp = sp
+        self._sp_rbv = sp_rbv
+        self._sp_changed = sp_changed
+
+    @property
+    def name(self):
+        """
+        Returns: name of the parameter
+        """
+        return self._name
+
+    @property
+    def sp(self):
+        """
+        Returns: the set point
+        """
+        return self._sp
+
+    @property
+    def sp_rbv(self):
+        """
+        Returns: the set point read back value, i.e. where the last move was instructed to go
+        """
+        return self._sp_rbv
+
+    @property
+    def sp_changed(self):
+        """
+        Returns: True if the set point has changed since the last move
+        """
+        return self._sp_changed
+
+
+class BeamlineState(object):
+    """
+    The state of a beamline between changes. A beamline builds a new state when a change completes and publishes it by
+    replacing the reference to the previous one, so readers holding a state always see a consistent state without
+    locking. States are immutable.
+    """
+
+    __slots__ = ("_version", "_active_mode_name", "_parameters", "_parameters_by_name")
+
+    def __init__(self, version, active_mode_name, parameters):
+        """
+        Initializer.
+        Args:
+            version: number of the state, increasing with each state published
+            active_mode_name: name of the active mode; None if there is none
+            parameters (list[ParameterState]): the states of the parameters, in order
+        """
+        self._version = version
+        self._active_mode_name = active_mode_name
+        self._parameters = tuple(parameters)
+        self._parameters_by_name = dict(
+            (parameter.name, parameter) for parameter in self._parameters
+        )
+
+    @staticmethod
+    def of(beamline_parameters, active_mode, version):
+        """
+        Args:
+            beamline_parameters (list[src.parameters.BeamlineParameter]): the parameters of the beamline, in order
+            active_mode (src.beamline.BeamlineMode): the active mode; None if there is none
+            version: number of the state
+
+        Returns (BeamlineState): the current state of the parameters and mode
+        """
+        return BeamlineState(
+            version,
+            None if active_mode is None else active_mode.name,
+            [
+                ParameterState(
+                    beamline_parameter.name,
+                    beamline_parameter.sp,
+                    beamline_parameter.sp_rbv,
+                    beamline_parameter.sp_changed,
+                )
+                for beamline_parameter in beamline_parameters
+            ],
+        )
+
+    @property
+    def version(self):
+        """
+        Returns: number of the state, increasing with each state published
+        """
+        return self._version
+
+    @property
+    def active_mode_name(self):
+        """
+        Returns: name of the active mode; None if there is none
+        """
+        return self._active_mode_name
+
+    @property
+    def parameters(self):
+        """
+        Returns (tuple[ParameterState]): the states of the parameters, in order
+        """
+        return self._parameters
+
+    def parameter(self, name):
+        """
+        Args:
+            name: name of the parameter
+
+        Returns (ParameterState): the state of the parameter
+        """
+        return self._parameters_by_name[name]
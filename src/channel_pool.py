@@ -0,0 +1,93 @@
+"""
+Connection of the channels of a beamline ahead of their first use
+"""
+
+from multiprocessing.pool import ThreadPool
+
+from src.motor_pv_wrapper import default_channel_access
+
+# Default time in seconds to wait for each channel to connect
+DEFAULT_CONNECTION_TIMEOUT = 5.0
+
+# Default maximum number of channels connected at once
+DEFAULT_MAX_CONNECTING = 32
+
+
+class ChannelPool(object):
+    """
+    Connects channels in parallel, e.g. all the motor PVs of a beamline when it is built, so that the first reads and
+    writes of them do not wait for the channels to connect one after another. The channel access implementation keeps
+    the connected channels, which are then reused for the reads and writes.
+    """
+
+    def __init__(
+        self,
+        channel_access=None,
+        timeout=DEFAULT_CONNECTION_TIMEOUT,
+        max_connecting=DEFAULT_MAX_CONNECTING,
+    ):
+        """
+        Initializer.
+        Args:
+            channel_access: the channel access implementation, with the interface of genie python's CaChannelWrapper;
+                None for CaChannelWrapper
+            timeout: time in seconds to wait for each channel to connect
+            max_connecting: maximum number of channels connected at once
+        """
+        if channel_access is None:
+            channel_access = default_channel_access()
+        self._channel_access = channel_access
+        self._timeout = timeout
+        self._max_connecting = max_connecting
+        self._connected = {}
+
+    def connect(self, channel_names):
+        """
+        Connect channels in parallel, waiting until each has connected or timed out. Channels already connected are
+        not connected again.
+        Args:
+            channel_names: names of the channels to connect, e.g. a generator
+
+        Returns: True if all the channels are connected; False otherwise
+        """
+        channel_names = list(channel_names)
+        to_connect = []
+        seen = set()
+        for name in channel_names:
+            if name not in seen and not self._connected.get(name):
+                to_connect.append(name)
+            seen.add(name)
+        if to_connect:
+            pool = ThreadPool(min(len(to_connect), self._max_connecting))
+            try:
+                connected = pool.map(self._connect_channel, to_connect)
+            finally:
+                pool.close()
+                pool.join()
+            self._connected.update(zip(to_connect, connected))
+        return all(self._connected[name] for name in channel_names)
+
+    def _connect_channel(self, name):
+        """
+        Args:
+            name: name of the channel
+
+        Returns: True if the channel connected; False otherwise
+        """
+        try:
+            return bool(self._channel_access.pv_exists(name, timeout=self._timeout))
+        except Exception:
+            return False
+
+    def connection_status(self):
+        """
+        Returns (dict): True for each channel which is connected and False for each which failed to connect, by name
+        """
+        return dict(self._connected)
+
+    @property
+    def all_connected(self):
+        """
+        Returns: True if every channel the pool has connected is connected; False otherwise
+        """
+        return all(self._connected.values())
@@ -2,7 +2,8 @@
 Components on a beam
 """
 
-from src.gemoetry import PositionAndAngle
+from src.beam_transform import BeamTransform
+from src.gemoetry import PositionAndAngle, reflect_direction, unit_direction
 
 
 class Component(object):
@@ -18,11 +19,14 @@ class Component(object):
             movement_strategy (VerticalMovement): strategy for calculating the interception between the movement of the
             component and the incoming beam
         """
-        self.incoming_beam = None
+        self._incoming_beam = None
         self._movement_strategy = movement_strategy
         self.after_beam_path_update_listener = lambda x: None
         self._enabled = True
         self._name = name
+        # incremented whenever anything the results derived from the component depend on changes
+        self._state_version = 0
+        self._memoized_results = {}
 
     @property
     def enabled(self):
@@ -39,6 +43,7 @@ class Component(object):
             enabled: The modified enabled status
         """
         self._enabled = enabled
+        self._state_version += 1
         self.after_beam_path_update_listener(self)
 
     @property
@@ -48,6 +53,37 @@ class Component(object):
         """
         return self._name
 
+    @property
+    def movement_strategy(self):
+        """
+        Returns: the strategy describing the movement of the component
+        """
+        return self._movement_strategy
+
+    @property
+    def incoming_beam(self):
+        """
+        Returns (PositionAndAngle): the incoming beam
+        """
+        return self._incoming_beam
+
+    @incoming_beam.setter
+    def incoming_beam(self, incoming_beam):
+        """
+        Args:
+            incoming_beam(PositionAndAngle): incoming beam
+        """
+        self._incoming_beam = incoming_beam
+        self._state_version += 1
+
+    @property
+    def state_version(self):
+        """
+        Returns: a number which changes whenever the incoming beam, angle, enabled status or position of the component
+            changes
+        """
+        return self._state_version
+
     def set_incoming_beam(self, incoming_beam):
         """
         Set the incoming beam for the component
@@ -56,6 +92,23 @@ class Component(object):
         """
         self.incoming_beam = incoming_beam
 
+    def _memoize(self, key, calculate):
+        """
+        Return a result derived from the component, only calculating it if the state of the component has changed
+        since it was last calculated.
+        Args:
+            key: key identifying the result
+            calculate: function to calculate the result
+
+        Returns: the result
+        """
+        memoized = self._memoized_results.get(key)
+        if memoized is not None and memoized[0] == self._state_version:
+            return memoized[1]
+        result = calculate()
+        self._memoized_results[key] = (self._state_version, result)
+        return result
+
     def get_outgoing_beam(self):
         """
         Returns the outgoing beam. This class is overiden by components which affect the beam angle.
@@ -69,7 +122,26 @@ class Component(object):
         Returns: the position at the point where the components possible movement intercepts the beam
 
         """
-        return self._movement_strategy.calculate_interception(self.incoming_beam)
+        return self._memoize(
+            "interception",
+            lambda: self._movement_strategy.calculate_interception(self._incoming_beam),
+        )
+
+    def beam_transform(self):
+        """
+        Returns (src.beam_transform.BeamTransform): the transform from the incoming to the outgoing beam, valid for all
+            incoming beams parallel to the last set incoming beam. This is overridden by components which affect the
+            beam.
+        """
+        return BeamTransform.identity(self.incoming_beam.angle)
+
+    def interception_transform(self):
+        """
+        Returns (src.beam_transform.BeamTransform): the transform from the incoming beam to the position where the
+            component's possible movement intercepts it, valid for all incoming beams parallel to the last set
+            incoming beam
+        """
+        return self._movement_strategy.interception_transform(self.incoming_beam)
 
     def set_position_relative_to_beam(self, value):
         """
@@ -82,6 +154,7 @@ class Component(object):
         self._movement_strategy.set_position_relative_to_beam(
             self.calculate_beam_interception(), value
         )
+        self._state_version += 1
 
     def sp_position(self):
         """
@@ -89,6 +162,22 @@ class Component(object):
         """
         return self._movement_strategy.sp_position()
 
+    def capture_state(self):
+        """
+        Returns: the state of the component, which can be restored later
+        """
+        return self._incoming_beam, self._enabled, self._movement_strategy.capture_state()
+
+    def restore_state(self, state):
+        """
+        Restore the component to a state previously captured from it. The beam path update listener is not notified.
+        Args:
+            state: the state
+        """
+        self._incoming_beam, self._enabled, movement_state = state
+        self._movement_strategy.restore_state(movement_state)
+        self._state_version += 1
+
 
 class TiltingJaws(Component):
     """
@@ -110,7 +199,9 @@ class TiltingJaws(Component):
         """
         Returns: the angle to tilt so the jaws are perpendicular to the beam.
         """
-        return self.get_outgoing_beam().angle + self.component_to_beam_angle
+        return self._memoize(
+            "tilt angle", lambda: self.get_outgoing_beam().angle + self.component_to_beam_angle
+        )
 
 
 class ReflectingComponent(Component):
@@ -127,6 +218,7 @@ class ReflectingComponent(Component):
         """
         super(ReflectingComponent, self).__init__(name, movement_strategy)
         self._angle = 0
+        self._surface_direction = None
 
     @property
     def angle(self):
@@ -143,6 +235,8 @@ class ReflectingComponent(Component):
             angle: The modified angle
         """
         self._angle = angle
+        self._surface_direction = None
+        self._state_version += 1
         self.after_beam_path_update_listener(self)
 
     def get_outgoing_beam(self):
@@ -152,10 +246,51 @@ class ReflectingComponent(Component):
         if not self._enabled:
             return self.incoming_beam
 
+        return self._memoize("outgoing beam", self._calculate_outgoing_beam)
+
+    def _calculate_outgoing_beam(self):
+        """
+        Returns: the outgoing beam when the component is enabled
+        """
         target_position = self.calculate_beam_interception()
         angle_between_beam_and_component = self._angle - self.incoming_beam.angle
         angle = angle_between_beam_and_component * 2 + self.incoming_beam.angle
-        return PositionAndAngle(target_position.y, target_position.z, angle)
+        if self._surface_direction is None:
+            self._surface_direction = unit_direction(self._angle)
+        # the direction is reflected by vector arithmetic so no trigonometric functions are needed to propagate the
+        # beam; only the surface direction is calculated from the angle, when it changes
+        direction = reflect_direction(self.incoming_beam.direction, self._surface_direction)
+        return PositionAndAngle.from_direction(
+            target_position.y, target_position.z, angle, direction
+        )
+
+    def beam_transform(self):
+        """
+        Returns (src.beam_transform.BeamTransform): the transform from the incoming to the outgoing beam, valid for all
+            incoming beams parallel to the last set incoming beam
+        """
+        if not self._enabled:
+            return super(ReflectingComponent, self).beam_transform()
+
+        angle_between_beam_and_component = self._angle - self.incoming_beam.angle
+        angle = angle_between_beam_and_component * 2 + self.incoming_beam.angle
+        return self.interception_transform().with_angle(angle)
+
+    def capture_state(self):
+        """
+        Returns: the state of the component, which can be restored later
+        """
+        return super(ReflectingComponent, self).capture_state(), self._angle
+
+    def restore_state(self, state):
+        """
+        Restore the component to a state previously captured from it. The beam path update listener is not notified.
+        Args:
+            state: the state
+        """
+        component_state, self._angle = state
+        self._surface_direction = None
+        super(ReflectingComponent, self).restore_state(component_state)
 
     def set_angle_relative_to_beam(self, angle):
         """
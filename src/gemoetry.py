@@ -2,15 +2,68 @@
 Objects and classes that handle geometry
 """
 
+from math import copysign, cos, fabs, radians, sin
+
+# Tolerance to use when comparing an angle with another angle
+ANGULAR_TOLERANCE = 1e-12
+
+
+def unit_direction(angle):
+    """
+    The unit vector pointing along an angle. Angles within the angular tolerance of the axes give vectors exactly
+    along the axes so that calculations with lines along the axes are exact.
+    Args:
+        angle: clockwise angle measured from the horizon in degrees
+
+    Returns: the z and y components of the unit vector
+    """
+    angle_mod = angle % 180.0
+    if fabs(angle_mod) <= ANGULAR_TOLERANCE:
+        return copysign(1.0, cos(radians(angle))), 0.0
+    elif fabs(angle_mod - 90.0) <= ANGULAR_TOLERANCE:
+        return 0.0, copysign(1.0, sin(radians(angle)))
+    return cos(radians(angle)), sin(radians(angle))
+
+
+def reflect_direction(direction, surface_direction):
+    """
+    Reflect a direction from a surface by vector arithmetic, so no trigonometric functions are needed.
+    Args:
+        direction: the z and y components of the unit vector to reflect
+        surface_direction: the z and y components of the unit vector along the reflecting surface
+
+    Returns: the z and y components of the reflected unit vector
+    """
+    direction_z, direction_y = direction
+    surface_z, surface_y = surface_direction
+    along_surface = 2 * (direction_z * surface_z + direction_y * surface_y)
+    return along_surface * surface_z - direction_z, along_surface * surface_y - direction_y
+
 
 class Position(object):
     """
-    The beam position and direction
+    The beam position and direction. Positions are immutable.
     """
 
+    __slots__ = ("_y", "_z")
+
     def __init__(self, y, z):
-        self.z = float(z)
-        self.y = float(y)
+        self._z = float(z)
+        self._y = float(y)
+
+    @property
+    def y(self):
+        """
+        Returns: y position in room co-ordinates
+        """
+        return self._y
+
+    @property
+    def z(self):
+        """
+        Returns: z position in room co-ordinates
+        """
+        return self._z
 
     def __repr__(self):
         return "Position(x, {}, {})".format(self.y, self.z)
@@ -18,9 +71,12 @@ class Position(object):
 
 class PositionAndAngle(Position):
     """
-    The beam position and direction
+    The beam position and direction. These are immutable so the unit vector along the angle is calculated once, when
+    first needed, and cached.
     """
 
+    __slots__ = ("_angle", "_direction")
+
     def __init__(self, y, z, angle):
         """
 
@@ -30,7 +86,53 @@ class PositionAndAngle(Position):
             angle: clockwise angle measured from the horizon (90 to -90 with 0 pointing away from the source)
         """
         super(PositionAndAngle, self).__init__(y, z)
-        self.angle = float(angle)
+        self._angle = float(angle)
+        self._direction = None
+
+    @property
+    def angle(self):
+        """
+        Returns: clockwise angle measured from the horizon in degrees
+        """
+        return self._angle
+
+    @property
+    def direction(self):
+        """
+        Returns: the z and y components of the unit vector along the angle, see unit_direction
+        """
+        if self._direction is None:
+            self._direction = unit_direction(self._angle)
+        return self._direction
+
+    @staticmethod
+    def from_direction(y, z, angle, direction):
+        """
+        Args:
+            y: y position in room co-ordinates
+            z: z position in room co-ordinates
+            angle: clockwise angle measured from the horizon in degrees
+            direction: the z and y components of the unit vector along the angle, when already known
+
+        Returns (PositionAndAngle): a position and angle whose direction is the one given rather than calculated from
+            the angle
+        """
+        position_and_angle = PositionAndAngle(y, z, angle)
+        position_and_angle._direction = direction
+        return position_and_angle
+
+    def with_position(self, y, z):
+        """
+        Args:
+            y: y position in room co-ordinates
+            z: z position in room co-ordinates
+
+        Returns (PositionAndAngle): a position and angle at the given position with this angle; the direction is
+            shared if it has already been calculated
+        """
+        moved = PositionAndAngle(y, z, self._angle)
+        moved._direction = self._direction
+        return moved
 
     def __repr__(self):
         return "PositionAndAngle({}, {}, {})".format(self.z, self.y, self.angle)
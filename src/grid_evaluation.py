@@ -0,0 +1,183 @@
+"""
+Evaluation of the beam path over large grids of configurations in parallel processes
+"""
+
+import multiprocessing
+
+import numpy as np
+
+from src.array_beam_path import BeamPathArrays
+
+# default number of grid points evaluated by a process at a time
+DEFAULT_CHUNK_SIZE = 10000
+
+# the beamline factory and grid of a worker process, set when the process starts, and the beamline of each mode,
+# built by the process when it first evaluates a chunk in the mode
+_worker_beamline_factory = None
+_worker_grid = None
+_worker_beamlines = {}
+
+
+class GridChunk(object):
+    """
+    The beam path for a contiguous run of the points of a grid in one mode.
+    """
+
+    def __init__(self, mode_name, start, stop, beam_path):
+        """
+        Initializer.
+        Args:
+            mode_name: name of the mode of the beamline
+            start: index of the first point of the run, with the points of the grid in C order
+            stop: index after the last point of the run
+            beam_path (src.array_beam_path.BeamPathArrays): the beam path with a row per point
+        """
+        self.mode_name = mode_name
+        self.start = start
+        self.stop = stop
+        self.beam_path = beam_path
+
+
+class GridEvaluation(object):
+    """
+    The beam path over a grid of set points in one or more modes. The grid points are split into chunks which are
+    evaluated by a pool of processes, each of which builds its own beamline for each mode from a factory, and results
+    are returned as they are calculated.
+    """
+
+    def __init__(self, beamline_factory, grid, mode_names, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Initializer.
+        Args:
+            beamline_factory: a function taking no arguments which returns the beamline (src.beamline.Beamline) with
+                its incoming beam set; this is sent to each process so must be picklable, e.g. a module level function
+            grid (list[tuple]): the name of each parameter of the grid and its grid values
+            mode_names (list[str]): names of the modes to evaluate the grid in; the model of a newly built beamline is
+                moved to each mode's initial set points before the grid is evaluated in it
+            chunk_size: number of grid points evaluated by a process at a time
+        """
+        self._beamline_factory = beamline_factory
+        self._grid = [(name, np.asarray(values, dtype=float)) for name, values in grid]
+        self._mode_names = list(mode_names)
+        self._chunk_size = chunk_size
+
+    @property
+    def shape(self):
+        """
+        Returns: the shape of the grid; the number of values of each parameter
+        """
+        return tuple(values.shape[0] for _, values in self._grid)
+
+    def chunks(self, processes=None):
+        """
+        Evaluate the grid, returning the results as they are calculated.
+        Args:
+            processes: number of processes to use; None for the number of CPUs
+
+        Returns: a generator of the evaluated chunks (GridChunk), in no particular order
+        """
+        size = int(np.prod(self.shape))
+        tasks = [
+            (mode_name, start, min(start + self._chunk_size, size))
+            for mode_name in self._mode_names
+            for start in range(0, size, self._chunk_size)
+        ]
+        pool = _process_context().Pool(
+            processes, _initialise_worker, (self._beamline_factory, self._grid)
+        )
+        try:
+            for chunk in pool.imap_unordered(_evaluate_chunk, tasks):
+                yield chunk
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def evaluate(self, processes=None):
+        """
+        Evaluate the grid.
+        Args:
+            processes: number of processes to use; None for the number of CPUs
+
+        Returns (dict): the beam path (src.array_beam_path.BeamPathArrays) by mode name; each array has the shape of the
+            grid followed by a column per component
+        """
+        arrays = {}
+        for chunk in self.chunks(processes):
+            mode_arrays = arrays.setdefault(chunk.mode_name, {})
+            for name, values in vars(chunk.beam_path).items():
+                if values is None:
+                    continue
+                if name not in mode_arrays:
+                    mode_arrays[name] = np.empty((int(np.prod(self.shape)), values.shape[-1]))
+                mode_arrays[name][chunk.start : chunk.stop] = values
+
+        results = {}
+        for mode_name, mode_arrays in arrays.items():
+            results[mode_name] = BeamPathArrays(
+                **dict(
+                    (name, values.reshape(self.shape + (-1,)))
+                    for name, values in mode_arrays.items()
+                )
+            )
+        return results
+
+
+def _process_context():
+    """
+    Returns: the context in which to start worker processes; they are spawned rather than forked where possible, so
+        they do not inherit the state of threads running in this process, e.g. those which call beamline drivers, which
+        can deadlock them
+    """
+    if hasattr(multiprocessing, "get_context"):
+        return multiprocessing.get_context("spawn")
+    return multiprocessing
+
+
+def _initialise_worker(beamline_factory, grid):
+    """
+    Set the beamline factory and grid of a worker process.
+    Args:
+        beamline_factory: function which builds the beamline
+        grid: the name of each parameter of the grid and its grid values
+    """
+    global _worker_beamline_factory, _worker_grid
+    _worker_beamline_factory = beamline_factory
+    _worker_grid = grid
+    _worker_beamlines.clear()
+
+
+def _mode_beamline(mode_name):
+    """
+    The beamline of a worker process in a mode, built when first needed. Each mode has its own beamline so that set
+    points left by evaluating other modes, which the mode's initial set points do not cover, can not change its results.
+    Args:
+        mode_name: name of the mode
+
+    Returns (src.beamline.Beamline): the beamline in the mode
+    """
+    beamline = _worker_beamlines.get(mode_name)
+    if beamline is None:
+        beamline = _worker_beamline_factory()
+        # the model, but not the drivers, is moved so that the initial set points of the mode take effect
+        beamline.active_mode = beamline.mode(mode_name.upper())
+        beamline.update_beamline_parameters()
+        _worker_beamlines[mode_name] = beamline
+    return beamline
+
+
+def _evaluate_chunk(task):
+    """
+    Evaluate a chunk of the grid in a worker process.
+    Args:
+        task: the mode name and the indices of the first and after the last grid point of the chunk
+
+    Returns (GridChunk): the evaluated chunk
+    """
+    mode_name, start, stop = task
+    beamline = _mode_beamline(mode_name)
+    shape = tuple(values.shape[0] for _, values in _worker_grid)
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    set_points = dict((name, values[index]) for (name, values), index in zip(_worker_grid, indices))
+    first_name = _worker_grid[0][0]
+    beam_path = beamline.evaluate_batch(first_name, set_points.pop(first_name), set_points)
+    return GridChunk(mode_name, start, stop, beam_path)
@@ -5,6 +5,42 @@ The driving layer communicates between the component layer and underlying pvs.
 import math
 
 
+class AxisSnapshot(object):
+    """
+    The values and maximum velocities of axes, read once at the start of a move so that planning the move and
+    performing it use the same readings rather than reading the axes again.
+    """
+
+    def __init__(self, readings):
+        """
+        Constructor.
+        :param readings (dict): The value and maximum velocity of each axis
+        """
+        self._readings = readings
+
+    @staticmethod
+    def read(axes):
+        """
+        :param axes (list[src.motor_pv_wrapper.MotorPVWrapper]): The axes to read
+        :return (AxisSnapshot): The snapshot of the axes, reading each of their values and maximum velocities once
+        """
+        return AxisSnapshot(dict((axis, (axis.value, axis.max_velocity)) for axis in axes))
+
+    def value(self, axis):
+        """
+        :param axis (src.motor_pv_wrapper.MotorPVWrapper): An axis in the snapshot
+        :return: The value of the axis
+        """
+        return self._readings[axis][0]
+
+    def max_velocity(self, axis):
+        """
+        :param axis (src.motor_pv_wrapper.MotorPVWrapper): An axis in the snapshot
+        :return: The maximum velocity of the axis
+        """
+        return self._readings[axis][1]
+
+
 class IocDriver(object):
     """
     Drives an actual motor IOC based on a component in the beamline model.
@@ -13,18 +49,57 @@ class IocDriver(object):
     def __init__(self, component):
         self._component = component
 
-    def get_max_move_duration(self):
+    def axes(self):
         """
         This should be overridden in the subclass
+        :return: The axes driven by this driver
+        """
+        raise NotImplementedError()
+
+    def read_axes(self):
+        """
+        :return (AxisSnapshot): The current values and maximum velocities of the axes driven by this driver
+        """
+        return AxisSnapshot.read(self.axes())
+
+    def get_max_move_duration(self, axis_snapshot=None):
+        """
+        This should be overridden in the subclass
+        :param axis_snapshot (AxisSnapshot): The axes to plan the move from; None to read them
         Returns: The maximum duration of the requested move for all associated axes
         """
         raise NotImplementedError()
 
-    def perform_move(self, move_duration):
+    def perform_move(self, move_duration, axis_snapshot=None):
         """
         This should be overridden in the subclass. Tells the driver to perform a move to the component set points within
         a given duration
         :param move_duration: The duration in which to perform this move
+        :param axis_snapshot (AxisSnapshot): The axes to perform the move from; None to read them
+        """
+        raise NotImplementedError()
+
+    def _move_axis(self, axis, target, distance, move_duration, deadband, axis_snapshot):
+        """
+        Move an axis to its target within the move duration, unless it is already within its deadband of the target.
+        :param axis (src.motor_pv_wrapper.MotorPVWrapper): The axis to move
+        :param target: The target position of the axis
+        :param distance: The distance of the move from which the velocity of the axis is calculated
+        :param move_duration: The desired duration of the move; if this is zero the velocity is not changed
+        :param deadband: The distance from the target within which the axis is not moved; None to always move it
+        :param axis_snapshot (AxisSnapshot): The axes the move is performed from
+        """
+        if deadband is not None and math.fabs(axis_snapshot.value(axis) - target) <= deadband:
+            return
+        if move_duration > 0:
+            axis.velocity = distance / move_duration
+        axis.value = target
+
+    def axis_target_derivatives(self, sensitivity):
+        """
+        This should be overridden in the subclass.
+        :param sensitivity (src.sensitivity.Sensitivity): The derivatives of the beamline components
+        :return: Each axis and the derivatives of its target with respect to each beamline parameter
         """
         raise NotImplementedError()
 
@@ -34,34 +109,66 @@ class HeightDriver(IocDriver):
     Drives a component with vertical movement
     """
 
-    def __init__(self, component, height_axis):
+    def __init__(self, component, height_axis, height_deadband=None):
         """
         Constructor.
         :param component (src.components.PassiveComponent): The component providing the values for the axes
         :param height_axis (src.motor_pv_wrapper.MotorPVWrapper): The PV that this driver controls.
+        :param height_deadband: The distance from its target within which the height axis is not moved; None to
+            always move it
         """
         super(HeightDriver, self).__init__(component)
         self._height_axis = height_axis
+        self._height_deadband = height_deadband
+
+    def axes(self):
+        """
+        :return: The axes driven by this driver
+        """
+        return [self._height_axis]
 
-    def _get_distance_height(self):
+    def _get_height_move(self, axis_snapshot):
         """
-        :return: The distance between the target component position and the actual motor position in y.
+        :param axis_snapshot (AxisSnapshot): The axes the move is from
+        :return: The target component position in y and the distance between it and the actual motor position.
         """
-        return math.fabs(self._height_axis.value - self._component.sp_position().y)
+        target_height = self._component.sp_position().y
+        return target_height, math.fabs(axis_snapshot.value(self._height_axis) - target_height)
 
-    def get_max_move_duration(self):
+    def get_max_move_duration(self, axis_snapshot=None):
         """
+        :param axis_snapshot (AxisSnapshot): The axes to plan the move from; None to read them
         :return: The expected duration of a move based on move distance and axis speed.
         """
-        return self._get_distance_height() / self._height_axis.max_velocity
+        if axis_snapshot is None:
+            axis_snapshot = self.read_axes()
+        _, distance_height = self._get_height_move(axis_snapshot)
+        return distance_height / axis_snapshot.max_velocity(self._height_axis)
 
-    def perform_move(self, move_duration):
+    def perform_move(self, move_duration, axis_snapshot=None):
         """
         Tells the height axis to move to the setpoint within a given time frame.
         :param move_duration: The desired duration of the move.
+        :param axis_snapshot (AxisSnapshot): The axes to perform the move from; None to read them
         """
-        self._height_axis.velocity = self._get_distance_height() / move_duration
-        self._height_axis.value = self._component.sp_position().y
+        if axis_snapshot is None:
+            axis_snapshot = self.read_axes()
+        target_height, distance_height = self._get_height_move(axis_snapshot)
+        self._move_axis(
+            self._height_axis,
+            target_height,
+            distance_height,
+            move_duration,
+            self._height_deadband,
+            axis_snapshot,
+        )
+
+    def axis_target_derivatives(self, sensitivity):
+        """
+        :param sensitivity (src.sensitivity.Sensitivity): The derivatives of the beamline components
+        :return: The height axis and the derivatives of its target with respect to each beamline parameter
+        """
+        return [(self._height_axis, sensitivity.component(self._component).height)]
 
 
 class HeightAndTiltDriver(HeightDriver):
@@ -71,39 +178,80 @@ class HeightAndTiltDriver(HeightDriver):
 
     ANGULAR_OFFSET = 90.0
 
-    def __init__(self, component, height_axis, tilt_axis):
+    def __init__(self, component, height_axis, tilt_axis, height_deadband=None, tilt_deadband=None):
         """
         Constructor.
         :param component (src.components.TiltingJaws): The component providing the values for the axes
         :param height_axis (src.motor_pv_wrapper.MotorPVWrapper): The PV for the height motor axis
         :param tilt_axis (src.motor_pv_wrapper.MotorPVWrapper): The PV for the tilt motor axis
+        :param height_deadband: The distance from its target within which the height axis is not moved; None to
+            always move it
+        :param tilt_deadband: The angle from its target within which the tilt axis is not moved; None to always move it
         """
-        super(HeightAndTiltDriver, self).__init__(component, height_axis)
+        super(HeightAndTiltDriver, self).__init__(component, height_axis, height_deadband)
         self._tilt_axis = tilt_axis
+        self._tilt_deadband = tilt_deadband
+
+    def axes(self):
+        """
+        :return: The axes driven by this driver
+        """
+        return [self._height_axis, self._tilt_axis]
 
-    def _target_angle_perpendicular(self):
-        return self._component.calculate_tilt_angle() - self.ANGULAR_OFFSET
+    def _get_tilt_move(self, axis_snapshot):
+        """
+        :param axis_snapshot (AxisSnapshot): The axes the move is from
+        :return: The target tilt angle and the distance the tilt axis moves.
+        """
+        tilt_angle = self._component.calculate_tilt_angle()
+        target_angle_perpendicular = tilt_angle - self.ANGULAR_OFFSET
+        return tilt_angle, math.fabs(
+            axis_snapshot.value(self._tilt_axis) - target_angle_perpendicular
+        )
 
-    def get_max_move_duration(self):
+    def get_max_move_duration(self, axis_snapshot=None):
         """
+        :param axis_snapshot (AxisSnapshot): The axes to plan the move from; None to read them
         :return: The expected duration of a move based on move distance and axis speed for the slowest axis.
         """
-        vertical_move_duration = self._get_distance_height() / self._height_axis.max_velocity
-        distance_to_move = math.fabs(self._tilt_axis.value - self._target_angle_perpendicular())
-        angular_move_duration = distance_to_move / self._tilt_axis.max_velocity
+        if axis_snapshot is None:
+            axis_snapshot = self.read_axes()
+        vertical_move_duration = super(HeightAndTiltDriver, self).get_max_move_duration(
+            axis_snapshot
+        )
+        _, distance_to_move = self._get_tilt_move(axis_snapshot)
+        angular_move_duration = distance_to_move / axis_snapshot.max_velocity(self._tilt_axis)
         return max(vertical_move_duration, angular_move_duration)
 
-    def perform_move(self, move_duration):
+    def perform_move(self, move_duration, axis_snapshot=None):
         """
         Tells the height and tilt axes to move to the setpoint within a given time frame.
         :param move_duration: The desired duration of the move.
+        :param axis_snapshot (AxisSnapshot): The axes to perform the move from; None to read them
         """
-        self._height_axis.velocity = self._get_distance_height() / move_duration
-        self._tilt_axis.velocity = (
-            math.fabs(self._tilt_axis.value - self._target_angle_perpendicular()) / move_duration
+        if axis_snapshot is None:
+            axis_snapshot = self.read_axes()
+        super(HeightAndTiltDriver, self).perform_move(move_duration, axis_snapshot)
+        tilt_angle, distance_to_move = self._get_tilt_move(axis_snapshot)
+        self._move_axis(
+            self._tilt_axis,
+            tilt_angle,
+            distance_to_move,
+            move_duration,
+            self._tilt_deadband,
+            axis_snapshot,
         )
-        self._height_axis.value = self._component.sp_position().y
-        self._tilt_axis.value = self._component.calculate_tilt_angle()
+
+    def axis_target_derivatives(self, sensitivity):
+        """
+        :param sensitivity (src.sensitivity.Sensitivity): The derivatives of the beamline components
+        :return: The height and tilt axes and the derivatives of their targets with respect to each beamline parameter
+        """
+        component_sensitivity = sensitivity.component(self._component)
+        return [
+            (self._height_axis, component_sensitivity.height),
+            (self._tilt_axis, component_sensitivity.beam_angle),
+        ]
 
 
 class HeightAndAngleDriver(HeightDriver):
@@ -111,35 +259,77 @@ class HeightAndAngleDriver(HeightDriver):
     Drives a component that has variable height and angle.
     """
 
-    def __init__(self, component, height_axis, angle_axis):
+    def __init__(
+        self, component, height_axis, angle_axis, height_deadband=None, angle_deadband=None
+    ):
         """
         Constructor.
         :param component (src.components.ActiveComponent): The component providing the values for the axes
         :param height_axis(src.motor_pv_wrapper.MotorPVWrapper): The PV for the height motor axis
         :param angle_axis(src.motor_pv_wrapper.MotorPVWrapper): The PV for the angle motor axis
+        :param height_deadband: The distance from its target within which the height axis is not moved; None to
+            always move it
+        :param angle_deadband: The angle from its target within which the angle axis is not moved; None to always move
+            it
         """
-        super(HeightAndAngleDriver, self).__init__(component, height_axis)
+        super(HeightAndAngleDriver, self).__init__(component, height_axis, height_deadband)
         self._angle_axis = angle_axis
+        self._angle_deadband = angle_deadband
+
+    def axes(self):
+        """
+        :return: The axes driven by this driver
+        """
+        return [self._height_axis, self._angle_axis]
 
-    def get_max_move_duration(self):
+    def _get_angle_move(self, axis_snapshot):
         """
+        :param axis_snapshot (AxisSnapshot): The axes the move is from
+        :return: The target angle and the distance between it and the actual motor angle.
+        """
+        target_angle = self._component.angle
+        return target_angle, math.fabs(axis_snapshot.value(self._angle_axis) - target_angle)
+
+    def get_max_move_duration(self, axis_snapshot=None):
+        """
+        :param axis_snapshot (AxisSnapshot): The axes to plan the move from; None to read them
         :return: The expected duration of a move based on move distance and axis speed for the slowest axis.
         """
-        height_to_move = math.fabs(self._height_axis.value - self._component.sp_position().y)
-        vertical_move_duration = height_to_move / self._height_axis.max_velocity
-        angle_to_move = math.fabs(self._angle_axis.value - self._component.angle)
-        angular_move_duration = angle_to_move / self._angle_axis.max_velocity
+        if axis_snapshot is None:
+            axis_snapshot = self.read_axes()
+        vertical_move_duration = super(HeightAndAngleDriver, self).get_max_move_duration(
+            axis_snapshot
+        )
+        _, angle_to_move = self._get_angle_move(axis_snapshot)
+        angular_move_duration = angle_to_move / axis_snapshot.max_velocity(self._angle_axis)
         return max(vertical_move_duration, angular_move_duration)
 
-    def perform_move(self, move_duration):
+    def perform_move(self, move_duration, axis_snapshot=None):
         """
         Tells the height and angle axes to move to the setpoint within a given time frame.
         :param move_duration: The desired duration of the move.
+        :param axis_snapshot (AxisSnapshot): The axes to perform the move from; None to read them
         """
-        height_to_move = math.fabs(self._height_axis.value - self._component.sp_position().y)
-        self._height_axis.velocity = height_to_move / move_duration
-        self._angle_axis.velocity = (
-            math.fabs(self._angle_axis.value - self._component.angle) / move_duration
+        if axis_snapshot is None:
+            axis_snapshot = self.read_axes()
+        super(HeightAndAngleDriver, self).perform_move(move_duration, axis_snapshot)
+        target_angle, angle_to_move = self._get_angle_move(axis_snapshot)
+        self._move_axis(
+            self._angle_axis,
+            target_angle,
+            angle_to_move,
+            move_duration,
+            self._angle_deadband,
+            axis_snapshot,
         )
-        self._height_axis.value = self._component.sp_position().y
-        self._angle_axis.value = self._component.angle
+
+    def axis_target_derivatives(self, sensitivity):
+        """
+        :param sensitivity (src.sensitivity.Sensitivity): The derivatives of the beamline components
+        :return: The height and angle axes and the derivatives of their targets with respect to each beamline parameter
+        """
+        component_sensitivity = sensitivity.component(self._component)
+        return [
+            (self._height_axis, component_sensitivity.height),
+            (self._angle_axis, component_sensitivity.angle),
+        ]
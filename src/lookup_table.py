@@ -0,0 +1,135 @@
+"""
+Precomputed tables of the beam path over a grid of parameter set points
+"""
+
+import itertools
+
+import numpy as np
+
+from src.array_beam_path import BeamPathArrays
+
+# the arrays of BeamPathArrays which are tabulated, in the order they are stored
+_TABULATED = ("incoming_y", "incoming_z", "incoming_angle", "y", "z", "angle")
+
+
+class LookupTable(object):
+    """
+    The beam path through a beamline calculated on a grid of set points of one or more parameters, from which the beam
+    path at set points within the grid is found by multilinear interpolation. This is much faster than calculating it
+    but only approximate; the error is estimated when the table is built. Set points outside the grid are calculated
+    exactly.
+    """
+
+    def __init__(self, beamline, grid):
+        """
+        Initializer. Builds the table by evaluating the beam path at every point of the grid, see
+        src.beamline.Beamline.evaluate_batch, and estimates the error by also evaluating it at the centre of every cell.
+        Args:
+            beamline (src.beamline.Beamline): the beamline
+            grid (list[tuple]): the name of each parameter of the grid and its grid values, in increasing order; there
+                must be at least two values for each parameter
+        """
+        self._beamline = beamline
+        self._names = [name for name, _ in grid]
+        self._axes = [np.asarray(values, dtype=float) for _, values in grid]
+        for name, axis in zip(self._names, self._axes):
+            if axis.ndim != 1 or axis.shape[0] < 2 or np.any(np.diff(axis) <= 0):
+                raise ValueError(
+                    "Grid values of '{}' must be at least two increasing values".format(name)
+                )
+
+        shape = tuple(axis.shape[0] for axis in self._axes)
+        self._table = self._evaluate_on_grid(self._axes).reshape(shape + (len(_TABULATED), -1))
+
+        centres = [(axis[:-1] + axis[1:]) / 2.0 for axis in self._axes]
+        exact = self._evaluate_on_grid(centres)
+        interpolated = self._interpolate(
+            [values.ravel() for values in np.meshgrid(*centres, indexing="ij")]
+        )
+        error = np.fabs(exact - interpolated).max(axis=0)
+        self.height_error = error[_TABULATED.index("y")]
+        self.angle_error = error[_TABULATED.index("angle")]
+
+    @property
+    def parameter_names(self):
+        """
+        Returns: the names of the parameters of the grid
+        """
+        return list(self._names)
+
+    def evaluate(self, set_points):
+        """
+        Find the beam path for a batch of set points of the grid parameters, as Beamline.evaluate_batch does. Rows within
+        the grid are interpolated, with errors up to about height_error and angle_error for each component, and other
+        rows are calculated exactly.
+        Args:
+            set_points (dict): the set points of each parameter of the grid, by name; each value is either a single set
+                point or one per row
+
+        Returns (src.array_beam_path.BeamPathArrays): arrays with a row per set point and a column per component
+        """
+        if set(set_points) != set(self._names):
+            raise KeyError("Set points must be given for exactly {}".format(self._names))
+        values = np.broadcast_arrays(
+            *[np.atleast_1d(np.asarray(set_points[name], dtype=float)) for name in self._names]
+        )
+        values = [value.ravel() for value in values]
+        inside = np.ones(values[0].shape, dtype=bool)
+        for value, axis in zip(values, self._axes):
+            inside &= (value >= axis[0]) & (value <= axis[-1])
+
+        result = np.empty((values[0].shape[0], len(_TABULATED), self._table.shape[-1]))
+        result[inside] = self._interpolate([value[inside] for value in values])
+        if not inside.all():
+            result[~inside] = self._evaluate([value[~inside] for value in values])
+        return BeamPathArrays(*[result[:, index, :] for index in range(len(_TABULATED))])
+
+    def _interpolate(self, values):
+        """
+        Args:
+            values: the set points of each parameter, one array per parameter, all within the grid
+
+        Returns: the tabulated arrays at the set points, with the shape (rows, tabulated array, component)
+        """
+        lower_indices = []
+        fractions = []
+        for value, axis in zip(values, self._axes):
+            lower_index = np.clip(
+                np.searchsorted(axis, value, side="right") - 1, 0, axis.shape[0] - 2
+            )
+            lower_indices.append(lower_index)
+            fractions.append(
+                (value - axis[lower_index]) / (axis[lower_index + 1] - axis[lower_index])
+            )
+
+        result = np.zeros((values[0].shape[0],) + self._table.shape[-2:])
+        for corner in itertools.product((0, 1), repeat=len(values)):
+            weight = np.ones(values[0].shape[0])
+            for upper, fraction in zip(corner, fractions):
+                weight *= fraction if upper else 1.0 - fraction
+            indices = tuple(
+                lower_index + upper for upper, lower_index in zip(corner, lower_indices)
+            )
+            result += weight[:, np.newaxis, np.newaxis] * self._table[indices]
+        return result
+
+    def _evaluate_on_grid(self, axes):
+        """
+        Args:
+            axes: the values of each parameter
+
+        Returns: the tabulated arrays at every combination of the values, with the shape (rows, tabulated array,
+            component) and the rows in C order of the values
+        """
+        return self._evaluate([values.ravel() for values in np.meshgrid(*axes, indexing="ij")])
+
+    def _evaluate(self, values):
+        """
+        Args:
+            values: the set points of each parameter, one array per parameter
+
+        Returns: the exact tabulated arrays at the set points, with the shape (rows, tabulated array, component)
+        """
+        other_set_points = dict(zip(self._names[1:], values[1:]))
+        beam_paths = self._beamline.evaluate_batch(self._names[0], values[0], other_set_points)
+        return np.stack([getattr(beam_paths, name) for name in _TABULATED], axis=1)
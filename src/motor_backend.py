@@ -0,0 +1,292 @@
+"""
+Backends through which motor PV wrappers read and write motor PVs, including an in-process simulation of motors
+"""
+
+import threading
+import time
+from math import sqrt
+
+from src.motor_pv_wrapper import MOTOR_FIELDS
+
+# Alarm severity and status given with monitor updates of simulated motors
+NO_ALARM = "NO_ALARM"
+
+
+class MotorBackend(object):
+    """
+    The interface through which src.motor_pv_wrapper.MotorPVWrapper reads and writes motor PVs; the subset of genie
+    python's CaChannelWrapper which the wrappers use, so CaChannelWrapper itself is a backend.
+    """
+
+    def get_pv_value(self, name):
+        """
+        Args:
+            name: name of the PV, including any field
+
+        Returns: the value of the PV
+        """
+        raise NotImplementedError()
+
+    def set_pv_value(self, name, value):
+        """
+        Args:
+            name: name of the PV, including any field
+            value: the value to write to the PV
+        """
+        raise NotImplementedError()
+
+    def add_monitor(self, name, call_back_function):
+        """
+        Args:
+            name: name of the PV, including any field
+            call_back_function: function called with the value, alarm severity and alarm status of each update
+
+        Returns: a function which removes the monitor
+        """
+        raise NotImplementedError()
+
+    def pv_exists(self, name, timeout=None):
+        """
+        Args:
+            name: name of the PV, including any field
+            timeout: time in seconds to wait for the PV to connect
+
+        Returns: True if the PV exists and connects; False otherwise
+        """
+        raise NotImplementedError()
+
+
+class SimulatedMotor(object):
+    """
+    A motor which moves in time with a trapezoidal velocity profile, accelerating over the acceleration time to its
+    velocity, moving at that velocity and decelerating to stop at its target. A new target starts a new move from where
+    the motor is; the velocity and acceleration time apply from the next move.
+    """
+
+    def __init__(self, position, max_velocity, velocity, acceleration_time, now):
+        """
+        Initializer.
+        Args:
+            position: the initial position
+            max_velocity: the maximum velocity, to which the velocity is limited
+            velocity: the velocity of moves
+            acceleration_time: time in seconds to accelerate to the velocity and to decelerate from it
+            now: the current time in seconds
+        """
+        self.max_velocity = max_velocity
+        self.velocity = velocity
+        self.acceleration_time = acceleration_time
+        self.target = position
+        self._start_position = position
+        self._start_time = now
+        self._speed = 0.0
+        self._duration = 0.0
+
+    def move(self, target, now):
+        """
+        Start moving to a target.
+        Args:
+            target: the target position
+            now: the current time in seconds
+        """
+        self._start_position = self.position(now)
+        self._start_time = now
+        self.target = target
+        self._speed = self.velocity
+        if self.max_velocity > 0:
+            self._speed = (
+                min(self._speed, self.max_velocity) if self._speed > 0 else self.max_velocity
+            )
+        distance = abs(target - self._start_position)
+        if self._speed <= 0 or distance == 0:
+            self._duration = 0.0
+        elif distance >= self._speed * self.acceleration_time:
+            self._duration = distance / self._speed + self.acceleration_time
+        else:
+            # the motor stops decelerating before it reaches full speed
+            self._duration = 2 * sqrt(distance * self.acceleration_time / self._speed)
+
+    def position(self, now):
+        """
+        Args:
+            now: the current time in seconds
+
+        Returns: the position of the motor
+        """
+        elapsed = now - self._start_time
+        if elapsed >= self._duration:
+            return self.target
+        direction = 1.0 if self.target >= self._start_position else -1.0
+        if self.acceleration_time <= 0:
+            return self._start_position + direction * self._speed * elapsed
+        acceleration = self._speed / self.acceleration_time
+        accelerating_time = min(self.acceleration_time, self._duration / 2.0)
+        remaining = self._duration - elapsed
+        if elapsed < accelerating_time:
+            distance = 0.5 * acceleration * elapsed**2
+        elif remaining < accelerating_time:
+            distance = abs(self.target - self._start_position) - 0.5 * acceleration * remaining**2
+        else:
+            distance = (
+                0.5 * acceleration * accelerating_time** 2
+                + acceleration * accelerating_time * (elapsed - accelerating_time)
+            )
+        return self._start_position + direction * distance
+
+    def done_moving(self, now):
+        """
+        Args:
+            now: the current time in seconds
+
+        Returns: 1 if the motor has stopped at its target; 0 while it is moving
+        """
+        return 1 if now - self._start_time >= self._duration else 0
+
+
+class SimulatedMotorBackend(MotorBackend):
+    """
+    A backend of simulated motors, in process with no channel access, whose positions, read back values and done moving
+    statuses evolve in time. Motors are added by name and their value (VAL), read back (RBV), velocity (VELO), maximum
+    velocity (VMAX), acceleration time (ACCL) and done moving (DMOV) fields are read and written as PVs. Monitors are
+    updated when fields are written, for the read back and done moving fields of a motor when it is moved, and for those
+    of all motors when update is called.
+    """
+
+    FIELDS = MOTOR_FIELDS + (".ACCL",)
+
+    def __init__(self, clock=time.time):
+        """
+        Initializer.
+        Args:
+            clock: function returning the current time in seconds
+        """
+        self._clock = clock
+        self._motors = {}
+        self._monitors = {}
+        self._last_posted = {}
+        self._lock = threading.Lock()
+
+    def add_motor(self, name, position=0.0, max_velocity=1.0, velocity=None, acceleration_time=0.0):
+        """
+        Add a motor.
+        Args:
+            name: name of the motor PV
+            position: the initial position
+            max_velocity: the maximum velocity
+            velocity: the velocity of moves; None for the maximum velocity
+            acceleration_time: time in seconds to accelerate to the velocity and to decelerate from it
+        """
+        if velocity is None:
+            velocity = max_velocity
+        with self._lock:
+            self._motors[name] = SimulatedMotor(
+                position, max_velocity, velocity, acceleration_time, self._clock()
+            )
+
+    def _motor_and_field(self, name):
+        """
+        Args:
+            name: name of a PV of a motor, including any field
+
+        Returns: the motor and the field
+        """
+        motor_name, dot, field = name.partition(".")
+        field = dot + field
+        motor = self._motors.get(motor_name)
+        if motor is None or field not in self.FIELDS:
+            raise KeyError("No simulated motor PV '{}'".format(name))
+        return motor, field
+
+    def get_pv_value(self, name):
+        with self._lock:
+            motor, field = self._motor_and_field(name)
+            return self._field_value(motor, field, self._clock())
+
+    @staticmethod
+    def _field_value(motor, field, now):
+        """
+        Args:
+            motor (SimulatedMotor): the motor
+            field: the field
+            now: the current time in seconds
+
+        Returns: the value of the field of the motor
+        """
+        if field == "":
+            return motor.target
+        elif field == ".RBV":
+            return motor.position(now)
+        elif field == ".DMOV":
+            return motor.done_moving(now)
+        elif field == ".VMAX":
+            return motor.max_velocity
+        elif field == ".VELO":
+            return motor.velocity
+        return motor.acceleration_time
+
+    def set_pv_value(self, name, value):
+        with self._lock:
+            motor, field = self._motor_and_field(name)
+            now = self._clock()
+            if field == "":
+                motor.move(value, now)
+            elif field == ".VMAX":
+                motor.max_velocity = value
+            elif field == ".VELO":
+                motor.velocity = value
+            elif field == ".ACCL":
+                motor.acceleration_time = value
+            else:
+                raise ValueError("Simulated motor PV '{}' is read only".format(name))
+        self._post(name)
+        if field == "":
+            motor_name = name.partition(".")[0]
+            self._post(motor_name + ".RBV", only_if_changed=True)
+            self._post(motor_name + ".DMOV", only_if_changed=True)
+
+    def add_monitor(self, name, call_back_function):
+        with self._lock:
+            self._motor_and_field(name)
+            self._monitors.setdefault(name, []).append(call_back_function)
+
+        def remove_monitor():
+            with self._lock:
+                self._monitors[name].remove(call_back_function)
+
+        return remove_monitor
+
+    def pv_exists(self, name, timeout=None):
+        try:
+            with self._lock:
+                self._motor_and_field(name)
+            return True
+        except KeyError:
+            return False
+
+    def update(self):
+        """
+        Post the read back and done moving fields of every motor to their monitors if they have changed since they
+        were last posted, e.g. periodically to simulate the updates of moving motors.
+        """
+        for name in list(self._monitors):
+            if name.endswith(".RBV") or name.endswith(".DMOV"):
+                self._post(name, only_if_changed=True)
+
+    def _post(self, name, only_if_changed=False):
+        """
+        Call the monitors of a PV with its value.
+        Args:
+            name: name of the PV, including any field
+            only_if_changed: True to only call the monitors if the value has changed since it was last posted
+        """
+        with self._lock:
+            call_back_functions = list(self._monitors.get(name, []))
+            if not call_back_functions:
+                return
+            motor, field = self._motor_and_field(name)
+            value = self._field_value(motor, field, self._clock())
+            if only_if_changed and self._last_posted.get(name) == value:
+                return
+            self._last_posted[name] = value
+        for call_back_function in call_back_functions:
+            call_back_function(value, NO_ALARM, NO_ALARM)
@@ -1,13 +1,37 @@
-from genie_python.genie_cachannel_wrapper import CaChannelWrapper
+import time
+
+# Default time in seconds for which a value received from a monitor is served from the cache
+DEFAULT_STALENESS_BOUND = 10.0
+
+# Alarm severity with which monitors report a disconnected PV
+INVALID_SEVERITY = "INVALID"
+
+# Fields of a motor PV which the wrappers read or write; "" for the PV itself
+MOTOR_FIELDS = ("", ".RBV", ".DMOV", ".VMAX", ".VELO")
+
+
+def default_channel_access():
+    """
+    Returns: genie python's channel access wrapper; imported when first needed so that wrappers can be created with
+        other channel access implementations without it
+    """
+    from genie_python.genie_cachannel_wrapper import CaChannelWrapper
+
+    return CaChannelWrapper
 
 
 class MotorPVWrapper(object):
-    def __init__(self, pv_name):
+    def __init__(self, pv_name, channel_access=None):
         """
         Creates a wrapper around a motor PV for accessing its fields.
         :param pv_name (string): The name of the PV
+        :param channel_access: The channel access implementation, with the interface of genie python's
+            CaChannelWrapper; None for CaChannelWrapper
         """
         self._pv_name = pv_name
+        if channel_access is None:
+            channel_access = default_channel_access()
+        self._channel_access = channel_access
 
     @property
     def name(self):
@@ -16,12 +40,18 @@ class MotorPVWrapper(object):
         """
         return self._pv_name
 
+    def channel_names(self):
+        """
+        Returns: the names of the channels for the fields of the PV which are read or written
+        """
+        return [self._pv_name + field for field in MOTOR_FIELDS]
+
     @property
     def value(self):
         """
         Returns: the value of the underlying PV
         """
-        return CaChannelWrapper.get_pv_value(self._pv_name)
+        return self._get("")
 
     @value.setter
     def value(self, value):
@@ -30,14 +60,35 @@ class MotorPVWrapper(object):
         Args:
             value: The value to set
         """
-        CaChannelWrapper.set_pv_value(self._pv_name, value)
+        self._set("", value)
+
+    @property
+    def readback(self):
+        """
+        Returns: the read back value of the underlying PV
+        """
+        return self._get(".RBV")
+
+    @property
+    def done_moving(self):
+        """
+        Returns: the done moving status of the underlying PV
+        """
+        return self._get(".DMOV")
+
+    @property
+    def max_velocity(self):
+        """
+        Returns: the maximum velocity of the underlying PV
+        """
+        return self._get(".VMAX")
 
     @property
     def velocity(self):
         """
         Returns: the value of the underlying PV
         """
-        return CaChannelWrapper.get_pv_value(self._pv_name + ".VMAX")
+        return self._get(".VMAX")
 
     @velocity.setter
     def velocity(self, value):
@@ -46,4 +97,100 @@ class MotorPVWrapper(object):
         Args:
             value: The value to set
         """
-        CaChannelWrapper.set_pv_value(self._pv_name + ".VELO", value)
+        self._set(".VELO", value)
+
+    def _get(self, field):
+        """
+        :param field: The field of the PV, e.g. ".RBV"; "" for the PV itself
+        :return: The value of the field
+        """
+        return self._channel_access.get_pv_value(self._pv_name + field)
+
+    def _set(self, field, value):
+        """
+        :param field: The field of the PV, e.g. ".VELO"; "" for the PV itself
+        :param value: The value to write to the field
+        """
+        self._channel_access.set_pv_value(self._pv_name + field, value)
+
+
+class CachingMotorPVWrapper(MotorPVWrapper):
+    """
+    A wrapper around a motor PV which monitors its value, read back, maximum velocity and done moving fields and serves
+    reads of them from the values received. A field is read directly from the PV instead if no value has been received
+    within the staleness bound or its monitor reports that it is disconnected.
+    """
+
+    MONITORED_FIELDS = ("", ".RBV", ".VMAX", ".DMOV")
+
+    def __init__(
+        self, pv_name, staleness_bound=DEFAULT_STALENESS_BOUND, channel_access=None, clock=time.time
+    ):
+        """
+        Creates a wrapper around a motor PV and monitors its fields.
+        :param pv_name (string): The name of the PV
+        :param staleness_bound: The time in seconds for which a value received is served before the field is read
+            directly again
+        :param channel_access: The channel access implementation, with the interface of genie python's
+            CaChannelWrapper; None for CaChannelWrapper
+        :param clock: Function returning the current time in seconds
+        """
+        super(CachingMotorPVWrapper, self).__init__(pv_name, channel_access)
+        self._staleness_bound = staleness_bound
+        self._clock = clock
+        # the last value of each field and the time it was received; replaced, not changed, by monitor callbacks
+        self._cache = {}
+        # the number of monitor updates received for each field, so that a value read or written directly does not
+        # replace a newer value received while the read or write was being made
+        self._update_counts = {}
+        self._monitors = [
+            self._channel_access.add_monitor(self._pv_name + field, self._monitor_callback(field))
+            for field in self.MONITORED_FIELDS
+        ]
+
+    def _monitor_callback(self, field):
+        """
+        :param field: The monitored field
+        :return: The function called with each update of the field
+        """
+
+        def update_cache(value, alarm_severity, alarm_status):
+            self._update_counts[field] = self._update_counts.get(field, 0) + 1
+            if value is None or alarm_severity == INVALID_SEVERITY:
+                self._cache.pop(field, None)
+            else:
+                self._cache[field] = (value, self._clock())
+
+        return update_cache
+
+    def _get(self, field):
+        cached = self._cache.get(field)
+        if cached is not None and self._clock() - cached[1] <= self._staleness_bound:
+            return cached[0]
+        update_count = self._update_counts.get(field, 0)
+        value = super(CachingMotorPVWrapper, self)._get(field)
+        if field in self.MONITORED_FIELDS and self._update_counts.get(field, 0) == update_count:
+            self._cache[field] = (value, self._clock())
+        return value
+
+    def _set(self, field, value):
+        # writing the value starts a move, so the read back and done moving values from before it are out of date
+        moved_fields = (".RBV", ".DMOV") if field == "" else ()
+        update_counts = dict(
+            (moved_field, self._update_counts.get(moved_field, 0)) for moved_field in moved_fields
+        )
+        super(CachingMotorPVWrapper, self)._set(field, value)
+        if field in self.MONITORED_FIELDS:
+            self._cache[field] = (value, self._clock())
+        for moved_field in moved_fields:
+            if self._update_counts.get(moved_field, 0) == update_counts[moved_field]:
+                self._cache.pop(moved_field, None)
+
+    def close(self):
+        """
+        Stop monitoring the PV; reads are then made directly once the cached values are stale.
+        """
+        for cancel_monitor in self._monitors:
+            if callable(cancel_monitor):
+                cancel_monitor()
+        self._monitors = []
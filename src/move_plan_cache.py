@@ -0,0 +1,59 @@
+"""
+Cache of the results of moving the beamline to configurations it has been moved to before
+"""
+
+from collections import OrderedDict
+
+
+class MovePlanCache(object):
+    """
+    A bounded cache of move plans, the states of the components after a move, keyed by the configuration moved to.
+    When full the least recently used plan is evicted.
+    """
+
+    def __init__(self, max_size):
+        """
+        Initializer.
+        Args:
+            max_size: maximum number of plans to hold
+        """
+        self._max_size = max_size
+        self._plans = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Args:
+            key: the configuration
+
+        Returns: the plan for the configuration; None if there is none
+        """
+        plan = self._plans.pop(key, None)
+        if plan is None:
+            self.misses += 1
+            return None
+        self._plans[key] = plan
+        self.hits += 1
+        return plan
+
+    def put(self, key, plan):
+        """
+        Add a plan, evicting the least recently used plan if the cache is full.
+        Args:
+            key: the configuration
+            plan: the plan
+        """
+        self._plans.pop(key, None)
+        if len(self._plans) >= self._max_size:
+            self._plans.popitem(last=False)
+        self._plans[key] = plan
+
+    def clear(self):
+        """
+        Remove all the plans, e.g. because something they depend on has changed.
+        """
+        self._plans.clear()
+
+    def __len__(self):
+        return len(self._plans)
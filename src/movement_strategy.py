@@ -2,12 +2,13 @@
 Classes and objects decribing the movement of items
 """
 
-from math import cos, fabs, radians, sin, tan
+from math import fabs, radians, sin
 
-from src.gemoetry import Position, PositionAndAngle
+from src.beam_transform import BeamTransform
+from src.gemoetry import ANGULAR_TOLERANCE, Position, PositionAndAngle
 
-# Tolerance to use when comparing an angle with another angle
-ANGULAR_TOLERANCE = 1e-12
+# Tolerance on the sine of the angle between a beam and a line of movement below which they are parallel
+PARALLEL_TOLERANCE = sin(radians(ANGULAR_TOLERANCE))
 
 
 class LinearMovement(object):
@@ -18,6 +19,11 @@ class LinearMovement(object):
 
     def __init__(self, y_position, z_position, angle):
         self._angle_and_position = PositionAndAngle(y_position, z_position, angle)
+        # The line of movement is fixed; repositioning the component moves it along the line. So the line is stored
+        # as a point and unit direction once and reused for every interception.
+        self._line_y = self._angle_and_position.y
+        self._line_z = self._angle_and_position.z
+        self._direction_z, self._direction_y = self._angle_and_position.direction
 
     def calculate_interception(self, beam):
         """
@@ -29,68 +35,52 @@ class LinearMovement(object):
 
         """
         assert beam is not None
-        y_m = self._angle_and_position.y
-        z_m = self._angle_and_position.z
-        angle_m = self._angle_and_position.angle
-        y_b = beam.y
-        z_b = beam.z
-        angle_b = beam.angle
-
-        if fabs(angle_b % 180.0 - angle_m % 180.0) <= ANGULAR_TOLERANCE:
-            raise ValueError("No interception between beam and movement")
-        elif fabs(angle_b % 180.0) <= ANGULAR_TOLERANCE:
-            y, z = self._zero_angle(y_b, self._angle_and_position)
-        elif fabs(angle_m % 180.0) <= ANGULAR_TOLERANCE:
-            y, z = self._zero_angle(y_m, beam)
-        elif (
-            fabs(angle_m % 180.0 - 90) <= ANGULAR_TOLERANCE
-            or fabs(angle_m % 180.0 + 90) <= ANGULAR_TOLERANCE
-        ):
-            y, z = self._right_angle(z_m, beam)
-        elif (
-            fabs(angle_b % 180.0 - 90) <= ANGULAR_TOLERANCE
-            or fabs(angle_b % 180.0 + 90) <= ANGULAR_TOLERANCE
-        ):
-            y, z = self._right_angle(z_b, self._angle_and_position)
-        else:
-            tan_b = tan(radians(angle_b))
-            tan_m = tan(radians(angle_m))
-            z = 1 / (tan_m - tan_b) * (y_b - y_m + z_m * tan_m - z_b * tan_b)
-            y = tan_b * tan_m / (tan_b - tan_m) * (y_m / tan_m - y_b / tan_b + z_b - z_m)
-
-        return Position(y, z)
-
-    def _zero_angle(self, y_zero, position_and_angle):
-        """
-        Calculate when one of the angles is zero but not the other
-        Args:
-            y_zero: the y of the item with zero angle
-            position_and_angle: position and angle of other ray
+        beam_direction_z, beam_direction_y = beam.direction
 
-        Returns: y and z of intercept
+        determinant = self._direction_z * beam_direction_y - self._direction_y * beam_direction_z
+        if fabs(determinant) <= PARALLEL_TOLERANCE:
+            raise ValueError("No interception between beam and movement")
 
-        """
-        y = y_zero
-        z = position_and_angle.z + (y_zero - position_and_angle.y) / tan(
-            radians(position_and_angle.angle)
+        distance_along_line = (
+            (beam.z - self._line_z) * beam_direction_y - (beam.y - self._line_y) * beam_direction_z
+        ) / determinant
+        return Position(
+            self._line_y + distance_along_line * self._direction_y,
+            self._line_z + distance_along_line * self._direction_z,
         )
-        return y, z
 
-    def _right_angle(self, z_zero, position_and_angle):
+    def interception_transform(self, beam):
         """
-        Calculate when one of the angles is a right angle but not the other
+        The transform taking a point on a beam to the interception of the beam and component. This is valid for all
+        beams parallel to the given beam.
         Args:
-            z_zero: the z of the item with right angle
-            position_and_angle: position and angle of other ray
+            beam(PositionAndAngle) : a beam in the direction of the beams to intercept
 
-        Returns: y and z of intercept
+        Returns (src.beam_transform.BeamTransform): the transform, with the interception on a beam at the beam angle
         """
+        beam_direction_z, beam_direction_y = beam.direction
 
-        y = position_and_angle.y + (z_zero - position_and_angle.z) * tan(
-            radians(position_and_angle.angle)
+        determinant = self._direction_z * beam_direction_y - self._direction_y * beam_direction_z
+        if fabs(determinant) <= PARALLEL_TOLERANCE:
+            raise ValueError("No interception between beam and movement")
+
+        # distance along the line is (z * beam_direction_y - y * beam_direction_z - line_offset) / determinant
+        line_offset = (
+            self._line_z * beam_direction_y - self._line_y * beam_direction_z
+        ) / determinant
+        along_y = -beam_direction_z / determinant
+        along_z = beam_direction_y / determinant
+        return BeamTransform(
+            (
+                (self._direction_y * along_y, self._direction_y * along_z),
+                (self._direction_z * along_y, self._direction_z * along_z),
+            ),
+            (
+                self._line_y - line_offset * self._direction_y,
+                self._line_z - line_offset * self._direction_z,
+            ),
+            beam.angle,
         )
-        z = z_zero
-        return y, z
 
     def set_position_relative_to_beam(self, beam_intercept, value):
         """
@@ -100,11 +90,23 @@ class LinearMovement(object):
             beam_intercept: the current beam position of the item
             value: the value to set away from the beam, e.g. height
         """
-        angle = self._angle_and_position.angle
-        y_value = beam_intercept.y + value * sin(radians(angle))
-        z_value = beam_intercept.z + value * cos(radians(angle))
+        y_value = beam_intercept.y + value * self._direction_y
+        z_value = beam_intercept.z + value * self._direction_z
 
-        self._angle_and_position = PositionAndAngle(y_value, z_value, angle)
+        self._angle_and_position = self._angle_and_position.with_position(y_value, z_value)
+
+    def capture_state(self):
+        """
+        Returns: the state of the movement, which can be restored later
+        """
+        return self._angle_and_position
+
+    def restore_state(self, state):
+        """
+        Args:
+            state: a state previously captured from this movement
+        """
+        self._angle_and_position = state
 
     def sp_position(self):
         """
@@ -112,6 +114,13 @@ class LinearMovement(object):
         """
         return Position(self._angle_and_position.y, self._angle_and_position.z)
 
+    @property
+    def angle(self):
+        """
+        Returns: the angle of the line of movement measured clockwise from the horizon
+        """
+        return self._angle_and_position.angle
+
 
 # class ArcMovement(LinearMovement):
 #     """
@@ -2,6 +2,8 @@
 Parameters that the user would interact with
 """
 
+from math import fabs
+
 
 class BeamlineParameter(object):
     """
@@ -9,15 +11,33 @@ class BeamlineParameter(object):
     value that is set.
     """
 
-    def __init__(self, name, sim=False, init=None):
+    def __init__(self, name, sim=False, init=None, deadband=None):
+        """
+        Initializer.
+        Args:
+            name (str): name of the parameter
+            sim (bool): True to start with the initial value as the set point and its read back value
+            init: the initial value
+            deadband: set points within this of the current set point are ignored, so writing the same value does not
+                cause a move; None to never ignore set points
+        """
         if sim:
             self._set_point = init
             self._set_point_rbv = init
         else:
             self._set_point = None
+            self._set_point_rbv = None
         self._sp_is_changed = False
         self._name = name
+        self._deadband = deadband
         self.after_move_listener = lambda x: None
+        self.after_sp_changed_listener = lambda x: None
+        # returns True if the move is instead made by the beamline, which also moves the parameters depending on it, now
+        # or when a batch of changes to the beamline is committed
+        self.defer_move = lambda x: False
+        # returns True if the inputs of the parameter, e.g. the beam entering its component, have changed since it last
+        # moved, so that moving to the same set point would move its component
+        self.inputs_changed = lambda x: False
 
     @property
     def sp_rbv(self):
@@ -43,8 +63,11 @@ class BeamlineParameter(object):
         Args:
             set_point: the set point
         """
+        if self._within_deadband(set_point):
+            return
         self._set_point = set_point
         self._sp_is_changed = True
+        self.after_sp_changed_listener(self)
 
     @property
     def sp(self):
@@ -57,13 +80,31 @@ class BeamlineParameter(object):
     @sp.setter
     def sp(self, value):
         """
-        Set the set point and move to it.
+        Set the set point and move to it. A set point within the deadband is ignored only if the component is already
+        where a move to it would take it.
         Args:
             value: new set point
         """
+        if (
+            self._within_deadband(value)
+            and not self._sp_is_changed
+            and not self.inputs_changed(self)
+        ):
+            return
         self.sp_no_move = value
         self.move = 1
 
+    def _within_deadband(self, set_point):
+        """
+        Args:
+            set_point: a new set point
+
+        Returns: True if the set point is within the deadband of the current set point so should be ignored
+        """
+        if self._deadband is None or self._set_point is None:
+            return False
+        return fabs(set_point - self._set_point) <= self._deadband
+
     @property
     def move(self):
         """
@@ -76,6 +117,8 @@ class BeamlineParameter(object):
         """
         Move to the setpoint, no matter what the value passed is.
         """
+        if self.defer_move(self):
+            return
         self.move_no_callback()
         self.after_move_listener(self)
 
@@ -84,6 +127,13 @@ class BeamlineParameter(object):
         Move the component but don't call a callback indicating a move has been performed.
         """
         self._move_component()
+        self.mark_moved()
+
+    def mark_moved(self):
+        """
+        Record that the parameter has moved to its set point without moving the component(s), e.g. because they have
+        been restored to where a move to it takes them.
+        """
         self._set_point_rbv = self._set_point
         self._sp_is_changed = False
 
@@ -101,12 +151,31 @@ class BeamlineParameter(object):
         """
         return self._sp_is_changed
 
+    @property
+    def component(self):
+        """
+        Returns (src.components.Component): the component this parameter moves; None if it does not move a single
+            component
+        """
+        return None
+
     def _move_component(self):
         """
         Moves the component(s) associated with this parameter to the setpoint.
         """
         raise NotImplementedError("This must be implement in the sub class")
 
+    def apply_to_beam_path_batch(self, batch, set_points):
+        """
+        Apply set points to the component(s) associated with this parameter in a batch of beamline states, as a move
+        would, but without moving the component(s). Parameters which do not alter the beam path leave the batch
+        unchanged.
+        Args:
+            batch (src.array_beam_path.BeamPathBatch): the batch of beamline states
+            set_points: the set point for each state in the batch
+        """
+        pass
+
 
 class ReflectionAngle(BeamlineParameter):
     """
@@ -114,19 +183,27 @@ class ReflectionAngle(BeamlineParameter):
     Angle is measure with +ve in the anti-clockwise direction)
     """
 
-    def __init__(self, name, reflection_component, sim=False, init=0):
+    def __init__(self, name, reflection_component, sim=False, init=0, deadband=None):
         """
         Initializer.
         Args:
             name (str): Name of the reflection angle
             reflection_component (src.components.ReflectingComponent): the active component at the reflection point
+            deadband: set points within this of the current set point are ignored; None to never ignore set points
         """
-        super(ReflectionAngle, self).__init__(name, sim, init)
+        super(ReflectionAngle, self).__init__(name, sim, init, deadband)
         self._reflection_component = reflection_component
 
+    @property
+    def component(self):
+        return self._reflection_component
+
     def _move_component(self):
         self._reflection_component.set_angle_relative_to_beam(self._set_point)
 
+    def apply_to_beam_path_batch(self, batch, set_points):
+        batch.set_angle_relative_to_beam(self._reflection_component, set_points)
+
 
 class Theta(ReflectionAngle):
     """
@@ -134,14 +211,15 @@ class Theta(ReflectionAngle):
     Angle is measure with +ve in the anti-clockwise direction (opposite of room coordinates)
     """
 
-    def __init__(self, name, ideal_sample_point, sim=False, init=0):
+    def __init__(self, name, ideal_sample_point, sim=False, init=0, deadband=None):
         """
         Initializer.
         Args:
             name (str): name of theta
             ideal_sample_point (src.components.ReflectingComponent): the ideal sample point active component
+            deadband: set points within this of the current set point are ignored; None to never ignore set points
         """
-        super(Theta, self).__init__(name, ideal_sample_point, sim, init)
+        super(Theta, self).__init__(name, ideal_sample_point, sim, init, deadband)
 
 
 class TrackingPosition(BeamlineParameter):
@@ -149,34 +227,51 @@ class TrackingPosition(BeamlineParameter):
     Component which tracks the position of the beam with a single degree of freedom. E.g. slit set on a height stage
     """
 
-    def __init__(self, name, component, sim=False, init=0):
+    def __init__(self, name, component, sim=False, init=0, deadband=None):
         """
 
         Args:
             name: Name of the variable
             component (src.components.PassiveComponent): component that the tracking is based on
+            deadband: set points within this of the current set point are ignored; None to never ignore set points
         """
-        super(TrackingPosition, self).__init__(name, sim, init)
+        super(TrackingPosition, self).__init__(name, sim, init, deadband)
         self._component = component
 
+    @property
+    def component(self):
+        return self._component
+
     def _move_component(self):
         self._component.set_position_relative_to_beam(self._set_point)
 
+    def apply_to_beam_path_batch(self, batch, set_points):
+        batch.set_position_relative_to_beam(self._component, set_points)
+
 
 class ComponentEnabled(BeamlineParameter):
     """
     Parameter which sets whether a given device is enabled (i.e. parked in beam) on the beamline.
     """
 
-    def __init__(self, name, component, sim=False, init=False):
+    def __init__(self, name, component, sim=False, init=False, deadband=None):
         """
         Initializer.
         Args:
             name (str): Name of the enabled parameter
             component (src.components.PassiveComponent): the component to be enabled or disabled
+            deadband: set points within this of the current set point are ignored, e.g. 0 to ignore writing the same
+                value; None to never ignore set points
         """
-        super(ComponentEnabled, self).__init__(name, sim, init)
+        super(ComponentEnabled, self).__init__(name, sim, init, deadband)
         self._component = component
 
+    @property
+    def component(self):
+        return self._component
+
     def _move_component(self):
         self._component.enabled = self._set_point
+
+    def apply_to_beam_path_batch(self, batch, set_points):
+        batch.set_enabled(self._component, set_points)
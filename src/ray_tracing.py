@@ -0,0 +1,156 @@
+"""
+Monte Carlo tracing of a bundle of rays through the components of a beamline
+"""
+
+import numpy as np
+
+from src.array_beam_path import calculate_interceptions
+from src.components import ReflectingComponent
+from src.gemoetry import unit_direction
+
+
+class RayBundle(object):
+    """
+    A bundle of rays, each a position and angle, held as arrays with an element per ray.
+    """
+
+    def __init__(self, y, z, angle):
+        """
+        Initializer.
+        Args:
+            y: y position of each ray
+            z: z position of each ray
+            angle: angle of each ray, clockwise from the horizon in degrees
+        """
+        self.y = np.asarray(y, dtype=float)
+        self.z = np.asarray(z, dtype=float)
+        self.angle = np.asarray(angle, dtype=float)
+
+    @staticmethod
+    def sample(incoming_beam, count, position_spread, divergence, seed=None):
+        """
+        Sample rays about a beam. The rays start offset from the beam, perpendicular to it, and are deviated from its
+        angle; both are normally distributed.
+        Args:
+            incoming_beam (src.gemoetry.PositionAndAngle): the beam at the centre of the bundle
+            count: number of rays
+            position_spread: standard deviation of the offset of the rays from the beam
+            divergence: standard deviation of the angle of the rays from the beam in degrees
+            seed: seed of the random number generator; None for unseeded
+
+        Returns (RayBundle): the rays
+        """
+        random_state = np.random.RandomState(seed)
+        offsets = random_state.normal(0.0, position_spread, count)
+        angles = incoming_beam.angle + random_state.normal(0.0, divergence, count)
+        direction_z, direction_y = incoming_beam.direction
+        return RayBundle(
+            incoming_beam.y + offsets * direction_z, incoming_beam.z - offsets * direction_y, angles
+        )
+
+    def __len__(self):
+        return self.y.shape[0]
+
+
+class ComponentRayStatistics(object):
+    """
+    The rays reaching a component.
+    """
+
+    def __init__(self, name, transmission, width, divergence):
+        """
+        Initializer.
+        Args:
+            name: name of the component
+            transmission: fraction of the rays in the bundle which pass through the component
+            width: standard deviation of the position, along the component's movement, of the rays which pass
+                through it; nan if none pass
+            divergence: standard deviation of the angle of the rays which pass through it in degrees; nan if none pass
+        """
+        self.name = name
+        self.transmission = transmission
+        self.width = width
+        self.divergence = divergence
+
+    def __repr__(self):
+        return "ComponentRayStatistics({}, transmission={}, width={}, divergence={})".format(
+            self.name, self.transmission, self.width, self.divergence
+        )
+
+
+class RayTracer(object):
+    """
+    Traces bundles of rays through components in their current positions. The rays are traced with array operations
+    so large bundles can be traced quickly. Each ray meets a component where it intercepts the component's movement,
+    as the beam does, and is blocked if it falls outside the component's aperture, which is centred on the component's
+    set point position. Enabled reflecting components reflect the rays from a surface at the component angle.
+    """
+
+    def __init__(self, components, apertures=None):
+        """
+        Initializer.
+        Args:
+            components (list[src.components.Component]): the components, in beam order
+            apertures (dict): the full width of the opening of each component which has an aperture, e.g. a slit gap,
+                by component name; components without one pass every ray which reaches them
+        """
+        self._components = components
+        self._apertures = {} if apertures is None else apertures
+
+    def trace(self, rays):
+        """
+        Trace the rays through the components.
+        Args:
+            rays (RayBundle): the rays entering the first component
+
+        Returns (list[ComponentRayStatistics]): the rays passing through each component, in beam order
+        """
+        count = len(rays)
+        y, z, angle = rays.y, rays.z, rays.angle
+        statistics = []
+        for component in self._components:
+            movement = component.movement_strategy
+            centre = movement.sp_position()
+            direction_z, direction_y = unit_direction(movement.angle)
+            interception_y, interception_z = calculate_interceptions(
+                centre.y, centre.z, movement.angle, y, z, angle
+            )
+            offset = (interception_y - centre.y) * direction_y + (
+                interception_z - centre.z
+            ) * direction_z
+
+            # rays parallel to the movement never reach it so have a nan offset and are blocked
+            transmitted = np.isfinite(offset)
+            aperture = self._apertures.get(component.name)
+            if aperture is not None:
+                transmitted &= np.fabs(offset) <= aperture / 2.0
+            if not transmitted.all():
+                interception_y = interception_y[transmitted]
+                interception_z = interception_z[transmitted]
+                angle = angle[transmitted]
+                offset = offset[transmitted]
+
+            if isinstance(component, ReflectingComponent) and component.enabled:
+                angle = 2 * component.angle - angle
+            y, z = interception_y, interception_z
+
+            statistics.append(self._statistics(component.name, count, offset, angle))
+        return statistics
+
+    @staticmethod
+    def _statistics(name, count, offset, angle):
+        """
+        Args:
+            name: name of the component
+            count: number of rays in the bundle
+            offset: offset along the component's movement of the rays passing through it
+            angle: angle of the rays passing through it
+
+        Returns (ComponentRayStatistics): statistics of the rays passing through it
+        """
+        transmitted_count = offset.shape[0]
+        if transmitted_count == 0:
+            return ComponentRayStatistics(name, 0.0, np.nan, np.nan)
+        return ComponentRayStatistics(
+            name, transmitted_count / float(count), np.std(offset), np.std(angle)
+        )
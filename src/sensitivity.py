@@ -0,0 +1,205 @@
+"""
+Sensitivity of the beamline to its parameters; the derivatives of the positions and angles of its components
+"""
+
+from math import radians
+
+import numpy as np
+
+from src.components import ReflectingComponent
+from src.gemoetry import unit_direction
+from src.parameters import ReflectionAngle, TrackingPosition
+
+# Factor converting an angle in degrees to radians
+RADIANS_PER_DEGREE = radians(1.0)
+
+
+class ComponentSensitivity(object):
+    """
+    The derivatives of the position and angles of a component with respect to each beamline parameter.
+    """
+
+    def __init__(self, height, angle, beam_height, beam_angle):
+        """
+        Initializer.
+        Args:
+            height: derivatives of the height of the component's set point position
+            angle: derivatives of the angle of the component; zero for components without an angle
+            beam_height: derivatives of the height of the beam where it intercepts the component's movement
+            beam_angle: derivatives of the angle of the beam leaving the component
+        """
+        self.height = height
+        self.angle = angle
+        self.beam_height = beam_height
+        self.beam_angle = beam_angle
+
+
+class Sensitivity(object):
+    """
+    The partial derivatives of the positions and angles of the components of a beamline with respect to the set point
+    of each beamline parameter, at the current state of the beamline. Each is the derivative when the parameter is set
+    and moved in the current mode, so parameters in the mode which follow it move too. The derivatives are exact for
+    a beamline which has been moved to its set points and give a linear estimate of the effect of small changes
+    without moving the beamline. Each array has a row per component and a column per parameter; angles are in degrees.
+    """
+
+    def __init__(self, parameter_names, components, height, angle, beam_height, beam_angle):
+        """
+        Initializer.
+        Args:
+            parameter_names (list[str]): names of the parameters, in the order of the columns
+            components (list[src.components.Component]): the components, in the order of the rows
+            height: derivatives of the height of each component's set point position
+            angle: derivatives of the angle of each component; zero for components without an angle
+            beam_height: derivatives of the height of the beam where it intercepts each component's movement
+            beam_angle: derivatives of the angle of the beam leaving each component
+        """
+        self.parameter_names = list(parameter_names)
+        self._parameter_indices = dict((name, index) for index, name in enumerate(parameter_names))
+        self._component_indices = dict(
+            (component, index) for index, component in enumerate(components)
+        )
+        self.height = height
+        self.angle = angle
+        self.beam_height = beam_height
+        self.beam_angle = beam_angle
+
+    @staticmethod
+    def calculate(components, beamline_parameters, parameter_component_indices, moved):
+        """
+        Calculate the derivatives by propagating the derivatives of the beam (forward mode differentiation) along the
+        beam path, through the interception of the beam with each component's movement and each reflection. The
+        derivatives with respect to all the parameters are propagated together.
+        Args:
+            components (list[src.components.Component]): the components of the beamline, with their beam path up to
+                date
+            beamline_parameters (list[src.parameters.BeamlineParameter]): the parameters of the beamline
+            parameter_component_indices: the index of the component each parameter moves; None for none
+            moved: a square boolean array which is True where the parameter of the row moves when the set point of the
+                parameter of the column is moved
+
+        Returns (Sensitivity): the derivatives
+        """
+        shape = (len(components), len(beamline_parameters))
+        height = np.zeros(shape)
+        angle = np.zeros(shape)
+        beam_height = np.zeros(shape)
+        beam_angle = np.zeros(shape)
+
+        component_parameters = [[] for _ in components]
+        for index, component_index in enumerate(parameter_component_indices):
+            if component_index is not None:
+                component_parameters[component_index].append(index)
+        unit_set_points = np.eye(len(beamline_parameters))
+
+        # derivatives of a point on the beam entering the component and of its angle; the incoming beam is fixed
+        beam_dy = np.zeros(shape[1])
+        beam_dz = np.zeros(shape[1])
+        beam_dangle = np.zeros(shape[1])
+        for component_index, component in enumerate(components):
+            beam = component.incoming_beam
+            interception = component.calculate_beam_interception()
+            beam_direction_z, beam_direction_y = beam.direction
+            line_direction_z, line_direction_y = unit_direction(component.movement_strategy.angle)
+
+            # the interception is where the beam point moved along the beam, B + t u, meets the line of movement,
+            # L + s v; differentiating, ds v - dt u = dB + t du, and crossing with u eliminates dt
+            distance_along_beam = (interception.z - beam.z) * beam_direction_z + (
+                interception.y - beam.y
+            ) * beam_direction_y
+            turn = beam_dangle * RADIANS_PER_DEGREE * distance_along_beam
+            offset_z = beam_dz - turn * beam_direction_y
+            offset_y = beam_dy + turn * beam_direction_z
+            distance_along_line = (offset_z * beam_direction_y - offset_y * beam_direction_z) / (
+                line_direction_z * beam_direction_y - line_direction_y * beam_direction_z
+            )
+            interception_dy = distance_along_line * line_direction_y
+            interception_dz = distance_along_line * line_direction_z
+
+            component_dy = np.zeros(shape[1])
+            component_dangle = np.zeros(shape[1])
+            for parameter_index in component_parameters[component_index]:
+                beamline_parameter = beamline_parameters[parameter_index]
+                is_moved = moved[parameter_index]
+                if isinstance(beamline_parameter, TrackingPosition):
+                    component_dy = np.where(
+                        is_moved,
+                        interception_dy + unit_set_points[parameter_index] * line_direction_y,
+                        component_dy,
+                    )
+                elif isinstance(beamline_parameter, ReflectionAngle):
+                    component_dangle = np.where(
+                        is_moved, beam_dangle + unit_set_points[parameter_index], component_dangle
+                    )
+
+            if isinstance(component, ReflectingComponent) and component.enabled:
+                beam_dy = interception_dy
+                beam_dz = interception_dz
+                beam_dangle = 2 * component_dangle - beam_dangle
+
+            height[component_index] = component_dy
+            angle[component_index] = component_dangle
+            beam_height[component_index] = interception_dy
+            beam_angle[component_index] = beam_dangle
+
+        return Sensitivity(
+            [beamline_parameter.name for beamline_parameter in beamline_parameters],
+            components,
+            height,
+            angle,
+            beam_height,
+            beam_angle,
+        )
+
+    def component(self, component):
+        """
+        Args:
+            component (src.components.Component): a component of the beamline
+
+        Returns (ComponentSensitivity): the derivatives for the component
+        """
+        index = self._component_indices[component]
+        return ComponentSensitivity(
+            self.height[index], self.angle[index], self.beam_height[index], self.beam_angle[index]
+        )
+
+    def height_changes(self, set_point_changes):
+        """
+        Args:
+            set_point_changes (dict): small changes to the set points of parameters by name
+
+        Returns: the linear estimate of the change in height of each component's set point position
+        """
+        return self.height.dot(self._column_vector(set_point_changes))
+
+    def angle_changes(self, set_point_changes):
+        """
+        Args:
+            set_point_changes (dict): small changes to the set points of parameters by name
+
+        Returns: the linear estimate of the change in angle of each component
+        """
+        return self.angle.dot(self._column_vector(set_point_changes))
+
+    def height_uncertainties(self, set_point_uncertainties):
+        """
+        Propagate independent uncertainties in the set points to the heights of the components.
+        Args:
+            set_point_uncertainties (dict): the standard uncertainty of the set points of parameters by name
+
+        Returns: the standard uncertainty of the height of each component's set point position
+        """
+        variances = self._column_vector(set_point_uncertainties) ** 2
+        return np.sqrt((self.height**2).dot(variances))
+
+    def _column_vector(self, values):
+        """
+        Args:
+            values (dict): values of parameters by name
+
+        Returns: the values as a vector in the order of the columns, zero for parameters not given
+        """
+        vector = np.zeros(len(self.parameter_names))
+        for name, value in values.items():
+            vector[self._parameter_indices[name]] = value
+        return vector
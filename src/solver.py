@@ -0,0 +1,211 @@
+"""
+Solve for the beamline parameter set points which put the beam at given heights
+"""
+
+import numpy as np
+
+from src.gemoetry import unit_direction
+from src.parameters import ReflectionAngle, TrackingPosition
+
+# Step in the set point used to calculate the derivative of the height by central difference
+DERIVATIVE_STEP = 1e-6
+
+# Tolerance on the height within which a set point is a solution
+DEFAULT_HEIGHT_TOLERANCE = 1e-9
+
+# Maximum number of Newton iterations before giving up on a solution
+DEFAULT_MAX_ITERATIONS = 50
+
+
+class BeamlineSolver(object):
+    """
+    Finds the set points of a beamline parameter which put the beam at desired heights at a component; the inverse of
+    setting the parameter and reading where the beam is. The set points are found as if the parameter were set and
+    moved in the current mode of the beamline, so parameters in the mode which follow it are moved too. The beamline
+    itself is not moved.
+    """
+
+    def __init__(
+        self, beamline, tolerance=DEFAULT_HEIGHT_TOLERANCE, max_iterations=DEFAULT_MAX_ITERATIONS
+    ):
+        """
+        Initializer.
+        Args:
+            beamline (src.beamline.Beamline): the beamline to solve for
+            tolerance: tolerance on the height within which a set point is a solution
+            max_iterations: maximum number of Newton iterations before giving up on a solution
+        """
+        self._beamline = beamline
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+
+    def solve(self, parameter_name, component_index, heights):
+        """
+        Find the set points of a parameter for each of the heights. For a reflection angle (including theta) the
+        height is that of the beam where it intercepts the component's movement; for a tracking position it is the
+        height of the tracking component itself, so the component must be the one the parameter moves.
+        Args:
+            parameter_name (str): name of the parameter to solve for
+            component_index: index of the component at which the height is desired
+            heights: the desired heights; a single height or an array of them
+
+        Returns: the set point for each height, in the same shape as the heights; nan for each height which no set point
+            was found to give, e.g. because the beam misses a component on the way
+        """
+        parameter = self._beamline.parameter(parameter_name)
+        heights = np.asarray(heights, dtype=float)
+        targets = np.atleast_1d(heights).ravel()
+
+        if isinstance(parameter, TrackingPosition):
+            set_points = self._solve_tracking_position(parameter, component_index, targets)
+        elif isinstance(parameter, ReflectionAngle):
+            set_points = self._solve_reflection_angle(parameter, component_index, targets)
+        else:
+            raise ValueError(
+                "Can not solve for parameter '{}' which is not a reflection angle or tracking position".format(
+                    parameter_name
+                )
+            )
+        return set_points.reshape(heights.shape)
+
+    def _solve_tracking_position(self, parameter, component_index, targets):
+        """
+        A tracking position does not change the beam so the set point is the distance along the line of movement from
+        the beam to the target.
+        Args:
+            parameter (src.parameters.TrackingPosition): the parameter
+            component_index: index of the component at which the height is desired
+            targets: the desired heights
+
+        Returns: the set points
+        """
+        if self._beamline.component_index(parameter.component) != component_index:
+            raise ValueError(
+                "Tracking position '{}' can only set the height of its own component".format(
+                    parameter.name
+                )
+            )
+        _, direction_y = unit_direction(parameter.component.movement_strategy.angle)
+        if direction_y == 0:
+            raise ValueError(
+                "Component of tracking position '{}' does not move vertically".format(
+                    parameter.name
+                )
+            )
+        interception = self._beamline.interception_at(component_index)
+        return (targets - interception.y) / direction_y
+
+    def _solve_reflection_angle(self, parameter, component_index, targets):
+        """
+        Estimate the set points assuming the beam travels straight from the reflecting component to the target
+        component, then refine any which do not give the target height, because other reflections or parameters in
+        the mode alter the beam, by Newton's method.
+        Args:
+            parameter (src.parameters.ReflectionAngle): the parameter
+            component_index: index of the component at which the height is desired
+            targets: the desired heights
+
+        Returns: the set points
+        """
+        reflection_index = self._beamline.component_index(parameter.component)
+        if component_index <= reflection_index:
+            raise ValueError(
+                "Height at component {} does not depend on reflection angle '{}'".format(
+                    component_index, parameter.name
+                )
+            )
+        set_points = self._straight_beam_set_points(reflection_index, component_index, targets)
+        return self._newton(parameter.name, component_index, targets, set_points)
+
+    def _straight_beam_set_points(self, reflection_index, component_index, targets):
+        """
+        The set points of a reflection angle which point the beam from the reflection at the target heights on the
+        line of movement of the target component. These are exact when nothing between them alters the beam.
+        Args:
+            reflection_index: index of the reflecting component
+            component_index: index of the target component
+            targets: the desired heights
+
+        Returns: the set points; these are zero where the target component does not move vertically
+        """
+        incoming_beam = self._beamline.beam_at(reflection_index)
+        reflection = self._beamline.interception_at(reflection_index)
+        movement = self._beamline[component_index].movement_strategy
+        line = movement.sp_position()
+        direction_z, direction_y = unit_direction(movement.angle)
+        if direction_y == 0:
+            return np.zeros_like(targets)
+
+        target_z = line.z + (targets - line.y) / direction_y * direction_z
+        beam_angle = np.degrees(np.arctan2(targets - reflection.y, target_z - reflection.z))
+        # a beam and its reverse have the same interceptions so take the direction nearest the incoming beam
+        angle_to_beam = np.mod(beam_angle - incoming_beam.angle + 90.0, 180.0) - 90.0
+        return angle_to_beam / 2.0
+
+    def _newton(self, parameter_name, component_index, targets, set_points):
+        """
+        Refine set points by Newton's method, iterating on all the set points which are not yet solutions at once. Each
+        iteration evaluates the heights at the set points and either side of them in a single batch.
+        Args:
+            parameter_name: name of the parameter
+            component_index: index of the component at which the height is desired
+            targets: the desired heights
+            set_points: initial set points
+
+        Returns: the set points; nan where no set point giving the height was found
+        """
+        set_points = np.array(set_points, dtype=float)
+        unsolved = np.arange(set_points.shape[0])
+        for _ in range(self._max_iterations):
+            if not unsolved.size:
+                return set_points
+            unsolved_set_points = set_points[unsolved]
+            heights, heights_above, heights_below = np.split(
+                self._heights(
+                    parameter_name,
+                    component_index,
+                    np.concatenate(
+                        [
+                            unsolved_set_points,
+                            unsolved_set_points + DERIVATIVE_STEP,
+                            unsolved_set_points - DERIVATIVE_STEP,
+                        ]
+                    ),
+                ),
+                3,
+            )
+            errors = heights - targets[unsolved]
+            solved = np.fabs(errors) <= self._tolerance
+            derivative = (heights_above - heights_below) / (2 * DERIVATIVE_STEP)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                next_set_points = unsolved_set_points - errors / derivative
+            failed = ~solved & ~np.isfinite(next_set_points)
+            next_set_points[failed] = np.nan
+            set_points[unsolved] = np.where(solved, unsolved_set_points, next_set_points)
+            unsolved = unsolved[~solved & ~failed]
+
+        set_points[unsolved] = np.nan
+        return set_points
+
+    def _heights(self, parameter_name, component_index, set_points):
+        """
+        Args:
+            parameter_name: name of the parameter
+            component_index: index of the component at which the height is desired
+            set_points: set points of the parameter
+
+        Returns: the height of the beam at the component for each set point; nan where the beam does not reach it
+        """
+        try:
+            return self._beamline.evaluate_batch(parameter_name, set_points).y[:, component_index]
+        except ValueError:
+            if set_points.shape[0] <= 1:
+                return np.full(set_points.shape, np.nan)
+        # the beam misses a component for some of the set points so find them by halving the batch
+        middle = set_points.shape[0] // 2
+        return np.concatenate(
+            [
+                self._heights(parameter_name, component_index, set_points[:middle]),
+                self._heights(parameter_name, component_index, set_points[middle:]),
+            ]
+        )
@@ -0,0 +1,139 @@
+import unittest
+
+import numpy as np
+from hamcrest import *
+from parameterized import parameterized
+
+from src.array_beam_path import ArrayBeamPath, calculate_interceptions
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.movement_strategy import LinearMovement
+from src.parameters import ReflectionAngle, Theta
+from tests.utils import DEFAULT_TEST_TOLERANCE, position_and_angle
+
+
+def create_components():
+    s1 = Component("s1", movement_strategy=LinearMovement(0, 1, 90))
+    super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+    s2 = Component("s2", movement_strategy=LinearMovement(0, 9, 90))
+    sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+    s3 = Component("s3", movement_strategy=LinearMovement(0, 15, 90))
+    detector = Component("detector", movement_strategy=LinearMovement(0, 20, 90))
+    return [s1, super_mirror, s2, sample, s3, detector]
+
+
+def create_beamline(use_array_engine):
+    components = create_components()
+    smangle = ReflectionAngle("smangle", components[1], sim=True)
+    theta = Theta("theta", components[3], sim=True)
+    mode = BeamlineMode("polarised", [smangle.name, theta.name])
+    beamline = Beamline(components, [smangle, theta], [], [mode], use_array_engine=use_array_engine)
+    beamline.set_incoming_beam(PositionAndAngle(0, 0, -2.5))
+    beamline.active_mode = mode
+    return beamline, smangle, theta
+
+
+class TestArrayInterceptions(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (90, 0),
+            (90, 10),
+            (-90, 10),
+            (10, 90),
+            (45, 0),
+            (45, 180),
+            (0, 45),
+            (20, 45),
+            (20, -30),
+            (135, 10),
+        ]
+    )
+    def test_GIVEN_movement_and_beam_WHEN_calculate_interceptions_THEN_matches_linear_movement_interception(
+        self, movement_angle, beam_angle
+    ):
+        movement = LinearMovement(2, 10, movement_angle)
+        beam = PositionAndAngle(1, 3, beam_angle)
+        expected = movement.calculate_interception(beam)
+
+        y, z = calculate_interceptions(2, 10, movement_angle, 1, 3, beam_angle)
+
+        assert_that(float(y), is_(close_to(expected.y, DEFAULT_TEST_TOLERANCE)))
+        assert_that(float(z), is_(close_to(expected.z, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_movement_and_beam_parallel_WHEN_calculate_interceptions_THEN_interception_is_nan(
+        self,
+    ):
+        y, z = calculate_interceptions(
+            [0, 0], [10, 10], [12.3, 90], [0, 0], [0, 0], [12.3 + 180, 0]
+        )
+
+        assert_that(np.isnan(y), contains_exactly(True, False))
+        assert_that(np.isnan(z), contains_exactly(True, False))
+
+
+class TestArrayBeamPath(unittest.TestCase):
+    def test_GIVEN_beamline_with_array_engine_WHEN_reflection_angles_set_THEN_beam_path_is_same_as_component_calculation(
+        self,
+    ):
+        expected_beamline, expected_smangle, expected_theta = create_beamline(False)
+        beamline, smangle, theta = create_beamline(True)
+
+        for sm_angle, theta_angle in [(0, 0), (0.5, 2.0), (-1.0, 10.0)]:
+            expected_smangle.sp = sm_angle
+            expected_theta.sp = theta_angle
+            smangle.sp = sm_angle
+            theta.sp = theta_angle
+
+            for index, (result, expected) in enumerate(zip(beamline, expected_beamline)):
+                assert_that(
+                    result.get_outgoing_beam(),
+                    position_and_angle(expected.get_outgoing_beam()),
+                    "component index {}".format(index),
+                )
+
+    def test_GIVEN_beamline_with_array_engine_WHEN_mirror_disabled_THEN_beam_passes_through_mirror_to_sample(
+        self,
+    ):
+        beam_start = PositionAndAngle(0, 0, 0)
+        beamline, smangle, _ = create_beamline(True)
+        beamline.set_incoming_beam(beam_start)
+        smangle.sp = 10
+
+        beamline[1].enabled = False
+
+        for index, component in enumerate(beamline[:4]):
+            assert_that(
+                component.incoming_beam,
+                position_and_angle(beam_start),
+                "component index {}".format(index),
+            )
+
+    def test_GIVEN_mirror_parallel_to_beam_WHEN_propagate_THEN_error(self):
+        components = create_components()
+        array_beam_path = ArrayBeamPath(components)
+
+        assert_that(
+            calling(array_beam_path.propagate).with_args(PositionAndAngle(0, 0, 90)),
+            raises(ValueError),
+        )
+
+    def test_GIVEN_several_beamline_states_WHEN_calculate_beam_path_THEN_each_row_is_beam_path_for_that_state(
+        self,
+    ):
+        components = create_components()
+        components[1].enabled = False
+        array_beam_path = ArrayBeamPath(components)
+        angles = np.array([[0, 0, 0, 0, 0, 0], [0, 0, 0, 5, 0, 0]], dtype=float)
+
+        result = array_beam_path.calculate_beam_path(PositionAndAngle(0, 0, 0), angles=angles)
+
+        assert_that(result.angle[0], contains_exactly(0, 0, 0, 0, 0, 0))
+        assert_that(result.angle[1], contains_exactly(0, 0, 0, 10, 10, 10))
+        assert_that(
+            result.y[1, 5], is_(close_to(10 * np.tan(np.radians(10)), DEFAULT_TEST_TOLERANCE))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
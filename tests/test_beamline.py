@@ -1,12 +1,14 @@
 import unittest
 
 from hamcrest import *
+from mock import patch
 
-from src.beamline import Beamline
+from src.beamline import Beamline, BeamlineMode
 from src.components import Component, ReflectingComponent
 from src.gemoetry import PositionAndAngle
 from src.movement_strategy import LinearMovement
-from tests.utils import position_and_angle
+from src.parameters import ComponentEnabled, ReflectionAngle, Theta, TrackingPosition
+from tests.utils import DEFAULT_TEST_TOLERANCE, position, position_and_angle
 
 
 class TestComponentBeamline(unittest.TestCase):
@@ -87,6 +89,597 @@ class TestComponentBeamline(unittest.TestCase):
                 result, position_and_angle(expected_beam), "in component index {}".format(index)
             )
 
+    def test_GIVEN_beam_line_contains_multiple_component_WHEN_angle_on_mirror_changed_THEN_components_upstream_of_mirror_are_not_recalculated(
+        self,
+    ):
+        beam_start = PositionAndAngle(y=0, z=0, angle=0)
+        beamline, mirror = self.setup_beamline(0, 10, beam_start)
+        jaws = beamline[0]
+
+        with patch.object(jaws, "set_incoming_beam") as mock_set_incoming_beam:
+            mirror.angle = 45
+
+        mock_set_incoming_beam.assert_not_called()
+        assert_that(
+            beamline[2].incoming_beam, position_and_angle(PositionAndAngle(y=0, z=10, angle=90))
+        )
+
+    def test_GIVEN_beam_line_with_array_engine_WHEN_angle_on_mirror_changed_THEN_components_upstream_of_mirror_are_not_recalculated(
+        self,
+    ):
+        jaws = Component("jaws", movement_strategy=LinearMovement(0, 0, 90))
+        mirror = ReflectingComponent("mirror", movement_strategy=LinearMovement(0, 10, 90))
+        jaws3 = Component("jaws3", movement_strategy=LinearMovement(0, 20, 90))
+        beamline = Beamline([jaws, mirror, jaws3], [], [], [], use_array_engine=True)
+        beamline.set_incoming_beam(PositionAndAngle(y=0, z=0, angle=0))
+
+        with patch.object(jaws, "set_incoming_beam") as mock_set_incoming_beam:
+            mirror.angle = 45
+
+        mock_set_incoming_beam.assert_not_called()
+        assert_that(jaws3.incoming_beam, position_and_angle(PositionAndAngle(y=0, z=10, angle=90)))
+
+
+class TestBeamlineTransforms(unittest.TestCase):
+    def create_beamline(self, beam_start):
+        jaws = Component("jaws", movement_strategy=LinearMovement(0, 0, 90))
+        mirror = ReflectingComponent("mirror", movement_strategy=LinearMovement(0, 10, 90))
+        mirror.angle = 5
+        tilted_jaws = Component("tilted jaws", movement_strategy=LinearMovement(0, 15, 80))
+        sample = ReflectingComponent("sample", movement_strategy=LinearMovement(1, 20, 90))
+        sample.angle = -3
+        detector = Component("detector", movement_strategy=LinearMovement(0, 30, 90))
+        beamline = Beamline([jaws, mirror, tilted_jaws, sample, detector], [], [], [])
+        beamline.set_incoming_beam(beam_start)
+        return beamline
+
+    def test_GIVEN_beamline_WHEN_get_beam_and_interception_at_component_THEN_they_are_the_current_beam_and_interception(
+        self,
+    ):
+        beamline = self.create_beamline(PositionAndAngle(0.5, -1, 1))
+
+        for index, component in enumerate(beamline):
+            assert_that(
+                beamline.beam_at(index),
+                position_and_angle(component.incoming_beam),
+                "component index {}".format(index),
+            )
+            assert_that(
+                beamline.interception_at(index),
+                position(component.calculate_beam_interception()),
+                "component index {}".format(index),
+            )
+
+    def test_GIVEN_incoming_beam_parallel_to_current_incoming_beam_WHEN_get_beam_and_interception_at_component_THEN_they_are_as_if_the_incoming_beam_were_set(
+        self,
+    ):
+        beamline = self.create_beamline(PositionAndAngle(0.5, -1, 1))
+        offset_beam = PositionAndAngle(0.8, 3, 1)
+        expected_beamline = self.create_beamline(offset_beam)
+
+        for index, component in enumerate(expected_beamline):
+            assert_that(
+                beamline.beam_at(index, offset_beam),
+                position_and_angle(component.incoming_beam),
+                "component index {}".format(index),
+            )
+            assert_that(
+                beamline.interception_at(index, offset_beam),
+                position(component.calculate_beam_interception()),
+                "component index {}".format(index),
+            )
+
+    def test_GIVEN_transforms_built_WHEN_mirror_angle_changed_THEN_beam_at_downstream_component_is_updated(
+        self,
+    ):
+        beamline = self.create_beamline(PositionAndAngle(0, 0, 0))
+        offset_beam = PositionAndAngle(1, 0, 0)
+        beamline.beam_at(4, offset_beam)
+
+        beamline[3].angle = 4
+        result = beamline.beam_at(4, offset_beam)
+
+        expected_beamline = self.create_beamline(offset_beam)
+        expected_beamline[3].angle = 4
+        assert_that(result, position_and_angle(expected_beamline[4].incoming_beam))
+
+    def test_GIVEN_incoming_beam_not_parallel_to_current_incoming_beam_WHEN_get_beam_at_component_THEN_error(
+        self,
+    ):
+        beamline = self.create_beamline(PositionAndAngle(0, 0, 0))
+
+        assert_that(
+            calling(beamline.beam_at).with_args(2, PositionAndAngle(0, 0, 1)), raises(ValueError)
+        )
+
+
+class TestBeamlineEvaluateBatch(unittest.TestCase):
+    use_array_engine = False
+
+    def setUp(self):
+        self.super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        self.analyser = ReflectingComponent("analyser", movement_strategy=LinearMovement(0, 15, 90))
+        self.detector = Component("detector", movement_strategy=LinearMovement(0, 20, 90))
+        self.sm_enabled = ComponentEnabled("smenabled", self.super_mirror, sim=True, init=True)
+        self.smangle = ReflectionAngle("smangle", self.super_mirror, sim=True)
+        self.theta = Theta("theta", self.sample, sim=True)
+        self.analyser_angle = ReflectionAngle("analyserangle", self.analyser, sim=True, init=1.0)
+        parameters = [self.sm_enabled, self.smangle, self.theta, self.analyser_angle]
+        self.mode = BeamlineMode("mode", [parameter.name for parameter in parameters])
+        self.beamline = Beamline(
+            [self.super_mirror, self.sample, self.analyser, self.detector],
+            parameters,
+            [],
+            [self.mode],
+            use_array_engine=self.use_array_engine,
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = self.mode
+        self.beamline.move = 1
+
+    def assert_row_matches_beamline(self, result, row):
+        for index, component in enumerate(self.beamline):
+            interception = component.calculate_beam_interception()
+            assert_that(
+                result.y[row, index],
+                is_(close_to(interception.y, DEFAULT_TEST_TOLERANCE)),
+                "y of component {} in row {}".format(index, row),
+            )
+            assert_that(
+                result.z[row, index],
+                is_(close_to(interception.z, DEFAULT_TEST_TOLERANCE)),
+                "z of component {} in row {}".format(index, row),
+            )
+            assert_that(
+                result.angle[row, index],
+                is_(close_to(component.get_outgoing_beam().angle, DEFAULT_TEST_TOLERANCE)),
+                "angle of component {} in row {}".format(index, row),
+            )
+
+    def test_GIVEN_theta_values_WHEN_evaluate_batch_THEN_each_row_is_beam_path_after_moving_to_theta(
+        self,
+    ):
+        thetas = [0.0, 1.5, 10.0]
+
+        result = self.beamline.evaluate_batch("theta", thetas)
+
+        for row, theta in enumerate(thetas):
+            self.theta.sp = theta
+            self.assert_row_matches_beamline(result, row)
+
+    def test_GIVEN_theta_values_WHEN_evaluate_batch_THEN_beamline_is_not_moved(self):
+        self.theta.sp = 2.0
+        sample_angle = self.sample.angle
+        analyser_beam = self.analyser.incoming_beam
+
+        self.beamline.evaluate_batch("theta", [0.0, 1.5, 10.0])
+
+        assert_that(self.theta.sp, is_(2.0))
+        assert_that(self.sample.angle, is_(sample_angle))
+        assert_that(self.analyser.incoming_beam, is_(analyser_beam))
+
+    def test_GIVEN_several_parameters_WHEN_evaluate_batch_THEN_each_row_is_beam_path_after_moving_to_all_set_points(
+        self,
+    ):
+        smangles = [0.5, -0.5]
+        thetas = [1.0, 2.0]
+
+        result = self.beamline.evaluate_batch(
+            "smangle", smangles, {"theta": thetas, "smenabled": [True, False]}
+        )
+
+        self.smangle.sp = smangles[0]
+        self.theta.sp = thetas[0]
+        self.assert_row_matches_beamline(result, 0)
+        self.sm_enabled.sp = False
+        self.smangle.sp = smangles[1]
+        self.theta.sp = thetas[1]
+        self.assert_row_matches_beamline(result, 1)
+
+    def test_GIVEN_unknown_parameter_WHEN_evaluate_batch_THEN_key_error(self):
+        assert_that(
+            calling(self.beamline.evaluate_batch).with_args("nonsense", [1.0]), raises(KeyError)
+        )
+
+    def test_GIVEN_component_moved_along_its_movement_WHEN_evaluate_batch_THEN_positions_are_moved_positions(
+        self,
+    ):
+        self.detector.set_position_relative_to_beam(3.0)
+
+        result = self.beamline.evaluate_batch("theta", [0.0])
+
+        beam_height = self.detector.calculate_beam_interception().y
+        assert_that(
+            result.position_y[0, 3], is_(close_to(beam_height + 3.0, DEFAULT_TEST_TOLERANCE))
+        )
+
+
+class TestBeamlineEvaluateBatchWithArrayEngine(TestBeamlineEvaluateBatch):
+    use_array_engine = True
+
+
+class TestBeamlineBatch(unittest.TestCase):
+    def setUp(self):
+        self.super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        self.slit = Component("slit", movement_strategy=LinearMovement(0, 15, 90))
+        self.detector = Component("detector", movement_strategy=LinearMovement(0, 20, 90))
+        self.smangle = ReflectionAngle("smangle", self.super_mirror, sim=True)
+        self.theta = Theta("theta", self.sample, sim=True)
+        self.slit_position = TrackingPosition("slitpos", self.slit, sim=True)
+        parameters = [self.smangle, self.theta, self.slit_position]
+        self.mode = BeamlineMode("mode", [parameter.name for parameter in parameters])
+        self.beamline = Beamline(
+            [self.super_mirror, self.sample, self.slit, self.detector], parameters, [], [self.mode]
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = self.mode
+        self.beamline.move = 1
+
+    def test_GIVEN_batch_WHEN_set_points_set_THEN_components_not_moved_until_batch_ends(self):
+        with self.beamline.batch():
+            self.smangle.sp = 1.0
+            self.theta.sp = 2.0
+
+            assert_that(self.super_mirror.angle, is_(0))
+            assert_that(self.sample.angle, is_(0))
+
+        assert_that(self.super_mirror.angle, is_(close_to(1.0, DEFAULT_TEST_TOLERANCE)))
+        assert_that(self.sample.angle, is_(close_to(4.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_batch_WHEN_set_points_set_THEN_beamline_is_as_if_set_outside_batch(self):
+        with self.beamline.batch():
+            self.slit_position.sp = 0.5
+            self.theta.sp = 2.0
+            self.smangle.sp = 1.0
+        batch_results = [
+            (component.sp_position(), component.get_outgoing_beam()) for component in self.beamline
+        ]
+
+        self.setUp()
+        self.slit_position.sp = 0.5
+        self.theta.sp = 2.0
+        self.smangle.sp = 1.0
+
+        for component, (sp_position, outgoing_beam) in zip(self.beamline, batch_results):
+            assert_that(component.sp_position(), position(sp_position))
+            assert_that(component.get_outgoing_beam(), position_and_angle(outgoing_beam))
+
+    def test_GIVEN_batch_WHEN_several_set_points_set_THEN_beam_path_is_calculated_once(self):
+        with patch.object(
+            self.detector, "set_incoming_beam", wraps=self.detector.set_incoming_beam
+        ) as mock_set_incoming_beam:
+            with self.beamline.batch():
+                self.smangle.sp = 1.0
+                self.theta.sp = 2.0
+                self.slit_position.sp = 0.5
+
+        assert_that(mock_set_incoming_beam.call_count, is_(1))
+
+    def test_GIVEN_nested_batch_WHEN_inner_batch_ends_THEN_components_not_moved(self):
+        with self.beamline.batch():
+            with self.beamline.batch():
+                self.theta.sp = 2.0
+
+            assert_that(self.sample.angle, is_(0))
+
+        assert_that(self.sample.angle, is_(close_to(2.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_batch_WHEN_error_in_batch_THEN_moves_are_discarded(self):
+        try:
+            with self.beamline.batch():
+                self.theta.sp = 2.0
+                raise RuntimeError("error")
+        except RuntimeError:
+            pass
+
+        assert_that(self.sample.angle, is_(0))
+        assert_that(self.theta.sp_changed, is_(True))
+
+    def test_GIVEN_batch_WHEN_interrupted_THEN_moves_are_discarded_and_later_moves_are_made(self):
+        try:
+            with self.beamline.batch():
+                self.theta.sp = 2.0
+                raise KeyboardInterrupt()
+        except KeyboardInterrupt:
+            pass
+
+        self.theta.sp = 3.0
+
+        assert_that(self.sample.angle, is_(close_to(3.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_batch_WHEN_beamline_moved_twice_THEN_drivers_moved_once_at_end(self):
+        with patch.object(self.beamline, "_move_drivers") as mock_move_drivers:
+            with self.beamline.batch():
+                self.theta.sp_no_move = 2.0
+                self.beamline.move = 1
+                self.beamline.move = 1
+
+                mock_move_drivers.assert_not_called()
+
+        mock_move_drivers.assert_called_once()
+        assert_that(self.sample.angle, is_(close_to(2.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_no_batch_WHEN_commit_batch_THEN_error(self):
+        assert_that(calling(self.beamline.commit_batch), raises(ValueError))
+
+
+class TestBeamlineParameterDependencies(unittest.TestCase):
+    def setUp(self):
+        self.upstream_slit = Component("s1", movement_strategy=LinearMovement(0, 5, 90))
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        self.downstream_slit = Component("s3", movement_strategy=LinearMovement(0, 15, 90))
+        self.theta = Theta("theta", self.sample, sim=True)
+        self.sample_height = TrackingPosition("sampleheight", self.sample, sim=True)
+        self.upstream_slit_position = TrackingPosition("s1pos", self.upstream_slit, sim=True)
+        self.downstream_slit_position = TrackingPosition("s3pos", self.downstream_slit, sim=True)
+        parameters = [
+            self.theta,
+            self.sample_height,
+            self.upstream_slit_position,
+            self.downstream_slit_position,
+        ]
+        mode = BeamlineMode("mode", [parameter.name for parameter in parameters])
+        self.beamline = Beamline(
+            [self.upstream_slit, self.sample, self.downstream_slit], parameters, [], [mode]
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = mode
+        self.beamline.move = 1
+
+    def moved_parameters_on_setting_theta(self):
+        moved = []
+        for parameter in [
+            self.theta,
+            self.sample_height,
+            self.upstream_slit_position,
+            self.downstream_slit_position,
+        ]:
+            parameter._move_component = self.recording_move(parameter, moved)
+
+        self.theta.sp = 2.0
+        return moved
+
+    @staticmethod
+    def recording_move(parameter, moved):
+        move_component = parameter._move_component
+
+        def record_and_move():
+            moved.append(parameter.name)
+            move_component()
+
+        return record_and_move
+
+    def test_GIVEN_parameters_in_mode_after_theta_WHEN_theta_moved_THEN_only_parameters_on_components_downstream_of_sample_are_moved(
+        self,
+    ):
+        result = self.moved_parameters_on_setting_theta()
+
+        assert_that(result, contains("theta", "s3pos"))
+
+    def test_GIVEN_theta_moved_WHEN_downstream_slit_not_moved_THEN_downstream_slit_still_tracks_beam(
+        self,
+    ):
+        self.downstream_slit_position.sp = 1.0
+
+        self.theta.sp = 2.0
+
+        beam_height = self.downstream_slit.calculate_beam_interception().y
+        assert_that(
+            self.downstream_slit.sp_position().y,
+            is_(close_to(beam_height + 1.0, DEFAULT_TEST_TOLERANCE)),
+        )
+
+    def test_GIVEN_upstream_parameter_set_point_changed_WHEN_theta_moved_THEN_upstream_parameter_is_moved(
+        self,
+    ):
+        self.upstream_slit_position.sp_no_move = 1.0
+
+        self.theta.sp = 2.0
+
+        assert_that(self.upstream_slit.sp_position().y, is_(close_to(1.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_incoming_beam_changed_WHEN_theta_moved_THEN_all_parameters_are_moved(self):
+        self.beamline.set_incoming_beam(PositionAndAngle(1, 0, 0))
+
+        result = self.moved_parameters_on_setting_theta()
+
+        assert_that(result, contains("theta", "sampleheight", "s1pos", "s3pos"))
+
+
+class TestBeamlineStaleParameters(unittest.TestCase):
+    def setUp(self):
+        self.upstream_slit = Component("s1", movement_strategy=LinearMovement(0, 5, 90))
+        self.super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 10, 90))
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 20, 90))
+        self.downstream_slit = Component("s3", movement_strategy=LinearMovement(0, 30, 90))
+        self.upstream_slit_position = TrackingPosition("s1pos", self.upstream_slit, sim=True)
+        self.smangle = ReflectionAngle("smangle", self.super_mirror, sim=True, init=0.0)
+        self.theta = Theta("theta", self.sample, sim=True, init=1.0)
+        self.downstream_slit_position = TrackingPosition("s3pos", self.downstream_slit, sim=True)
+        self.nr_mode = BeamlineMode("nr", ["s1pos", "theta", "s3pos"])
+        self.super_mirror_mode = BeamlineMode("sm only", ["smangle"])
+        self.beamline = Beamline(
+            [self.upstream_slit, self.super_mirror, self.sample, self.downstream_slit],
+            [
+                self.upstream_slit_position,
+                self.smangle,
+                self.theta,
+                self.downstream_slit_position,
+            ],
+            [],
+            [self.nr_mode, self.super_mirror_mode],
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = self.nr_mode
+        self.beamline.move = 1
+
+    def assert_theta_is_relative_to_beam(self):
+        beam_angle = self.sample.incoming_beam.angle
+        assert_that(
+            self.sample.angle - beam_angle, is_(close_to(self.theta.sp_rbv, DEFAULT_TEST_TOLERANCE))
+        )
+
+    def test_GIVEN_component_changed_directly_WHEN_upstream_parameter_moved_THEN_parameter_on_component_is_moved(
+        self,
+    ):
+        self.sample.angle = 3.0
+
+        self.upstream_slit_position.sp = 1.0
+
+        self.assert_theta_is_relative_to_beam()
+
+    def test_GIVEN_beam_changed_by_parameter_out_of_mode_WHEN_mode_changed_back_and_upstream_parameter_moved_THEN_parameter_is_moved(
+        self,
+    ):
+        self.beamline.active_mode = self.super_mirror_mode
+        self.smangle.sp = 0.5
+        self.beamline.active_mode = self.nr_mode
+
+        self.upstream_slit_position.sp = 1.0
+
+        self.assert_theta_is_relative_to_beam()
+
+
+class TestBeamlineMovePlanCache(unittest.TestCase):
+    def setUp(self):
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        self.slit = Component("slit", movement_strategy=LinearMovement(0, 15, 90))
+        self.theta = Theta("theta", self.sample, sim=True)
+        self.slit_position = TrackingPosition("slitpos", self.slit, sim=True)
+        parameters = [self.theta, self.slit_position]
+        mode = BeamlineMode("mode", [parameter.name for parameter in parameters])
+        self.beamline = Beamline(
+            [self.sample, self.slit], parameters, [], [mode], move_plan_cache_size=2
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = mode
+
+    def move_to(self, theta):
+        self.theta.sp_no_move = theta
+        self.beamline.move = 1
+
+    def test_GIVEN_beamline_moved_to_configuration_before_WHEN_move_THEN_cache_hit_and_parameters_not_moved(
+        self,
+    ):
+        self.move_to(1.0)
+        self.move_to(2.0)
+
+        with patch.object(self.theta, "_move_component") as mock_move_component:
+            self.move_to(1.0)
+
+        mock_move_component.assert_not_called()
+        assert_that(self.beamline.move_plan_cache.hits, is_(1))
+        assert_that(self.beamline.move_plan_cache.misses, is_(2))
+
+    def test_GIVEN_cache_hit_WHEN_move_THEN_components_and_parameters_are_as_if_moved(self):
+        self.move_to(1.0)
+        expected_slit_position = self.slit.sp_position()
+        expected_beam = self.slit.incoming_beam
+        self.move_to(2.0)
+
+        self.move_to(1.0)
+
+        assert_that(self.sample.angle, is_(close_to(1.0, DEFAULT_TEST_TOLERANCE)))
+        assert_that(self.slit.sp_position(), position(expected_slit_position))
+        assert_that(self.slit.get_outgoing_beam(), position_and_angle(expected_beam))
+        assert_that(self.theta.sp_rbv, is_(1.0))
+        assert_that(self.theta.sp_changed, is_(False))
+
+    def test_GIVEN_cache_hit_WHEN_move_THEN_drivers_moved(self):
+        self.move_to(1.0)
+
+        with patch.object(self.beamline, "_move_drivers") as mock_move_drivers:
+            self.move_to(1.0)
+
+        mock_move_drivers.assert_called_once()
+
+    def test_GIVEN_component_changed_directly_WHEN_move_to_previous_configuration_THEN_cache_miss(
+        self,
+    ):
+        self.move_to(1.0)
+        self.sample.enabled = False
+
+        self.move_to(1.0)
+
+        assert_that(self.beamline.move_plan_cache.hits, is_(0))
+
+
+class TestBeamlineState(unittest.TestCase):
+    def setUp(self):
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        self.slit = Component("slit", movement_strategy=LinearMovement(0, 15, 90))
+        self.theta = Theta("theta", self.sample, sim=True)
+        self.slit_position = TrackingPosition("slitpos", self.slit, sim=True)
+        parameters = [self.theta, self.slit_position]
+        self.mode = BeamlineMode(
+            "mode", [parameter.name for parameter in parameters], sp_inits={"slitpos": 0.5}
+        )
+        self.beamline = Beamline([self.sample, self.slit], parameters, [], [self.mode])
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+
+    def test_GIVEN_beamline_WHEN_mode_set_THEN_state_with_mode_and_initial_set_points_is_published(
+        self,
+    ):
+        old_state = self.beamline.state
+
+        self.beamline.active_mode = self.mode
+
+        state = self.beamline.state
+        assert_that(state.active_mode_name, is_("MODE"))
+        assert_that(state.parameter("slitpos").sp, is_(0.5))
+        assert_that(state.parameter("slitpos").sp_changed, is_(True))
+        assert_that(state.version, is_(old_state.version + 1))
+        assert_that(old_state.active_mode_name, is_(None))
+
+    def test_GIVEN_state_read_WHEN_parameter_moved_THEN_state_read_is_unchanged_and_new_state_published(
+        self,
+    ):
+        self.beamline.active_mode = self.mode
+        old_state = self.beamline.state
+
+        self.theta.sp = 1.0
+
+        assert_that(old_state.parameter("theta").sp, is_(0))
+        assert_that(self.beamline.state.parameter("theta").sp, is_(1.0))
+        assert_that(self.beamline.state.parameter("theta").sp_rbv, is_(1.0))
+        assert_that(self.beamline.state.parameter("theta").sp_changed, is_(False))
+
+    def test_GIVEN_parameter_moving_WHEN_state_read_during_move_THEN_state_is_from_before_move(
+        self,
+    ):
+        self.beamline.active_mode = self.mode
+        self.beamline.move = 1
+        states_during_move = []
+        move_component = self.slit_position._move_component
+
+        def read_state_and_move():
+            states_during_move.append(self.beamline.state)
+            move_component()
+
+        with patch.object(self.slit_position, "_move_component", side_effect=read_state_and_move):
+            self.theta.sp = 1.0
+
+        assert_that(states_during_move[0].parameter("theta").sp, is_(1.0))
+        assert_that(states_during_move[0].parameter("theta").sp_rbv, is_(0))
+        assert_that(states_during_move[0].parameter("theta").sp_changed, is_(True))
+        assert_that(self.beamline.state.parameter("theta").sp_rbv, is_(1.0))
+
+    def test_GIVEN_batch_WHEN_set_points_set_THEN_state_published_once_batch_ends(self):
+        self.beamline.active_mode = self.mode
+        old_state = self.beamline.state
+
+        with self.beamline.batch():
+            self.theta.sp_no_move = 1.0
+            self.slit_position.sp_no_move = 2.0
+
+            assert_that(self.beamline.state, is_(old_state))
+
+        assert_that(self.beamline.state.parameter("theta").sp, is_(1.0))
+        assert_that(self.beamline.state.parameter("slitpos").sp, is_(2.0))
+        assert_that(self.beamline.state.version, is_(old_state.version + 1))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -152,6 +152,82 @@ class TestBeamlineParameter(unittest.TestCase):
         assert_that(super_mirror.enabled, is_(enabled_sp))
 
 
+class TestBeamlineParameterDeadband(unittest.TestCase):
+    def setUp(self):
+        self.slit = Component("slit", movement_strategy=LinearMovement(0, 10, 90))
+        self.slit.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.slit_position = TrackingPosition("slitpos", self.slit, deadband=0.01)
+        self.sp_changed_count = 0
+        self.slit_position.sp = 1.0
+
+        def count_sp_changes(_):
+            self.sp_changed_count += 1
+
+        self.slit_position.after_sp_changed_listener = count_sp_changes
+
+    def test_GIVEN_parameter_with_deadband_WHEN_set_point_set_within_deadband_THEN_set_point_not_changed(
+        self,
+    ):
+        self.slit_position.sp_no_move = 1.005
+
+        assert_that(self.slit_position.sp, is_(1.0))
+        assert_that(self.slit_position.sp_changed, is_(False))
+        assert_that(self.sp_changed_count, is_(0))
+
+    def test_GIVEN_parameter_with_deadband_WHEN_set_point_set_outside_deadband_THEN_set_point_changed(
+        self,
+    ):
+        self.slit_position.sp_no_move = 1.02
+
+        assert_that(self.slit_position.sp, is_(1.02))
+        assert_that(self.slit_position.sp_changed, is_(True))
+        assert_that(self.sp_changed_count, is_(1))
+
+    def test_GIVEN_parameter_moved_to_set_point_WHEN_set_and_move_within_deadband_THEN_not_moved(
+        self,
+    ):
+        moves = []
+        self.slit_position.after_move_listener = moves.append
+
+        self.slit_position.sp = 1.0
+
+        assert_that(moves, is_(empty()))
+
+    def test_GIVEN_parameter_set_point_changed_but_not_moved_WHEN_set_and_move_within_deadband_THEN_moved_to_set_point(
+        self,
+    ):
+        self.slit_position.sp_no_move = 2.0
+
+        self.slit_position.sp = 2.0
+
+        assert_that(self.slit_position.sp_rbv, is_(2.0))
+        assert_that(self.slit.sp_position(), position(Position(2.0, 10)))
+
+    def test_GIVEN_parameter_without_deadband_WHEN_same_set_point_set_THEN_set_point_changed(self):
+        slit_position = TrackingPosition("slitpos", self.slit)
+        slit_position.sp = 1.0
+
+        slit_position.sp_no_move = 1.0
+
+        assert_that(slit_position.sp_changed, is_(True))
+
+    def test_GIVEN_parameter_moved_to_set_point_and_beam_moved_upstream_WHEN_set_and_move_within_deadband_THEN_moved_onto_new_beam(
+        self,
+    ):
+        super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 0, 90))
+        smangle = ReflectionAngle("smangle", super_mirror)
+        mode = BeamlineMode("mode", [smangle.name])
+        beamline = Beamline([super_mirror, self.slit], [smangle, self.slit_position], [], [mode])
+        beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        beamline.active_mode = mode
+        self.slit_position.sp = 1.0
+        smangle.sp = 22.5
+
+        self.slit_position.sp = 1.0
+
+        assert_that(self.slit.sp_position(), position(Position(11.0, 10)))
+
+
 class TestBeamlineModes(unittest.TestCase):
     def test_GIVEN_unpolarised_mode_and_beamline_parameters_are_set_WHEN_move_THEN_components_move_onto_beam_line(
         self,
@@ -481,6 +557,47 @@ class TestBeamlineOnMove(unittest.TestCase):
 
         assert_that(moves, contains(1, 1, 1), "beamline parameter move counts")
 
+    def test_GIVEN_three_beamline_parameters_none_in_mode_and_2nd_changed_WHEN_move_beamline_THEN_only_2nd_moves(
+        self,
+    ):
+        beamline_parameters, beamline = DataMother.beamline_with_3_empty_parameters()
+        beamline.active_mode = BeamlineMode("none", [])
+
+        beamline_parameters[1].sp_no_move = 12.0
+        beamline.move = 1
+        moves = [
+            beamline_parameter.move_component_count for beamline_parameter in beamline_parameters
+        ]
+
+        assert_that(moves, contains(0, 1, 0), "beamline parameter move counts")
+
+    def test_GIVEN_changed_parameter_moved_on_its_own_WHEN_move_beamline_THEN_it_is_not_moved_again(
+        self,
+    ):
+        beamline_parameters, beamline = DataMother.beamline_with_3_empty_parameters()
+        beamline.active_mode = BeamlineMode("none", [])
+        beamline_parameters[1].sp_no_move = 12.0
+        beamline_parameters[1].move_no_callback()
+
+        beamline.move = 1
+        moves = [
+            beamline_parameter.move_component_count for beamline_parameter in beamline_parameters
+        ]
+
+        assert_that(moves, contains(0, 1, 0), "beamline parameter move counts")
+
+
+class TestBeamlineModeCompile(unittest.TestCase):
+    def test_GIVEN_mode_WHEN_compile_against_parameters_THEN_indices_of_parameters_in_mode_in_order(
+        self,
+    ):
+        parameters = [EmptyBeamlineParameter(name) for name in ["one", "two", "three", "four"]]
+        mode = BeamlineMode("mode", ["four", "two", "not on beamline"])
+
+        result = mode.compile(parameters)
+
+        assert_that(result, is_([1, 3]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from hamcrest import *
+
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.movement_strategy import LinearMovement
+from src.parameters import ComponentEnabled, ReflectionAngle, Theta, TrackingPosition
+from tests.utils import DEFAULT_TEST_TOLERANCE, position
+
+
+class TestBeamlineSnapshot(unittest.TestCase):
+    use_array_engine = False
+
+    def setUp(self):
+        self.super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        self.slit = Component("slit", movement_strategy=LinearMovement(0, 15, 90))
+        self.detector = Component("detector", movement_strategy=LinearMovement(0, 20, 90))
+        self.parameters = [
+            ComponentEnabled("smenabled", self.super_mirror, sim=True, init=True),
+            ReflectionAngle("smangle", self.super_mirror, sim=True),
+            Theta("theta", self.sample, sim=True),
+            TrackingPosition("slitpos", self.slit, sim=True),
+        ]
+        mode = BeamlineMode("mode", [parameter.name for parameter in self.parameters])
+        self.beamline = Beamline(
+            [self.super_mirror, self.sample, self.slit, self.detector],
+            self.parameters,
+            [],
+            [mode],
+            use_array_engine=self.use_array_engine,
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = mode
+        self.beamline.move = 1
+
+    def assert_snapshot_matches_beamline(self, snapshot):
+        beam_path = snapshot.beam_path()
+        for index, component in enumerate(self.beamline):
+            assert_that(
+                snapshot.sp_position(index),
+                position(component.sp_position()),
+                "position of component {}".format(index),
+            )
+            assert_that(
+                beam_path.y[0, index],
+                close_to(component.calculate_beam_interception().y, DEFAULT_TEST_TOLERANCE),
+                "beam height at component {}".format(index),
+            )
+            assert_that(
+                beam_path.angle[0, index],
+                close_to(component.get_outgoing_beam().angle, DEFAULT_TEST_TOLERANCE),
+                "beam angle at component {}".format(index),
+            )
+
+    def test_GIVEN_component_moved_along_its_movement_WHEN_snapshot_THEN_snapshot_has_moved_position(
+        self,
+    ):
+        self.beamline.parameter("slitpos").sp = 3.0
+
+        snapshot = self.beamline.snapshot()
+
+        assert_that(snapshot.sp_position(2), position(self.slit.sp_position()))
+        assert_that(snapshot.sp_position(2).y, is_(close_to(3.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_snapshot_WHEN_set_points_set_THEN_beamline_is_unchanged(self):
+        snapshot = self.beamline.snapshot()
+
+        snapshot.set_sp("theta", 2.0)
+        snapshot.set_sp("slitpos", 1.0)
+
+        assert_that(self.beamline.parameter("theta").sp, is_(0))
+        assert_that(self.sample.angle, is_(0))
+        assert_that(self.slit.sp_position().y, is_(0.0))
+        assert_that(snapshot.sp("theta"), is_(2.0))
+
+    def test_GIVEN_snapshot_WHEN_set_points_set_THEN_snapshot_is_as_beamline_would_be_after_moving(
+        self,
+    ):
+        snapshot = self.beamline.snapshot()
+
+        snapshot.set_sps({"smangle": 0.5, "slitpos": 1.0})
+        snapshot.set_sp("theta", 2.0)
+
+        self.beamline.parameter("smangle").sp = 0.5
+        self.beamline.parameter("slitpos").sp = 1.0
+        self.beamline.parameter("theta").sp = 2.0
+        self.assert_snapshot_matches_beamline(snapshot)
+
+    def test_GIVEN_snapshot_WHEN_component_disabled_THEN_snapshot_is_as_beamline_would_be(self):
+        self.beamline.parameter("smangle").sp = 0.5
+        snapshot = self.beamline.snapshot()
+
+        snapshot.set_sp("smenabled", False)
+
+        assert_that(snapshot.enabled(0), is_(False))
+        self.beamline.parameter("smenabled").sp = False
+        self.assert_snapshot_matches_beamline(snapshot)
+
+    def test_GIVEN_snapshot_of_snapshot_WHEN_parent_changed_THEN_child_is_unchanged(self):
+        parent = self.beamline.snapshot()
+        parent.set_sp("theta", 1.0)
+        child = parent.snapshot()
+
+        parent.set_sp("theta", 3.0)
+
+        assert_that(child.sp("theta"), is_(1.0))
+        assert_that(child.angle(1), is_(close_to(1.0, DEFAULT_TEST_TOLERANCE)))
+        assert_that(parent.angle(1), is_(close_to(3.0, DEFAULT_TEST_TOLERANCE)))
+
+    def test_GIVEN_beamline_changed_after_snapshot_WHEN_read_snapshot_THEN_snapshot_is_unchanged(
+        self,
+    ):
+        snapshot = self.beamline.snapshot()
+
+        self.beamline.parameter("theta").sp = 3.0
+
+        assert_that(snapshot.angle(1), is_(0.0))
+        assert_that(self.beamline.snapshot().angle(1), is_(close_to(3.0, DEFAULT_TEST_TOLERANCE)))
+
+
+class TestBeamlineSnapshotWithArrayEngine(TestBeamlineSnapshot):
+    use_array_engine = True
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import unittest
+
+from hamcrest import *
+
+from src.beamline import Beamline
+from src.channel_pool import ChannelPool
+from src.components import Component
+from src.ioc_driver import HeightDriver
+from src.motor_pv_wrapper import MotorPVWrapper
+from src.movement_strategy import LinearMovement
+
+
+class FakeChannelAccess(object):
+    """
+    An in-process stand in for channel access in which connecting a channel waits for another channel to start
+    connecting, up to a timeout, so channels only connect if they are connected in parallel.
+    """
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.connection_attempts = []
+        self._connecting = threading.Event()
+        self._lock = threading.Lock()
+
+    def pv_exists(self, name, timeout=None):
+        with self._lock:
+            self.connection_attempts.append(name)
+            another_connecting = len(self.connection_attempts) > 1
+        if another_connecting:
+            self._connecting.set()
+        if not self._connecting.wait(timeout):
+            return False
+        return name not in self.missing
+
+
+class TestChannelPool(unittest.TestCase):
+    def test_GIVEN_channels_WHEN_connect_THEN_channels_connected_in_parallel(self):
+        pool = ChannelPool(FakeChannelAccess(), timeout=5.0)
+
+        connected = pool.connect(["MTR1", "MTR2", "MTR3"])
+
+        assert_that(connected, is_(True))
+        assert_that(
+            pool.connection_status(), has_entries({"MTR1": True, "MTR2": True, "MTR3": True})
+        )
+
+    def test_GIVEN_missing_channel_WHEN_connect_THEN_it_is_reported_not_connected(self):
+        pool = ChannelPool(FakeChannelAccess(missing=["MTR2"]), timeout=5.0)
+
+        connected = pool.connect(["MTR1", "MTR2"])
+
+        assert_that(connected, is_(False))
+        assert_that(pool.connection_status(), has_entries({"MTR1": True, "MTR2": False}))
+        assert_that(pool.all_connected, is_(False))
+
+    def test_GIVEN_missing_channel_in_generator_of_names_WHEN_connect_THEN_not_all_connected(self):
+        pool = ChannelPool(FakeChannelAccess(missing=["MTR2"]), timeout=5.0)
+
+        connected = pool.connect(name for name in ["MTR1", "MTR2"])
+
+        assert_that(connected, is_(False))
+        assert_that(pool.connection_status(), has_entries({"MTR1": True, "MTR2": False}))
+
+    def test_GIVEN_channels_connected_WHEN_connect_again_THEN_only_unconnected_channels_are_connected(
+        self,
+    ):
+        channel_access = FakeChannelAccess(missing=["MTR2"])
+        pool = ChannelPool(channel_access, timeout=5.0)
+        pool.connect(["MTR1", "MTR2"])
+        channel_access.missing.clear()
+
+        connected = pool.connect(["MTR1", "MTR2"])
+
+        assert_that(connected, is_(True))
+        assert_that(channel_access.connection_attempts, contains_inanyorder("MTR1", "MTR2", "MTR2"))
+
+    def test_GIVEN_repeated_channel_names_WHEN_connect_THEN_each_channel_connected_once(self):
+        channel_access = FakeChannelAccess()
+        pool = ChannelPool(channel_access, timeout=5.0)
+
+        connected = pool.connect(["MTR1", "MTR2", "MTR1", "MTR2"])
+
+        assert_that(connected, is_(True))
+        assert_that(channel_access.connection_attempts, contains_inanyorder("MTR1", "MTR2"))
+
+
+class TestBeamlineChannelPool(unittest.TestCase):
+    def test_GIVEN_beamline_with_channel_pool_WHEN_built_THEN_channels_of_all_driver_axes_connected(
+        self,
+    ):
+        channel_access = FakeChannelAccess()
+        drivers = [
+            HeightDriver(
+                Component(name, movement_strategy=LinearMovement(0, z, 90)),
+                MotorPVWrapper(name, channel_access),
+            )
+            for name, z in [("MTR1", 10), ("MTR2", 20)]
+        ]
+
+        beamline = Beamline([], [], drivers, [], channel_pool=ChannelPool(channel_access))
+
+        assert_that(
+            sorted(beamline.channel_pool.connection_status()),
+            contains(
+                *sorted(
+                    name + field
+                    for name in ["MTR1", "MTR2"]
+                    for field in ["", ".RBV", ".DMOV", ".VMAX", ".VELO"]
+                )
+            ),
+        )
+        assert_that(beamline.channel_pool.all_connected, is_(True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
-from math import radians, tan
+from math import cos, radians, sin, tan
 
 from hamcrest import *
+from mock import patch
 from parameterized import parameterized
 
 from src.components import Component, ReflectingComponent, TiltingJaws
@@ -168,5 +169,72 @@ class TestActiveComponents(unittest.TestCase):
     #     assert_that(result, is_(position(expected_position)))
 
 
+class TestComponentMemoization(unittest.TestCase):
+    def setUp(self):
+        self.movement = LinearMovement(0, 10, 90)
+        self.mirror = ReflectingComponent("mirror", movement_strategy=self.movement)
+        self.mirror.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.mirror.angle = 10
+
+    def test_GIVEN_outgoing_beam_calculated_WHEN_get_outgoing_beam_again_THEN_interception_is_not_recalculated(
+        self,
+    ):
+        self.mirror.get_outgoing_beam()
+
+        with patch.object(
+            self.movement, "calculate_interception", wraps=self.movement.calculate_interception
+        ) as mock_calculate_interception:
+            self.mirror.get_outgoing_beam()
+            self.mirror.calculate_beam_interception()
+
+        mock_calculate_interception.assert_not_called()
+
+    def test_GIVEN_outgoing_beam_calculated_WHEN_angle_changed_THEN_outgoing_beam_is_recalculated(
+        self,
+    ):
+        self.mirror.get_outgoing_beam()
+
+        self.mirror.angle = 20
+        result = self.mirror.get_outgoing_beam()
+
+        assert_that(result, position_and_angle(PositionAndAngle(0, 10, 40)))
+
+    def test_GIVEN_outgoing_beam_calculated_WHEN_incoming_beam_changed_THEN_outgoing_beam_is_recalculated(
+        self,
+    ):
+        self.mirror.get_outgoing_beam()
+
+        self.mirror.set_incoming_beam(PositionAndAngle(1, 0, 0))
+        result = self.mirror.get_outgoing_beam()
+
+        assert_that(result, position_and_angle(PositionAndAngle(1, 10, 20)))
+
+    def test_GIVEN_tilt_angle_calculated_WHEN_incoming_beam_changed_THEN_tilt_angle_is_recalculated(
+        self,
+    ):
+        jaws = TiltingJaws("jaws", movement_strategy=LinearMovement(0, 10, 90))
+        jaws.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        jaws.calculate_tilt_angle()
+
+        jaws.set_incoming_beam(PositionAndAngle(0, 0, 10))
+        result = jaws.calculate_tilt_angle()
+
+        assert_that(result, is_(100))
+
+    def test_GIVEN_outgoing_beam_calculated_WHEN_incoming_beam_changed_THEN_outgoing_beam_direction_is_reflected_without_recalculating_mirror_direction(
+        self,
+    ):
+        self.mirror.get_outgoing_beam()
+
+        with patch("src.components.unit_direction") as mock_unit_direction:
+            self.mirror.set_incoming_beam(PositionAndAngle(0, 0, 2))
+            result = self.mirror.get_outgoing_beam()
+
+        mock_unit_direction.assert_not_called()
+        assert_that(result.angle, is_(18))
+        assert_that(result.direction[0], close_to(cos(radians(18)), 1e-15))
+        assert_that(result.direction[1], close_to(sin(radians(18)), 1e-15))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from hamcrest import *
+
+from src.gemoetry import Position, PositionAndAngle, reflect_direction, unit_direction
+
+
+class TestGeometry(unittest.TestCase):
+    def test_GIVEN_position_WHEN_set_y_THEN_error(self):
+        position = Position(1, 2)
+
+        with self.assertRaises(AttributeError):
+            position.y = 3
+
+    def test_GIVEN_position_and_angle_WHEN_set_new_attribute_THEN_error(self):
+        position_and_angle = PositionAndAngle(1, 2, 3)
+
+        with self.assertRaises(AttributeError):
+            position_and_angle.direction = 3
+
+    def test_GIVEN_position_and_angle_WHEN_moved_to_new_position_THEN_angle_is_unchanged_and_position_is_new(
+        self,
+    ):
+        angle = 30.0
+        position_and_angle = PositionAndAngle(1, 2, angle)
+        direction = position_and_angle.direction
+
+        result = position_and_angle.with_position(3, 4)
+
+        assert_that(result.y, is_(3.0))
+        assert_that(result.z, is_(4.0))
+        assert_that(result.angle, is_(angle))
+        assert_that(result.direction, is_(direction))
+        assert_that(position_and_angle.y, is_(1.0))
+
+    def test_GIVEN_direction_and_surface_WHEN_reflect_direction_THEN_direction_is_of_reflected_angle(
+        self,
+    ):
+        beam_angle = 3.0
+        surface_angle = 10.0
+
+        result = reflect_direction(unit_direction(beam_angle), unit_direction(surface_angle))
+
+        expected_z, expected_y = unit_direction(2 * surface_angle - beam_angle)
+        assert_that(result[0], close_to(expected_z, 1e-15))
+        assert_that(result[1], close_to(expected_y, 1e-15))
+
+    def test_GIVEN_position_and_angle_from_direction_WHEN_get_direction_THEN_direction_is_the_one_given(
+        self,
+    ):
+        direction = (0.6, 0.8)
+
+        result = PositionAndAngle.from_direction(1, 2, 53.0, direction)
+
+        assert_that(result.direction, is_(direction))
+        assert_that(result.angle, is_(53.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+import numpy as np
+from hamcrest import *
+
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.grid_evaluation import GridEvaluation
+from src.movement_strategy import LinearMovement
+from src.parameters import ComponentEnabled, ReflectionAngle, Theta, TrackingPosition
+from tests.utils import DEFAULT_TEST_TOLERANCE
+
+
+def create_beamline(other_modes=()):
+    super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+    sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+    slit = Component("slit", movement_strategy=LinearMovement(0, 15, 90))
+    parameters = [
+        ComponentEnabled("smenabled", super_mirror, sim=True, init=True),
+        ReflectionAngle("smangle", super_mirror, sim=True),
+        Theta("theta", sample, sim=True),
+        TrackingPosition("slitpos", slit, sim=True),
+    ]
+    polarised = BeamlineMode("polarised", ["smangle", "theta", "slitpos"], {"smenabled": True})
+    unpolarised = BeamlineMode("unpolarised", ["theta", "slitpos"], {"smenabled": False})
+    beamline = Beamline(
+        [super_mirror, sample, slit], parameters, [], [polarised, unpolarised] + list(other_modes)
+    )
+    beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+    return beamline
+
+
+def create_beamline_with_modes_initialising_different_parameters():
+    return create_beamline(
+        [
+            BeamlineMode("steep", ["smangle", "theta"], {"smangle": 3.0}),
+            BeamlineMode("sample only", ["theta"], {"slitpos": 1.0}),
+        ]
+    )
+
+
+class TestGridEvaluation(unittest.TestCase):
+    def test_GIVEN_grid_over_modes_WHEN_evaluate_in_processes_THEN_each_point_is_beam_path_at_its_set_points(
+        self,
+    ):
+        thetas = np.linspace(0, 2, 5)
+        smangles = np.linspace(-0.5, 0.5, 3)
+        slit_positions = np.array([-1.0, 1.0])
+        grid = [("theta", thetas), ("smangle", smangles), ("slitpos", slit_positions)]
+        evaluation = GridEvaluation(
+            create_beamline, grid, ["polarised", "unpolarised"], chunk_size=7
+        )
+
+        result = evaluation.evaluate(processes=2)
+
+        beamline = create_beamline()
+        self.addCleanup(beamline.close)
+        for mode_name in ["polarised", "unpolarised"]:
+            beamline.active_mode = beamline.mode(mode_name.upper())
+            beamline.update_beamline_parameters()
+            theta, smangle, slit_position = np.meshgrid(
+                thetas, smangles, slit_positions, indexing="ij"
+            )
+            expected = beamline.evaluate_batch(
+                "theta",
+                theta.ravel(),
+                {"smangle": smangle.ravel(), "slitpos": slit_position.ravel()},
+            )
+            assert_that(beamline[0].enabled, is_(mode_name == "polarised"))
+            for name in ["y", "z", "angle", "position_y"]:
+                values = getattr(result[mode_name], name)
+                assert_that(values.shape, is_(evaluation.shape + (3,)))
+                assert_that(
+                    np.fabs(values.reshape(-1, 3) - getattr(expected, name)).max(),
+                    close_to(0, DEFAULT_TEST_TOLERANCE),
+                    "{} in mode {}".format(name, mode_name),
+                )
+
+    def test_GIVEN_grid_WHEN_chunks_THEN_chunks_cover_grid(self):
+        grid = [("theta", np.linspace(0, 2, 10))]
+        evaluation = GridEvaluation(create_beamline, grid, ["polarised"], chunk_size=4)
+
+        result = sorted((chunk.start, chunk.stop) for chunk in evaluation.chunks(processes=2))
+
+        assert_that(result, is_([(0, 4), (4, 8), (8, 10)]))
+
+    def test_GIVEN_modes_initialising_different_parameters_WHEN_evaluated_in_one_process_THEN_each_mode_is_as_if_evaluated_alone(
+        self,
+    ):
+        grid = [("theta", np.linspace(0, 1, 4))]
+        evaluation = GridEvaluation(
+            create_beamline_with_modes_initialising_different_parameters,
+            grid,
+            ["steep", "sample only"],
+            chunk_size=2,
+        )
+
+        result = evaluation.evaluate(processes=1)
+
+        alone = GridEvaluation(
+            create_beamline_with_modes_initialising_different_parameters, grid, ["sample only"]
+        ).evaluate(processes=1)
+        assert_that(
+            np.fabs(result["sample only"].y - alone["sample only"].y).max(),
+            close_to(0, DEFAULT_TEST_TOLERANCE),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 from math import fabs
 
@@ -170,6 +172,58 @@ class TestHeightAndAngleDriver(unittest.TestCase):
         assert_that(fabs(self.angle_axis.value - target_position_angle) <= FLOAT_TOLERANCE)
 
 
+class TestDriverDeadband(unittest.TestCase):
+    def setUp(self):
+        self.height_axis = create_mock_axis("SM:HEIGHT", 10.0, 10.0)
+        self.angle_axis = create_mock_axis("SM:ANGLE", 0.0, 10.0)
+        self.supermirror = ReflectingComponent(
+            "component", movement_strategy=LinearMovement(0.0, 10.0, 90.0)
+        )
+        self.supermirror.set_incoming_beam(PositionAndAngle(0.0, 0.0, 0.0))
+        self.supermirror.set_position_relative_to_beam(10.0)
+        self.supermirror.angle = 30.0
+        self.supermirror_driver = HeightAndAngleDriver(
+            self.supermirror,
+            self.height_axis,
+            self.angle_axis,
+            height_deadband=0.01,
+            angle_deadband=0.01,
+        )
+
+    def test_GIVEN_axis_within_deadband_of_target_WHEN_moving_THEN_axis_not_written(self):
+        self.height_axis.value = 10.005
+        self.height_axis.velocity = 0.5
+
+        self.supermirror_driver.perform_move(10.0)
+
+        assert_that(self.height_axis.value, is_(10.005))
+        assert_that(self.height_axis.velocity, is_(0.5))
+        assert_that(fabs(self.angle_axis.value - 30.0) <= FLOAT_TOLERANCE)
+        assert_that(fabs(self.angle_axis.velocity - 3.0) <= FLOAT_TOLERANCE)
+
+    def test_GIVEN_all_axes_at_target_WHEN_moving_with_zero_duration_THEN_no_error_and_axes_not_written(
+        self,
+    ):
+        self.angle_axis.value = 30.0
+        self.angle_axis.velocity = 0.5
+
+        self.supermirror_driver.perform_move(self.supermirror_driver.get_max_move_duration())
+
+        assert_that(self.angle_axis.velocity, is_(0.5))
+
+    def test_GIVEN_no_deadband_WHEN_moving_with_zero_duration_THEN_target_written_and_velocity_unchanged(
+        self,
+    ):
+        height_axis = create_mock_axis("JAWS:HEIGHT", 10.0, 10.0)
+        height_axis.velocity = 0.5
+        driver = HeightDriver(self.supermirror, height_axis)
+
+        driver.perform_move(0.0)
+
+        assert_that(height_axis.value, is_(10.0))
+        assert_that(height_axis.velocity, is_(0.5))
+
+
 class BeamlineMoveDurationTest(unittest.TestCase):
     def test_GIVEN_multiple_components_in_beamline_WHEN_triggering_move_THEN_components_move_at_speed_of_slowest_axis(
         self,
@@ -215,6 +269,7 @@ class BeamlineMoveDurationTest(unittest.TestCase):
             "mode name", [smangle.name, slit_2_pos.name, slit_3_pos.name, det_pos.name]
         )
         beamline = Beamline(components, beamline_parameters, drivers, [mode])
+        self.addCleanup(beamline.close)
 
         beamline.active_mode = mode
 
@@ -232,3 +287,130 @@ class BeamlineMoveDurationTest(unittest.TestCase):
             beamline.move = 1
 
             mock.assert_called_with(expected_max_duration)
+
+
+class BeamlineDriverDispatchTest(unittest.TestCase):
+    def setUp(self):
+        self.drivers = [MagicMock(), MagicMock()]
+        for driver in self.drivers:
+            driver.get_max_move_duration.return_value = 1.0
+        self.beamline = Beamline([], [], self.drivers, [])
+        self.addCleanup(self.beamline.close)
+
+    def test_GIVEN_multiple_drivers_WHEN_moving_THEN_drivers_move_concurrently(self):
+        started = [threading.Event() for _ in self.drivers]
+        saw_other_start = []
+
+        def perform_move(index):
+            def wait_for_other_driver(_, __):
+                started[index].set()
+                saw_other_start.append(started[1 - index].wait(5.0))
+
+            return wait_for_other_driver
+
+        for index, driver in enumerate(self.drivers):
+            driver.perform_move.side_effect = perform_move(index)
+
+        self.beamline._move_drivers(1.0)
+
+        assert_that(saw_other_start, contains(True, True))
+
+    def test_GIVEN_driver_raises_error_WHEN_moving_THEN_other_drivers_move_and_error_is_raised(
+        self,
+    ):
+        finished = []
+
+        def slow_move(_, __):
+            time.sleep(0.1)
+            finished.append(True)
+
+        self.drivers[0].perform_move.side_effect = RuntimeError("move failed")
+        self.drivers[1].perform_move.side_effect = slow_move
+
+        assert_that(calling(self.beamline._move_drivers).with_args(1.0), raises(RuntimeError))
+        assert_that(finished, contains(True))
+        self.drivers[1].perform_move.assert_called_once_with(1.0, None)
+
+    def test_GIVEN_multiple_drivers_WHEN_getting_max_move_duration_THEN_longest_duration_returned(
+        self,
+    ):
+        self.drivers[1].get_max_move_duration.return_value = 3.0
+
+        assert_that(self.beamline._get_max_move_duration(), is_(3.0))
+
+    def test_GIVEN_more_drivers_than_max_driver_threads_WHEN_moving_THEN_drivers_called_from_at_most_that_many_threads(
+        self,
+    ):
+        drivers = [MagicMock() for _ in range(6)]
+        threads = set()
+        for driver in drivers:
+            driver.perform_move.side_effect = lambda _, __: threads.add(threading.current_thread())
+        with Beamline([], [], drivers, [], max_driver_threads=2) as beamline:
+            beamline._move_drivers(1.0)
+
+        assert_that(len(threads), is_(less_than_or_equal_to(2)))
+        for driver in drivers:
+            driver.perform_move.assert_called_once_with(1.0, None)
+
+    def test_GIVEN_beamline_has_moved_drivers_WHEN_closed_THEN_driver_threads_are_stopped(self):
+        threads_before_move = threading.active_count()
+        self.beamline._move_drivers(1.0)
+
+        self.beamline.close()
+
+        assert_that(threading.active_count(), is_(threads_before_move))
+
+
+class CountingAxis(object):
+    """
+    An axis which counts the number of times its value and maximum velocity are read.
+    """
+
+    def __init__(self, value, max_velocity):
+        self._value = value
+        self._max_velocity = max_velocity
+        self.velocity = None
+        self.value_reads = 0
+        self.max_velocity_reads = 0
+
+    @property
+    def value(self):
+        self.value_reads += 1
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    @property
+    def max_velocity(self):
+        self.max_velocity_reads += 1
+        return self._max_velocity
+
+
+class BeamlineAxisSnapshotTest(unittest.TestCase):
+    def test_GIVEN_beamline_with_drivers_WHEN_moving_THEN_each_axis_is_read_once(self):
+        supermirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0.0, 10.0, 90.0))
+        detector = TiltingJaws("det", movement_strategy=LinearMovement(0.0, 20.0, 90.0))
+        axes = [CountingAxis(0.0, 10.0) for _ in range(4)]
+        drivers = [
+            HeightAndAngleDriver(supermirror, axes[0], axes[1]),
+            HeightAndTiltDriver(detector, axes[2], axes[3]),
+        ]
+        smangle = ReflectionAngle("smangle", supermirror)
+        det_pos = TrackingPosition("det_pos", detector)
+        mode = BeamlineMode("mode", [smangle.name, det_pos.name])
+        beamline = Beamline([supermirror, detector], [smangle, det_pos], drivers, [mode])
+        self.addCleanup(beamline.close)
+        beamline.set_incoming_beam(PositionAndAngle(0.0, 0.0, 0.0))
+        beamline.active_mode = mode
+        smangle.sp_no_move = 10.0
+        det_pos.sp_no_move = 1.0
+
+        beamline.move = 1
+
+        assert_that(
+            [(axis.value_reads, axis.max_velocity_reads) for axis in axes], only_contains((1, 1))
+        )
+        assert_that(fabs(axes[1].value - 10.0) <= FLOAT_TOLERANCE)
+        assert_that(axes[1].velocity, is_(greater_than(0)))
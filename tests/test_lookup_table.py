@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+from hamcrest import *
+
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.movement_strategy import LinearMovement
+from src.parameters import ReflectionAngle, Theta
+from tests.utils import DEFAULT_TEST_TOLERANCE
+
+
+class TestLookupTable(unittest.TestCase):
+    def setUp(self):
+        self.super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+        detector = Component("detector", movement_strategy=LinearMovement(0, 20, 90))
+        smangle = ReflectionAngle("smangle", self.super_mirror, sim=True)
+        theta = Theta("theta", self.sample, sim=True)
+        self.thetas = np.linspace(0.0, 5.0, 11)
+        self.smangles = np.linspace(-1.0, 1.0, 5)
+        self.mode = BeamlineMode(
+            "mode",
+            ["smangle", "theta"],
+            lookup_grid=[("theta", self.thetas), ("smangle", self.smangles)],
+        )
+        self.beamline = Beamline(
+            [self.super_mirror, self.sample, detector], [smangle, theta], [], [self.mode]
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = self.mode
+        self.beamline.move = 1
+
+    def exact(self, thetas, smangles):
+        return self.beamline.evaluate_batch("theta", thetas, {"smangle": smangles})
+
+    def test_GIVEN_set_points_on_grid_WHEN_evaluate_THEN_beam_path_is_exact(self):
+        thetas = np.array([0.0, 2.5, 5.0])
+        smangles = np.array([-1.0, 0.5, 1.0])
+
+        result = self.beamline.lookup_table().evaluate({"theta": thetas, "smangle": smangles})
+
+        expected = self.exact(thetas, smangles)
+        assert_that(np.fabs(result.y - expected.y).max(), close_to(0, DEFAULT_TEST_TOLERANCE))
+        assert_that(
+            np.fabs(result.angle - expected.angle).max(), close_to(0, DEFAULT_TEST_TOLERANCE)
+        )
+
+    def test_GIVEN_set_points_at_cell_centres_WHEN_evaluate_THEN_error_is_within_stated_error(self):
+        table = self.beamline.lookup_table()
+        thetas = np.array([0.25, 4.75])
+        smangles = np.array([-0.75, 0.25])
+
+        result = table.evaluate({"theta": thetas, "smangle": smangles})
+
+        error = np.fabs(result.y - self.exact(thetas, smangles).y)
+        assert_that(np.all(error <= table.height_error + DEFAULT_TEST_TOLERANCE), is_(True))
+
+    def test_GIVEN_set_points_within_grid_WHEN_evaluate_THEN_beam_path_is_close_to_exact(self):
+        thetas = np.array([0.1, 1.33, 3.7])
+        smangles = np.array([0.9, -0.2, 0.05])
+
+        result = self.beamline.lookup_table().evaluate({"theta": thetas, "smangle": smangles})
+
+        assert_that(np.fabs(result.y - self.exact(thetas, smangles).y).max(), less_than(1e-3))
+
+    def test_GIVEN_set_points_outside_grid_WHEN_evaluate_THEN_beam_path_is_exact(self):
+        thetas = np.array([6.0, 1.0])
+        smangles = np.array([0.3, 2.0])
+
+        result = self.beamline.lookup_table().evaluate({"theta": thetas, "smangle": smangles})
+
+        expected = self.exact(thetas, smangles)
+        assert_that(np.fabs(result.y - expected.y).max(), close_to(0, DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_beamline_changed_WHEN_get_lookup_table_THEN_table_is_rebuilt(self):
+        table = self.beamline.lookup_table()
+
+        self.sample.enabled = False
+
+        assert_that(self.beamline.lookup_table(), is_not(same_instance(table)))
+
+    def test_GIVEN_mode_without_grid_WHEN_get_lookup_table_THEN_error(self):
+        self.beamline.active_mode = BeamlineMode("no grid", ["theta"])
+
+        assert_that(calling(self.beamline.lookup_table), raises(ValueError))
+
+
+if __name__ == "__main__":
+    unittest.main()
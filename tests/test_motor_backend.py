@@ -0,0 +1,161 @@
+import unittest
+
+from hamcrest import *
+
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.ioc_driver import HeightAndAngleDriver, HeightDriver
+from src.motor_backend import SimulatedMotorBackend
+from src.motor_pv_wrapper import CachingMotorPVWrapper, MotorPVWrapper
+from src.movement_strategy import LinearMovement
+from src.parameters import ReflectionAngle, TrackingPosition
+from tests.utils import DEFAULT_TEST_TOLERANCE
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.time = 100.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestSimulatedMotorBackend(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = SimulatedMotorBackend(self.clock)
+        self.backend.add_motor("MTR", position=0.0, max_velocity=2.0, velocity=1.0)
+
+    def test_GIVEN_motor_WHEN_moved_without_acceleration_THEN_moves_at_velocity_until_at_target(
+        self,
+    ):
+        self.backend.set_pv_value("MTR", 4.0)
+
+        positions = []
+        done_moving = []
+        for _ in range(5):
+            positions.append(self.backend.get_pv_value("MTR.RBV"))
+            done_moving.append(self.backend.get_pv_value("MTR.DMOV"))
+            self.clock.time += 1.5
+
+        assert_that(positions, contains(0.0, 1.5, 3.0, 4.0, 4.0))
+        assert_that(done_moving, contains(0, 0, 0, 1, 1))
+        assert_that(self.backend.get_pv_value("MTR"), is_(4.0))
+
+    def test_GIVEN_velocity_above_max_velocity_WHEN_moved_THEN_moves_at_max_velocity(self):
+        self.backend.set_pv_value("MTR.VELO", 5.0)
+        self.backend.set_pv_value("MTR", 4.0)
+        self.clock.time += 1.0
+
+        assert_that(self.backend.get_pv_value("MTR.RBV"), is_(2.0))
+
+    def test_GIVEN_acceleration_time_WHEN_moved_THEN_accelerates_cruises_and_decelerates(self):
+        self.backend.set_pv_value("MTR.ACCL", 2.0)
+        self.backend.set_pv_value("MTR", 4.0)
+
+        positions = []
+        for elapsed in [1.0, 2.0, 4.0, 5.0, 6.0]:
+            self.clock.time = 100.0 + elapsed
+            positions.append(self.backend.get_pv_value("MTR.RBV"))
+
+        # accelerates at 0.5 for 2 s, cruises at 1 for 2 s and decelerates for 2 s
+        assert_that(positions, contains(0.25, 1.0, 3.0, 3.75, 4.0))
+
+    def test_GIVEN_short_move_with_acceleration_time_WHEN_moved_THEN_stops_before_reaching_velocity(
+        self,
+    ):
+        self.backend.set_pv_value("MTR.ACCL", 2.0)
+        self.backend.set_pv_value("MTR", 0.5)
+        self.clock.time += 1.0
+
+        assert_that(self.backend.get_pv_value("MTR.RBV"), is_(close_to(0.25, 1e-12)))
+        assert_that(self.backend.get_pv_value("MTR.DMOV"), is_(0))
+        self.clock.time += 1.0
+        assert_that(self.backend.get_pv_value("MTR.DMOV"), is_(1))
+
+    def test_GIVEN_monitor_on_read_back_WHEN_motor_moves_and_update_THEN_monitor_called_with_changes(
+        self,
+    ):
+        updates = []
+        self.backend.add_monitor("MTR.RBV", lambda value, severity, status: updates.append(value))
+
+        self.backend.set_pv_value("MTR", 2.0)
+        self.clock.time += 1.0
+        self.backend.update()
+        self.backend.update()
+        self.clock.time += 1.0
+        self.backend.update()
+
+        assert_that(updates, contains(0.0, 1.0, 2.0))
+
+    def test_GIVEN_monitor_on_other_motor_WHEN_motor_moved_THEN_only_monitors_of_moved_motor_called(
+        self,
+    ):
+        self.backend.add_motor("MTR2", max_velocity=1.0)
+        updates = []
+        self.backend.add_monitor("MTR2.RBV", lambda value, severity, status: updates.append(value))
+        self.backend.set_pv_value("MTR2", 2.0)
+        self.clock.time += 1.0
+
+        self.backend.set_pv_value("MTR", 2.0)
+
+        assert_that(updates, contains(0.0))
+
+    def test_GIVEN_unknown_motor_WHEN_checking_pv_exists_THEN_false(self):
+        assert_that(self.backend.pv_exists("MTR.RBV"), is_(True))
+        assert_that(self.backend.pv_exists("OTHER"), is_(False))
+        assert_that(calling(self.backend.get_pv_value).with_args("OTHER"), raises(KeyError))
+
+    def test_GIVEN_caching_wrapper_on_simulated_motor_WHEN_motor_moves_THEN_read_back_served_from_monitor(
+        self,
+    ):
+        wrapper = CachingMotorPVWrapper("MTR", channel_access=self.backend, clock=self.clock)
+
+        wrapper.value = 2.0
+        self.clock.time += 1.0
+        self.backend.update()
+
+        assert_that(wrapper.readback, is_(1.0))
+        assert_that(wrapper.done_moving, is_(0))
+
+
+class TestBeamlineWithSimulatedMotors(unittest.TestCase):
+    def test_GIVEN_beamline_driving_simulated_motors_WHEN_moved_THEN_all_axes_arrive_together(self):
+        clock = FakeClock()
+        backend = SimulatedMotorBackend(clock)
+        super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 10, 90))
+        slit = Component("slit", movement_strategy=LinearMovement(0, 20, 90))
+        axes = []
+        for name, max_velocity in [("SM:HEIGHT", 1.0), ("SM:ANGLE", 1.0), ("SLIT:HEIGHT", 0.5)]:
+            backend.add_motor(name, max_velocity=max_velocity)
+            axes.append(MotorPVWrapper(name, backend))
+        drivers = [
+            HeightAndAngleDriver(super_mirror, axes[0], axes[1]),
+            HeightDriver(slit, axes[2]),
+        ]
+        smangle = ReflectionAngle("smangle", super_mirror)
+        slit_position = TrackingPosition("slitpos", slit)
+        mode = BeamlineMode("mode", [smangle.name, slit_position.name])
+        beamline = Beamline([super_mirror, slit], [smangle, slit_position], drivers, [mode])
+        self.addCleanup(beamline.close)
+        beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        beamline.active_mode = mode
+        smangle.sp_no_move = 1.0
+        slit_position.sp_no_move = 0.5
+
+        beamline.move = 1
+
+        # the super mirror stays on the beam, so its angle and the slit height move; the slit is slowest
+        target_slit_height = slit.sp_position().y
+        duration = target_slit_height / 0.5
+        clock.time += duration * 0.99
+        assert_that([axis.done_moving for axis in axes], contains(1, 0, 0))
+        clock.time += duration * 0.02
+        assert_that([axis.done_moving for axis in axes], contains(1, 1, 1))
+        assert_that(axes[2].readback, is_(close_to(target_slit_height, DEFAULT_TEST_TOLERANCE)))
+        assert_that(axes[1].readback, is_(close_to(1.0, DEFAULT_TEST_TOLERANCE)))
+
+
+if __name__ == "__main__":
+    unittest.main()
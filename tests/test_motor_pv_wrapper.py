@@ -0,0 +1,179 @@
+import unittest
+
+from hamcrest import *
+
+from src.motor_pv_wrapper import CachingMotorPVWrapper, MotorPVWrapper
+
+PV_NAME = "MOT:MTR0101"
+
+
+class FakeChannelAccess(object):
+    """
+    An in-process stand in for channel access with the interface of genie python's CaChannelWrapper.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.gets = []
+        self.monitors = {}
+
+    def get_pv_value(self, name):
+        self.gets.append(name)
+        return self.values[name]
+
+    def set_pv_value(self, name, value):
+        self.post(name, value)
+
+    def add_monitor(self, name, call_back_function):
+        self.monitors.setdefault(name, []).append(call_back_function)
+        return lambda: self.monitors[name].remove(call_back_function)
+
+    def post(self, name, value, alarm_severity="NO_ALARM"):
+        self.values[name] = value
+        for call_back_function in list(self.monitors.get(name, [])):
+            call_back_function(value, alarm_severity, "NO_ALARM")
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.time = 100.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestMotorPVWrapper(unittest.TestCase):
+    def test_GIVEN_wrapper_WHEN_reading_fields_THEN_each_read_gets_from_the_pv(self):
+        channel_access = FakeChannelAccess()
+        channel_access.values.update({PV_NAME: 1.0, PV_NAME + ".VMAX": 2.0})
+        wrapper = MotorPVWrapper(PV_NAME, channel_access)
+
+        values = [wrapper.value, wrapper.value, wrapper.max_velocity]
+
+        assert_that(values, contains(1.0, 1.0, 2.0))
+        assert_that(channel_access.gets, contains(PV_NAME, PV_NAME, PV_NAME + ".VMAX"))
+
+
+class TestCachingMotorPVWrapper(unittest.TestCase):
+    def setUp(self):
+        self.channel_access = FakeChannelAccess()
+        self.channel_access.values.update(
+            {
+                PV_NAME: 1.0,
+                PV_NAME + ".RBV": 1.0,
+                PV_NAME + ".VMAX": 2.0,
+                PV_NAME + ".DMOV": 1,
+            }
+        )
+        self.clock = FakeClock()
+        self.wrapper = CachingMotorPVWrapper(
+            PV_NAME, staleness_bound=5.0, channel_access=self.channel_access, clock=self.clock
+        )
+
+    def test_GIVEN_wrapper_WHEN_created_THEN_value_read_back_max_velocity_and_done_moving_monitored(
+        self,
+    ):
+        assert_that(
+            sorted(self.channel_access.monitors),
+            contains(PV_NAME, PV_NAME + ".DMOV", PV_NAME + ".RBV", PV_NAME + ".VMAX"),
+        )
+
+    def test_GIVEN_monitor_update_WHEN_reading_field_THEN_value_served_from_cache(self):
+        self.channel_access.post(PV_NAME + ".RBV", 3.0)
+
+        values = [self.wrapper.readback, self.wrapper.readback]
+
+        assert_that(values, contains(3.0, 3.0))
+        assert_that(self.channel_access.gets, is_(empty()))
+
+    def test_GIVEN_no_monitor_update_WHEN_reading_field_THEN_value_read_from_pv_then_cached(self):
+        values = [self.wrapper.max_velocity, self.wrapper.max_velocity]
+
+        assert_that(values, contains(2.0, 2.0))
+        assert_that(self.channel_access.gets, contains(PV_NAME + ".VMAX"))
+
+    def test_GIVEN_cached_value_older_than_staleness_bound_WHEN_reading_field_THEN_value_read_from_pv(
+        self,
+    ):
+        self.channel_access.post(PV_NAME + ".DMOV", 0)
+        self.channel_access.values[PV_NAME + ".DMOV"] = 1
+        self.clock.time += 6.0
+
+        value = self.wrapper.done_moving
+
+        assert_that(value, is_(1))
+        assert_that(self.channel_access.gets, contains(PV_NAME + ".DMOV"))
+
+    def test_GIVEN_monitor_reports_disconnection_WHEN_reading_field_THEN_value_read_from_pv(self):
+        self.channel_access.post(PV_NAME, 3.0)
+        self.channel_access.post(PV_NAME, 3.0, alarm_severity="INVALID")
+
+        value = self.wrapper.value
+
+        assert_that(value, is_(3.0))
+        assert_that(self.channel_access.gets, contains(PV_NAME))
+
+    def test_GIVEN_value_written_WHEN_reading_value_THEN_written_value_served_without_get(self):
+        self.channel_access.monitors.clear()
+
+        self.wrapper.value = 4.0
+
+        assert_that(self.wrapper.value, is_(4.0))
+        assert_that(self.channel_access.gets, is_(empty()))
+
+    def test_GIVEN_monitor_update_during_read_WHEN_reading_field_again_THEN_monitor_value_served(
+        self,
+    ):
+        get_pv_value = self.channel_access.get_pv_value
+
+        def get_then_update(name):
+            value = get_pv_value(name)
+            self.channel_access.post(name, 3.0)
+            return value
+
+        self.channel_access.get_pv_value = get_then_update
+
+        values = [self.wrapper.readback, self.wrapper.readback]
+
+        assert_that(values, contains(1.0, 3.0))
+        assert_that(self.channel_access.gets, contains(PV_NAME + ".RBV"))
+
+    def test_GIVEN_read_back_and_done_moving_cached_WHEN_value_written_THEN_read_back_and_done_moving_read_from_pv(
+        self,
+    ):
+        self.channel_access.post(PV_NAME + ".RBV", 1.0)
+        self.channel_access.post(PV_NAME + ".DMOV", 1)
+        self.channel_access.values.update({PV_NAME + ".RBV": 1.5, PV_NAME + ".DMOV": 0})
+
+        self.wrapper.value = 4.0
+
+        assert_that([self.wrapper.readback, self.wrapper.done_moving], contains(1.5, 0))
+        assert_that(self.channel_access.gets, contains(PV_NAME + ".RBV", PV_NAME + ".DMOV"))
+
+    def test_GIVEN_done_moving_update_during_write_WHEN_reading_done_moving_THEN_update_served(
+        self,
+    ):
+        set_pv_value = self.channel_access.set_pv_value
+
+        def set_then_update(name, value):
+            set_pv_value(name, value)
+            self.channel_access.post(PV_NAME + ".DMOV", 0)
+
+        self.channel_access.set_pv_value = set_then_update
+
+        self.wrapper.value = 4.0
+
+        assert_that(self.wrapper.done_moving, is_(0))
+        assert_that(self.channel_access.gets, is_(empty()))
+
+    def test_GIVEN_wrapper_closed_WHEN_monitor_update_THEN_cache_not_updated(self):
+        self.wrapper.close()
+
+        self.channel_access.post(PV_NAME + ".RBV", 3.0)
+
+        assert_that(self.wrapper.readback, is_(3.0))
+        assert_that(self.channel_access.gets, contains(PV_NAME + ".RBV"))
+
+
+if __name__ == "__main__":
+    unittest.main()
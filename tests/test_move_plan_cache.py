@@ -0,0 +1,42 @@
+import unittest
+
+from hamcrest import *
+
+from src.move_plan_cache import MovePlanCache
+
+
+class TestMovePlanCache(unittest.TestCase):
+    def test_GIVEN_plan_put_WHEN_get_THEN_plan_returned_and_hit_counted(self):
+        cache = MovePlanCache(2)
+        cache.put("a", 1)
+
+        result = cache.get("a")
+
+        assert_that(result, is_(1))
+        assert_that(cache.hits, is_(1))
+        assert_that(cache.misses, is_(0))
+
+    def test_GIVEN_no_plan_WHEN_get_THEN_none_returned_and_miss_counted(self):
+        cache = MovePlanCache(2)
+
+        result = cache.get("a")
+
+        assert_that(result, is_(None))
+        assert_that(cache.misses, is_(1))
+
+    def test_GIVEN_full_cache_WHEN_put_THEN_least_recently_used_plan_evicted(self):
+        cache = MovePlanCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+
+        cache.put("c", 3)
+
+        assert_that(len(cache), is_(2))
+        assert_that(cache.get("b"), is_(None))
+        assert_that(cache.get("a"), is_(1))
+        assert_that(cache.get("c"), is_(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
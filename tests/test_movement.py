@@ -39,6 +39,27 @@ class TestMovementIntercept(unittest.TestCase):
 
         assert_that(calling(movement.calculate_interception).with_args(beam), raises(ValueError))
 
+    def test_GIVEN_movement_and_beam_at_angles_either_side_of_180_within_tolerance_WHEN_get_intercept_THEN_raises_calc_error(
+        self,
+    ):
+        tolerance = ANGULAR_TOLERANCE
+        movement = LinearMovement(1, 1, tolerance * 0.4)
+        beam = PositionAndAngle(0, 0, 180.0 - tolerance * 0.4)
+
+        assert_that(calling(movement.calculate_interception).with_args(beam), raises(ValueError))
+
+    def test_GIVEN_movement_perpendicular_to_z_moved_along_its_line_WHEN_get_intercept_THEN_z_is_exactly_movement_z(
+        self,
+    ):
+        z = 10.3
+        movement = LinearMovement(0, z, 90)
+        movement.set_position_relative_to_beam(Position(2.1, z), 7.7)
+        beam = PositionAndAngle(0.3, 0.1, 3.7)
+
+        result = movement.calculate_interception(beam)
+
+        assert_that(result.z, is_(z))
+
     def test_GIVEN_movement_perpendicular_to_z_at_beam_angle_0_WHEN_get_intercept_THEN_position_is_initial_position(
         self,
     ):
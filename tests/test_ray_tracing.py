@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+from hamcrest import *
+
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.movement_strategy import LinearMovement
+from src.ray_tracing import RayBundle, RayTracer
+from tests.utils import DEFAULT_TEST_TOLERANCE
+
+
+class TestRayTracing(unittest.TestCase):
+    def test_GIVEN_parallel_rays_and_slit_WHEN_trace_THEN_only_rays_within_slit_gap_are_transmitted(
+        self,
+    ):
+        slit = Component("slit", movement_strategy=LinearMovement(0, 10, 90))
+        rays = RayBundle([-2.0, -0.5, 0.0, 0.4, 3.0], [0.0] * 5, [0.0] * 5)
+
+        result = RayTracer([slit], {"slit": 1.0}).trace(rays)
+
+        assert_that(result[0].transmission, close_to(3 / 5.0, DEFAULT_TEST_TOLERANCE))
+        assert_that(result[0].width, close_to(np.std([-0.5, 0.0, 0.4]), DEFAULT_TEST_TOLERANCE))
+        assert_that(result[0].divergence, close_to(0.0, DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_slit_moved_off_beam_WHEN_trace_THEN_slit_aperture_is_centred_on_its_position(
+        self,
+    ):
+        movement = LinearMovement(0, 10, 90)
+        movement.set_position_relative_to_beam(
+            movement.calculate_interception(PositionAndAngle(0, 0, 0)), 2
+        )
+        slit = Component("slit", movement_strategy=movement)
+        rays = RayBundle([0.0, 1.8, 2.0, 2.2], [0.0] * 4, [0.0] * 4)
+
+        result = RayTracer([slit], {"slit": 1.0}).trace(rays)
+
+        assert_that(result[0].transmission, close_to(3 / 4.0, DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_mirror_WHEN_trace_THEN_rays_are_reflected_from_the_mirror_surface(self):
+        mirror = ReflectingComponent("mirror", movement_strategy=LinearMovement(0, 10, 90))
+        mirror.angle = 5
+        detector = Component("detector", movement_strategy=LinearMovement(0, 20, 90))
+        rays = RayBundle([0.0, 1.0], [0.0, 0.0], [0.0, 1.0])
+
+        result = RayTracer([mirror, detector]).trace(rays)
+
+        at_mirror = 1 + 10 * np.tan(np.radians(1))
+        expected_heights = [10 * np.tan(np.radians(10)), at_mirror + 10 * np.tan(np.radians(9))]
+        assert_that(result[0].divergence, close_to(np.std([10, 9]), DEFAULT_TEST_TOLERANCE))
+        assert_that(result[1].width, close_to(np.std(expected_heights), DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_sampled_rays_WHEN_trace_through_beamline_without_apertures_THEN_all_rays_transmitted_with_sampled_spread(
+        self,
+    ):
+        components = [
+            Component("s1", movement_strategy=LinearMovement(0, 10, 90)),
+            Component("s2", movement_strategy=LinearMovement(0, 20, 90)),
+        ]
+        rays = RayBundle.sample(PositionAndAngle(0, 0, 0), 100000, 0.1, 0.0, seed=1)
+
+        result = RayTracer(components).trace(rays)
+
+        for statistics in result:
+            assert_that(statistics.transmission, is_(1.0))
+            assert_that(statistics.width, close_to(0.1, 0.001))
+
+    def test_GIVEN_seed_WHEN_sample_rays_twice_THEN_rays_are_the_same(self):
+        first = RayBundle.sample(PositionAndAngle(0, 0, 1), 10, 0.1, 0.01, seed=3)
+        second = RayBundle.sample(PositionAndAngle(0, 0, 1), 10, 0.1, 0.01, seed=3)
+
+        assert_that(list(first.angle), is_(list(second.angle)))
+        assert_that(list(first.y), is_(list(second.y)))
+
+    def test_GIVEN_slit_blocking_all_rays_WHEN_trace_THEN_nothing_transmitted_to_later_components(
+        self,
+    ):
+        components = [
+            Component("s1", movement_strategy=LinearMovement(0, 10, 90)),
+            Component("s2", movement_strategy=LinearMovement(0, 20, 90)),
+        ]
+        rays = RayBundle([5.0, 6.0], [0.0, 0.0], [0.0, 0.0])
+
+        result = RayTracer(components, {"s1": 1.0}).trace(rays)
+
+        assert_that(result[1].transmission, is_(0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
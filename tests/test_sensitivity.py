@@ -0,0 +1,169 @@
+import unittest
+
+import numpy as np
+from hamcrest import *
+from mock import MagicMock
+
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent, TiltingJaws
+from src.gemoetry import PositionAndAngle
+from src.ioc_driver import HeightAndAngleDriver, HeightAndTiltDriver, HeightDriver
+from src.movement_strategy import LinearMovement
+from src.parameters import ComponentEnabled, ReflectionAngle, Theta, TrackingPosition
+
+# step in the set points for the finite difference derivatives, and tolerance on agreement with them
+FINITE_DIFFERENCE_STEP = 1e-5
+FINITE_DIFFERENCE_TOLERANCE = 1e-6
+
+
+def create_mock_axis(name):
+    axis = MagicMock()
+    axis.name = name
+    return axis
+
+
+def create_beamline(in_mode=None, sm_enabled=True, with_drivers=False):
+    super_mirror = ReflectingComponent("sm", movement_strategy=LinearMovement(0, 5, 90))
+    slit = Component("slit", movement_strategy=LinearMovement(0, 9, 80))
+    sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 10, 90))
+    detector = TiltingJaws("detector", movement_strategy=LinearMovement(0, 20, 95))
+    components = [super_mirror, slit, sample, detector]
+    parameters = [
+        ComponentEnabled("smenabled", super_mirror, sim=True, init=sm_enabled),
+        ReflectionAngle("smangle", super_mirror, sim=True, init=0.5),
+        TrackingPosition("slitpos", slit, sim=True, init=0.1),
+        Theta("theta", sample, sim=True, init=1.5),
+        TrackingPosition("detpos", detector, sim=True, init=0.2),
+    ]
+    if in_mode is None:
+        in_mode = [parameter.name for parameter in parameters]
+    mode = BeamlineMode("mode", in_mode)
+    drivers = []
+    if with_drivers:
+        drivers = [
+            HeightAndAngleDriver(
+                super_mirror, create_mock_axis("SM:HEIGHT"), create_mock_axis("SM:ANGLE")
+            ),
+            HeightDriver(slit, create_mock_axis("SLIT:HEIGHT")),
+            HeightAndTiltDriver(
+                detector, create_mock_axis("DETECTOR:HEIGHT"), create_mock_axis("DETECTOR:TILT")
+            ),
+        ]
+    beamline = Beamline(components, parameters, drivers, [mode])
+    beamline.set_incoming_beam(PositionAndAngle(0.1, 0, 2))
+    beamline.active_mode = mode
+    beamline.update_beamline_parameters()
+    return beamline
+
+
+def component_values(beamline):
+    heights = [component.sp_position().y for component in beamline]
+    angles = [getattr(component, "angle", 0.0) for component in beamline]
+    beam_heights = [component.calculate_beam_interception().y for component in beamline]
+    beam_angles = [component.get_outgoing_beam().angle for component in beamline]
+    return np.array([heights, angles, beam_heights, beam_angles])
+
+
+def finite_difference_sensitivity(parameter_name, **kwargs):
+    values = []
+    for step in (FINITE_DIFFERENCE_STEP, -FINITE_DIFFERENCE_STEP):
+        beamline = create_beamline(**kwargs)
+        parameter = beamline.parameter(parameter_name)
+        parameter.sp = parameter.sp + step
+        values.append(component_values(beamline))
+    return (values[0] - values[1]) / (2 * FINITE_DIFFERENCE_STEP)
+
+
+class TestSensitivity(unittest.TestCase):
+    def assert_sensitivity_matches_finite_differences(self, **kwargs):
+        sensitivity = create_beamline(**kwargs).sensitivity()
+
+        for parameter_name in ["smangle", "slitpos", "theta", "detpos"]:
+            expected = finite_difference_sensitivity(parameter_name, **kwargs)
+            column = sensitivity.parameter_names.index(parameter_name)
+            actual = np.array(
+                [
+                    sensitivity.height[:, column],
+                    sensitivity.angle[:, column],
+                    sensitivity.beam_height[:, column],
+                    sensitivity.beam_angle[:, column],
+                ]
+            )
+            assert_that(
+                np.fabs(actual - expected).max(), is_(less_than(FINITE_DIFFERENCE_TOLERANCE))
+            )
+
+    def test_GIVEN_all_parameters_in_mode_WHEN_sensitivity_THEN_derivatives_match_finite_differences(
+        self,
+    ):
+        self.assert_sensitivity_matches_finite_differences()
+
+    def test_GIVEN_super_mirror_disabled_WHEN_sensitivity_THEN_derivatives_match_finite_differences(
+        self,
+    ):
+        self.assert_sensitivity_matches_finite_differences(sm_enabled=False)
+
+    def test_GIVEN_downstream_parameters_not_in_mode_WHEN_sensitivity_THEN_derivatives_match_finite_differences(
+        self,
+    ):
+        self.assert_sensitivity_matches_finite_differences(in_mode=["smangle", "theta"])
+
+    def test_GIVEN_sensitivity_WHEN_linear_update_for_small_change_THEN_close_to_moved_beamline(
+        self,
+    ):
+        beamline = create_beamline()
+        heights = np.array([component.sp_position().y for component in beamline])
+        height_changes = beamline.sensitivity().height_changes({"theta": 0.01})
+
+        beamline.parameter("theta").sp += 0.01
+
+        moved_heights = np.array([component.sp_position().y for component in beamline])
+        assert_that(np.fabs(heights + height_changes - moved_heights).max(), is_(less_than(1e-5)))
+
+    def test_GIVEN_sensitivity_WHEN_set_point_uncertainty_THEN_height_uncertainty_is_scaled_by_derivative(
+        self,
+    ):
+        sensitivity = create_beamline().sensitivity()
+
+        uncertainties = sensitivity.height_uncertainties({"theta": 0.1})
+
+        column = sensitivity.parameter_names.index("theta")
+        assert_that(
+            uncertainties.tolist(), contains(*np.fabs(sensitivity.height[:, column] * 0.1).tolist())
+        )
+
+    def test_GIVEN_sensitivity_WHEN_beamline_moved_THEN_sensitivity_recalculated(self):
+        beamline = create_beamline()
+        sensitivity = beamline.sensitivity()
+
+        beamline.parameter("theta").sp = 3.0
+
+        assert_that(beamline.sensitivity(), is_not(sensitivity))
+
+
+class TestAxisTargetDerivatives(unittest.TestCase):
+    def test_GIVEN_drivers_WHEN_axis_target_derivatives_THEN_derivatives_are_those_of_the_driven_values(
+        self,
+    ):
+        beamline = create_beamline(with_drivers=True)
+        sensitivity = beamline.sensitivity()
+
+        derivatives = [
+            (axis.name, derivative.tolist())
+            for axis, derivative in beamline.axis_target_derivatives()
+        ]
+
+        assert_that(
+            derivatives,
+            contains(
+                ("SM:HEIGHT", sensitivity.height[0].tolist()),
+                ("SM:ANGLE", sensitivity.angle[0].tolist()),
+                ("SLIT:HEIGHT", sensitivity.height[1].tolist()),
+                ("DETECTOR:HEIGHT", sensitivity.height[3].tolist()),
+                ("DETECTOR:TILT", sensitivity.beam_angle[3].tolist()),
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
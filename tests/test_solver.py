@@ -0,0 +1,117 @@
+import unittest
+from math import atan, degrees
+
+import numpy as np
+from hamcrest import *
+
+from src.beamline import Beamline, BeamlineMode
+from src.components import Component, ReflectingComponent
+from src.gemoetry import PositionAndAngle
+from src.movement_strategy import LinearMovement
+from src.parameters import ComponentEnabled, ReflectionAngle, Theta, TrackingPosition
+from src.solver import BeamlineSolver
+from tests.utils import DEFAULT_TEST_TOLERANCE
+
+
+class TestBeamlineSolver(unittest.TestCase):
+    def setUp(self):
+        self.super_mirror = ReflectingComponent(
+            "super mirror", movement_strategy=LinearMovement(0, 10, 90)
+        )
+        self.sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 20, 90))
+        self.slit = Component("slit", movement_strategy=LinearMovement(0, 30, 90))
+        self.detector = Component("detector", movement_strategy=LinearMovement(0, 40, 90))
+        parameters = [
+            ComponentEnabled("sm enabled", self.super_mirror, sim=True, init=False),
+            ReflectionAngle("sm angle", self.super_mirror, sim=True, init=0),
+            Theta("theta", self.sample, sim=True, init=0),
+            TrackingPosition("slit height", self.slit, sim=True, init=0),
+        ]
+        mode = BeamlineMode("mode", [parameter.name for parameter in parameters])
+        self.beamline = Beamline(
+            [self.super_mirror, self.sample, self.slit, self.detector], parameters, [], [mode]
+        )
+        self.beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        self.beamline.active_mode = mode
+        self.solver = BeamlineSolver(self.beamline)
+
+    def assert_heights(self, parameter_name, set_points, component_index, expected_heights):
+        heights = self.beamline.evaluate_batch(parameter_name, set_points).y[:, component_index]
+        for height, expected_height in zip(heights, expected_heights):
+            assert_that(height, close_to(expected_height, DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_straight_beam_from_sample_WHEN_solve_theta_for_height_at_detector_THEN_theta_is_half_angle_to_height(
+        self,
+    ):
+        result = self.solver.solve("theta", 3, 5.0)
+
+        assert_that(result, close_to(degrees(atan(5.0 / 20.0)) / 2.0, DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_array_of_heights_WHEN_solve_theta_THEN_set_point_per_height_gives_height(self):
+        heights = np.array([-2.0, 0.0, 1.0, 7.5])
+
+        result = self.solver.solve("theta", 3, heights)
+
+        assert_that(result.shape, is_(heights.shape))
+        self.assert_heights("theta", result, 3, heights)
+
+    def test_GIVEN_super_mirror_enabled_WHEN_solve_super_mirror_angle_for_height_at_detector_THEN_set_points_give_heights(
+        self,
+    ):
+        self.beamline.parameter("sm enabled").sp = True
+        self.beamline.parameter("theta").sp = 1.0
+        heights = np.array([1.0, 3.0, 6.0])
+
+        result = self.solver.solve("sm angle", 3, heights)
+
+        self.assert_heights("sm angle", result, 3, heights)
+
+    def test_GIVEN_slit_WHEN_solve_tracking_position_THEN_set_point_is_height_above_beam(self):
+        self.beamline.parameter("theta").sp = 5.0
+        beam_height = self.beamline.interception_at(2).y
+
+        result = self.solver.solve("slit height", 2, [beam_height + 1.0, beam_height - 2.0])
+
+        assert_that(result[0], close_to(1.0, DEFAULT_TEST_TOLERANCE))
+        assert_that(result[1], close_to(-2.0, DEFAULT_TEST_TOLERANCE))
+
+    def test_GIVEN_tracking_position_WHEN_solve_for_height_at_other_component_THEN_error(self):
+        with self.assertRaises(ValueError):
+            self.solver.solve("slit height", 3, 1.0)
+
+    def test_GIVEN_component_before_reflection_WHEN_solve_theta_THEN_error(self):
+        with self.assertRaises(ValueError):
+            self.solver.solve("theta", 0, 1.0)
+
+    def test_GIVEN_parameter_which_is_not_an_angle_or_position_WHEN_solve_THEN_error(self):
+        with self.assertRaises(ValueError):
+            self.solver.solve("sm enabled", 3, 1.0)
+
+    def test_GIVEN_height_for_which_beam_misses_a_component_WHEN_solve_with_other_heights_THEN_only_that_height_is_nan(
+        self,
+    ):
+        # the sample moves at 45 degrees, so a beam reflected up at 45 degrees to reach a height of 30 misses it
+        super_mirror = ReflectingComponent(
+            "super mirror", movement_strategy=LinearMovement(0, 10, 90)
+        )
+        sample = ReflectingComponent("sample", movement_strategy=LinearMovement(0, 20, 45))
+        detector = Component("detector", movement_strategy=LinearMovement(0, 40, 90))
+        parameters = [
+            ReflectionAngle("sm angle", super_mirror, sim=True, init=0),
+            Theta("theta", sample, sim=True, init=0),
+        ]
+        mode = BeamlineMode("mode", [parameter.name for parameter in parameters])
+        beamline = Beamline([super_mirror, sample, detector], parameters, [], [mode])
+        beamline.set_incoming_beam(PositionAndAngle(0, 0, 0))
+        beamline.active_mode = mode
+
+        result = BeamlineSolver(beamline).solve("sm angle", 2, [1.0, 30.0, -3.0])
+
+        assert_that(np.isnan(result), contains(False, True, False))
+        heights = beamline.evaluate_batch("sm angle", result[[0, 2]]).y[:, 2]
+        assert_that(heights[0], close_to(1.0, DEFAULT_TEST_TOLERANCE))
+        assert_that(heights[1], close_to(-3.0, DEFAULT_TEST_TOLERANCE))
+
+
+if __name__ == "__main__":
+    unittest.main()